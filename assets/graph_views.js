@@ -0,0 +1,305 @@
+// rendu côté navigateur des vues de la page graphique.
+// le serveur envoie un agrégat compact par état de filtres (dcc.Store) ; changer
+// d'unité (heure/jour/mois/jour de semaine) ou de vue d'âge (détail/tranches)
+// ne fait que regrouper cet agrégat ici, sans aller-retour serveur.
+// seul rendu de ces vues : le serveur n'envoie que les agrégats (_time_series_payload,
+// _age_payload de home.py) et la configuration d'affichage qui les accompagne.
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    graphs: (function () {
+        const UNITS = ["hour", "day", "month", "weekday"];
+        const AXIS_STYLE = {
+            showgrid: true,
+            gridwidth: 1,
+            gridcolor: "rgba(200, 200, 200, 0.2)",
+            showline: true,
+            linewidth: 2,
+            linecolor: "#ddd",
+        };
+
+        function triggeredId() {
+            const ctx = window.dash_clientside.callback_context;
+            if (!ctx || !ctx.triggered || !ctx.triggered.length) {
+                return null;
+            }
+            return ctx.triggered[0].prop_id.split(".")[0];
+        }
+
+        function messageFigure(text, template) {
+            const layout = {
+                annotations: [
+                    { text: text, xref: "paper", yref: "paper", x: 0.5, y: 0.5, showarrow: false },
+                ],
+            };
+            if (template) {
+                layout.template = template;
+            }
+            return { data: [], layout: layout };
+        }
+
+        // regroupe l'agrégat d'une année selon l'unité -> {x: [...], y: [...]} trié
+        function binTimeSeries(serie, unit) {
+            if (unit === "hour") {
+                return { x: serie.hours.x.slice(), y: serie.hours.y.slice() };
+            }
+            const totals = new Map();
+            const days = serie.days;
+            for (let i = 0; i < days.n.length; i++) {
+                const mois = days.mois[i];
+                const jour = days.jour[i];
+                let key = null;
+                if (unit === "day") {
+                    key = jour > 0 ? jour : null;
+                } else if (unit === "month") {
+                    key = mois > 0 ? mois : null;
+                } else if (mois > 0 && jour > 0) {
+                    // jour de semaine (lundi=1 .. dimanche=7), dates invalides ignorées
+                    const date = new Date(Date.UTC(serie.year, mois - 1, jour));
+                    if (date.getUTCMonth() === mois - 1 && date.getUTCDate() === jour) {
+                        key = ((date.getUTCDay() + 6) % 7) + 1;
+                    }
+                }
+                if (key !== null) {
+                    totals.set(key, (totals.get(key) || 0) + days.n[i]);
+                }
+            }
+            const x = Array.from(totals.keys()).sort((a, b) => a - b);
+            return { x: x, y: x.map((k) => totals.get(k)) };
+        }
+
+        function ageTranche(age, tranches) {
+            for (const [label, lo, hi, color] of tranches) {
+                if (age >= lo && age <= hi) {
+                    return [label, color];
+                }
+            }
+            const last = tranches[tranches.length - 1];
+            return [last[0], last[3]];
+        }
+
+        const AGE_LAYOUT = {
+            height: 500,
+            margin: { l: 60, r: 20, t: 80, b: 60 },
+            font: { family: "Arial, sans-serif", size: 12, color: "#e6e9f2" },
+            paper_bgcolor: "#1a1d2e",
+            plot_bgcolor: "#1a1d2e",
+            bargap: 0.1,
+        };
+        const AGE_YAXIS = {
+            title: { text: "Nombre d'accidents" },
+            gridcolor: "#2d3548",
+            tickfont: { color: "#e6e9f2" },
+        };
+
+        function ageDetail(payload) {
+            const tranches = payload.tranches;
+            const labels = [];
+            const colors = [];
+            for (const age of payload.ages) {
+                const [label, color] = ageTranche(age, tranches);
+                labels.push(label);
+                colors.push(color);
+            }
+            const data = [
+                {
+                    type: "bar",
+                    x: payload.ages,
+                    y: payload.counts,
+                    marker: { color: colors, line: { color: "#1a1d2e", width: 1 } },
+                    hovertemplate:
+                        "<b>Âge: %{x} ans</b><br>Tranche: %{customdata}<br>" +
+                        "Accidents: %{y}<extra></extra>",
+                    customdata: labels,
+                    showlegend: false,
+                },
+            ];
+            // légende manuelle des tranches d'âge
+            for (const [label, , , color] of tranches) {
+                data.push({
+                    type: "scatter",
+                    x: [null],
+                    y: [null],
+                    mode: "markers",
+                    marker: { size: 10, color: color },
+                    name: label,
+                    showlegend: true,
+                });
+            }
+            return {
+                data: data,
+                layout: Object.assign({}, AGE_LAYOUT, {
+                    title: {
+                        text: "RÉPARTITION DES CONDUCTEURS PAR ÂGE",
+                        x: 0.5,
+                        xanchor: "center",
+                        font: { size: 16, color: "#e6e9f2" },
+                    },
+                    xaxis: {
+                        title: { text: "Âge (années)" },
+                        gridcolor: "#2d3548",
+                        tickfont: { color: "#e6e9f2" },
+                        tickmode: "linear",
+                        dtick: 5,
+                    },
+                    yaxis: AGE_YAXIS,
+                    showlegend: true,
+                    legend: {
+                        orientation: "v",
+                        yanchor: "top",
+                        y: 0.98,
+                        xanchor: "right",
+                        x: 0.98,
+                        bgcolor: "rgba(26, 29, 46, 0.8)",
+                        bordercolor: "#6b5bd3",
+                        borderwidth: 1,
+                        font: { color: "#e6e9f2", size: 11 },
+                    },
+                }),
+            };
+        }
+
+        function ageTrancheView(payload) {
+            const totals = new Map(payload.tranches.map((t) => [t[0], 0]));
+            payload.ages.forEach((age, i) => {
+                const label = ageTranche(age, payload.tranches)[0];
+                totals.set(label, totals.get(label) + payload.counts[i]);
+            });
+            const present = payload.tranches.filter((t) => totals.get(t[0]) > 0);
+            return {
+                data: [
+                    {
+                        type: "bar",
+                        x: present.map((t) => t[0]),
+                        y: present.map((t) => totals.get(t[0])),
+                        marker: {
+                            color: present.map((t) => t[3]),
+                            line: { color: "#1a1d2e", width: 1 },
+                        },
+                        hovertemplate: "<b>%{x}</b><br>Accidents: %{y}<extra></extra>",
+                    },
+                ],
+                layout: Object.assign({}, AGE_LAYOUT, {
+                    title: {
+                        text: "RÉPARTITION PAR TRANCHES D'ÂGE",
+                        x: 0.5,
+                        xanchor: "center",
+                        font: { size: 16, color: "#e6e9f2" },
+                    },
+                    xaxis: {
+                        title: { text: "Tranche d'âge" },
+                        gridcolor: "#2d3548",
+                        tickfont: { color: "#e6e9f2" },
+                    },
+                    yaxis: AGE_YAXIS,
+                    showlegend: false,
+                }),
+            };
+        }
+
+        return {
+            selectTimeUnit: function () {
+                const id = triggeredId();
+                const unit = id ? id.replace("btn-ts-", "") : "hour";
+                return UNITS.includes(unit) ? unit : "hour";
+            },
+
+            selectAgeView: function () {
+                return triggeredId() === "btn-age-tranche" ? "tranche" : "detail";
+            },
+
+            timeSeries: function (payload, unit, currentFigure) {
+                // le thème plotly_dark (volumineux) est envoyé une fois par la figure initiale
+                const template =
+                    currentFigure && currentFigure.layout ? currentFigure.layout.template : undefined;
+                if (!payload) {
+                    return window.dash_clientside.no_update;
+                }
+                if (payload.error) {
+                    return messageFigure("erreur: " + payload.error, template);
+                }
+                const meta = payload.meta;
+                unit = UNITS.includes(unit) ? unit : "hour";
+                const sets = payload.series
+                    .map((serie) => [serie.year, binTimeSeries(serie, unit)])
+                    .filter((entry) => entry[1].x.length > 0);
+                if (!sets.length) {
+                    return messageFigure("aucune donnée disponible", template);
+                }
+                const showLeg = sets.length > 1;
+                const data = sets.map(([year, xy], idx) => {
+                    const color = meta.palette[idx % meta.palette.length];
+                    const trace = {
+                        type: "scatter",
+                        x: xy.x,
+                        y: xy.y,
+                        mode: "lines+markers",
+                        name: String(year),
+                        line: { color: color, width: 3, shape: "spline" },
+                        marker: {
+                            size: 8,
+                            color: color,
+                            symbol: "circle",
+                            line: { color: "#0e111b", width: 1 },
+                        },
+                        hovertemplate:
+                            "<b>année " + year + "</b><br>accidents: <b>%{y}</b><extra></extra>",
+                    };
+                    // aire uniquement pour une série seule (pas d'empilement trompeur)
+                    if (!showLeg) {
+                        trace.fill = "tozeroy";
+                        trace.fillcolor = "rgba(58, 231, 255, 0.12)";
+                    }
+                    return trace;
+                });
+                const xaxis = Object.assign({}, AXIS_STYLE, {
+                    title: { text: meta.x_titles[unit] },
+                    tickmode: "linear",
+                    dtick: 1,
+                    range: meta.x_ranges[unit],
+                });
+                if (unit === "weekday") {
+                    Object.assign(xaxis, {
+                        tickmode: "array",
+                        tickvals: [1, 2, 3, 4, 5, 6, 7],
+                        ticktext: meta.weekday_labels,
+                    });
+                }
+                const layout = {
+                    title: {
+                        text: meta.titles[unit],
+                        x: 0.5,
+                        xanchor: "center",
+                        font: { size: 18, color: "#e6e9f2", family: "Arial, sans-serif" },
+                    },
+                    xaxis: xaxis,
+                    yaxis: Object.assign({}, AXIS_STYLE, { title: { text: "nombre d'accidents" } }),
+                    height: 550,
+                    margin: { l: 80, r: 60, t: 100, b: 80 },
+                    hovermode: "x unified",
+                    plot_bgcolor: "#14192a",
+                    paper_bgcolor: "#181d31",
+                    font: { family: "Arial, sans-serif", size: 12, color: "#e6e9f2" },
+                    showlegend: showLeg,
+                    legend: { orientation: "h", y: 1.05 },
+                };
+                if (template) {
+                    layout.template = template;
+                }
+                return { data: data, layout: layout };
+            },
+
+            ageHistogram: function (payload, view) {
+                if (!payload) {
+                    return window.dash_clientside.no_update;
+                }
+                if (payload.error) {
+                    return messageFigure("erreur: " + payload.error);
+                }
+                if (!payload.ages.length) {
+                    return messageFigure("aucune donnée disponible");
+                }
+                return view === "tranche" ? ageTrancheView(payload) : ageDetail(payload);
+            },
+        };
+    })(),
+});
@@ -1,6 +1,6 @@
-import sqlite3
+from src.utils.db_connection import connect_readonly
 
-conn = sqlite3.connect('bdd/database.db')
+conn = connect_readonly()
 cursor = conn.cursor()
 
 # Lister les tables
@@ -0,0 +1,71 @@
+"""configuration gunicorn du dashboard (mode production).
+
+usage : gunicorn -c gunicorn.conf.py
+la base doit déjà exister : le pipeline de setup (téléchargement, nettoyage,
+chargement) n'est lancé que par `python main.py`, jamais au démarrage des workers.
+
+l'application est importée une fois dans le process maître (`preload_app`) puis
+réchauffée (géométries, vues par défaut, pages) avant le fork : les workers partagent
+ces pages mémoire en copie sur écriture, et la base ouverte en lecture seule
+immuable est partagée via le cache de pages de l'os (mmap).
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+
+# base en lecture seule immuable : lue avant l'import de l'application
+os.environ.setdefault("db_immutable", "1")
+
+logger = logging.getLogger("gunicorn.error")
+
+wsgi_app = "main:server"
+bind = os.getenv("bind", "0.0.0.0:8050")
+workers = int(os.getenv("web_concurrency", str(min(2 * multiprocessing.cpu_count() + 1, 8))))
+# quelques threads par worker : les callbacks attendent surtout sqlite (verrou gil relâché)
+threads = int(os.getenv("gunicorn_threads", "4"))
+preload_app = True
+timeout = int(os.getenv("gunicorn_timeout", "120"))
+accesslog = os.getenv("gunicorn_accesslog") or None
+
+
+def when_ready(server):
+    """réchauffe les caches dans le maître, avant le fork des workers."""
+    start = time.perf_counter()
+    # pylint: disable=import-outside-toplevel
+    from src.pages.home import PAGE_BUILDERS, _cached_page, prerender_defaults, warm_up_caches
+    from src.utils.db_connection import dispose_read_engine
+
+    try:
+        stats = warm_up_caches()
+        entries = sum(info["entries"] for info in stats["cache"].values())
+        server.log.info(
+            "%d vues précalculées en %.2fs (%d entrées en cache)",
+            stats["views"],
+            stats["seconds"],
+            entries,
+        )
+        # vues par défaut intégrées aux layouts : ne les écrire que si elles manquent
+        stats = prerender_defaults(only_missing=True)
+        if stats["views"]:
+            server.log.info("%d vues prérendues (%d octets)", stats["views"], stats["bytes"])
+    except Exception as err:
+        server.log.warning("précalcul des vues impossible : %s", err)
+    for button_id in PAGE_BUILDERS:
+        try:
+            _cached_page(button_id)
+        except Exception as err:  # base absente ou incomplète : les workers réessaieront
+            server.log.warning("préchauffage de %s impossible : %s", button_id, err)
+    # aucune connexion sqlite ne doit traverser le fork
+    dispose_read_engine()
+    server.log.info("caches préchauffés en %.2fs", time.perf_counter() - start)
+
+
+def post_fork(server, worker):
+    """chaque worker ouvre son propre pool de connexions."""
+    # pylint: disable=import-outside-toplevel,unused-argument
+    from src.utils.db_connection import dispose_read_engine
+
+    # ne pas fermer les connexions éventuellement héritées du maître : les abandonner
+    dispose_read_engine(close=False)
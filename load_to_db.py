@@ -8,19 +8,158 @@ import logging
 import re
 import time
 
+from src.utils.db_connection import DATABASE_PATH, dispose_read_engine
+from src.utils.geo_codes import CHOROPLETH_LEVELS, aggregate_counts, year_deltas
+from src.utils.grid import GRAV_LABELS, SEVERITY_ORDER, pyramid_counts, worst_severity
+from src.utils.hotspots import HOTSPOT_TABLE, store_hotspots, year_hotspots
+from src.utils.proximity import build_nearest_radar
+from src.utils.quantile_sketch import SKETCH_TABLE, store_sketches
+from src.utils.radar_stats import RADAR_STATS_TABLE, store_radar_stats
+from src.utils.spatial import build_spatial_index, rtree_table
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 ROOT = Path(__file__).resolve().parent
 CLEAN_DIR = ROOT / "data" / "cleaned"
-DB_DIR = ROOT / "bdd"
+DB_DIR = DATABASE_PATH.parent
 DB_DIR.mkdir(parents=True, exist_ok=True)
 
-DATABASE_PATH = DB_DIR / "database.db"
 DATABASE_URL = f"sqlite:///{DATABASE_PATH.as_posix()}?timeout=30"
 
-def load_csv_to_db(retries=3):
-    """Charge dynamiquement les fichiers CSV nettoyés (toutes années) dans SQLite."""
+CODE_DTYPES = {"dep": str, "com": str, "com_insee": str, "dep_geo": str, "com_geo": str}
+
+
+def build_choropleth_counts(engine, years):
+    """Materialise les comptes d'accidents par annee et niveau (commune, dept, region).
+
+    Le repliement des arrondissements et le passage departement -> region sont
+    faits ici une fois pour toutes : les cartes ne font plus qu'une lecture.
+    """
+    frames = []
+    with engine.connect() as conn:
+        for year in sorted(years):
+            columns = pd.read_sql(text(f"PRAGMA table_info(caracteristiques_{year})"), conn)["name"]
+            # code normalise au nettoyage s'il existe (arrondissements deja replies)
+            com = "com_insee" if "com_insee" in set(columns) else "com"
+            df = pd.read_sql(
+                text(
+                    f"SELECT dep, {com} AS com, COUNT(*) AS accidents "
+                    f"FROM caracteristiques_{year} GROUP BY dep, {com}"
+                ),
+                conn,
+            )
+            for niveau in CHOROPLETH_LEVELS:
+                counts = aggregate_counts(df, niveau)
+                counts.insert(0, "niveau", niveau)
+                counts.insert(0, "annee", int(year))
+                frames.append(counts)
+    if not frames:
+        logger.info("Aucune table caracteristiques, agregats de carte ignores")
+        return None
+    counts = pd.concat(frames, ignore_index=True)
+    counts.to_sql("choropleth_counts", engine, if_exists="replace", index=False)
+    with engine.connect() as conn:
+        conn.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_choropleth_counts "
+                "ON choropleth_counts (niveau, annee, code)"
+            )
+        )
+        conn.commit()
+    logger.info(f"Table choropleth_counts creee ({len(counts)} lignes)")
+    return counts
+
+
+def build_choropleth_deltas(engine, counts):
+    """Materialise les variations par zone : annees consecutives et ecart a la moyenne.
+
+    La vue variation de la carte lit ces lignes telles quelles, sans regroupement.
+    """
+    deltas = year_deltas(counts)
+    deltas.to_sql("choropleth_deltas", engine, if_exists="replace", index=False)
+    with engine.connect() as conn:
+        conn.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_choropleth_deltas "
+                "ON choropleth_deltas (niveau, reference, annee, code)"
+            )
+        )
+        conn.commit()
+    logger.info(f"Table choropleth_deltas creee ({len(deltas)} lignes)")
+
+
+def severity_points(conn, year, tables):
+    """Accidents geolocalises d'une annee (lon, lat, dep, grav).
+
+    La gravite d'un accident est celle de son usager le plus gravement atteint
+    (0 si l'annee n'a pas de table usager).
+    """
+    caract_table = f"caracteristiques_{year}"
+    usager_table = f"usager_{year}"
+    if usager_table in tables:
+        rank_case = " ".join(f"WHEN {code} THEN {rank}" for rank, code in enumerate(SEVERITY_ORDER, 1))
+        sql = (
+            f"SELECT c.lon, c.lat, c.dep, MIN(CASE u.grav {rank_case} END) AS rang "
+            f"FROM {caract_table} c LEFT JOIN {usager_table} u ON u.Num_Acc = c.acc_id "
+            "WHERE c.lat IS NOT NULL AND c.lon IS NOT NULL GROUP BY c.rowid"
+        )
+    else:
+        sql = f"SELECT lon, lat, dep, NULL AS rang FROM {caract_table} WHERE lat IS NOT NULL AND lon IS NOT NULL"
+    points = pd.read_sql(text(sql), conn, dtype={"dep": str})
+    points["grav"] = worst_severity(points["rang"])
+    return points.drop(columns="rang")
+
+
+def _table_names(conn):
+    """Noms des tables de la base."""
+    return set(pd.read_sql(text("SELECT name FROM sqlite_master WHERE type='table'"), conn)["name"])
+
+
+def build_grid_counts(engine, years):
+    """Materialise la pyramide de mailles (niveau, annee, gravite) des accidents."""
+    frames = []
+    with engine.connect() as conn:
+        tables = _table_names(conn)
+        for year in sorted(years):
+            frames.append(pyramid_counts(severity_points(conn, year, tables), year))
+    if not frames:
+        logger.info("Aucune table caracteristiques, pyramide de mailles ignoree")
+        return
+    counts = pd.concat(frames, ignore_index=True)
+    counts.to_sql("grid_counts", engine, if_exists="replace", index=False)
+    with engine.connect() as conn:
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_grid_counts "
+                "ON grid_counts (niveau, annee, cx, cy)"
+            )
+        )
+        conn.commit()
+    logger.info(f"Table grid_counts creee ({len(counts)} lignes)")
+
+
+def build_hotspots(engine, years):
+    """Calcule les points noirs (dbscan) de chaque annee, une annee en memoire a la fois."""
+    total = 0
+    for year in sorted(years):
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            points = severity_points(conn, year, _table_names(conn))
+        hotspots = year_hotspots(points, year, GRAV_LABELS)
+        del points
+        total += store_hotspots(engine, hotspots, year)
+        logger.info(f"Points noirs {year} : {len(hotspots)} groupes en {time.perf_counter() - start:.2f}s")
+    logger.info(f"Table {HOTSPOT_TABLE} creee ({total} points noirs)")
+
+
+def load_csv_to_db(retries=3, tables=None, derived=True):
+    """Charge dynamiquement les fichiers CSV nettoyés (toutes années) dans SQLite.
+
+    `tables` : préfixes des tables à (re)charger, par ex. ("caracteristiques_",) ;
+    par défaut toutes. `derived=False` saute les tables jointes et les agrégats de
+    carte (chargement progressif pendant l'initialisation en tâche de fond).
+    """
     
     engine = create_engine(DATABASE_URL, connect_args={"timeout": 30})
     
@@ -67,8 +206,11 @@ def load_csv_to_db(retries=3):
         logger.warning(f"Aucun fichier nettoye trouve dans {CLEAN_DIR}")
         return
     
-    logger.info(f"{len(all_files)} fichier(s) a charger:")
-    for table_name, csv_path in sorted(all_files.items()):
+    to_load = {
+        t: p for t, p in all_files.items() if tables is None or t.startswith(tuple(tables))
+    }
+    logger.info(f"{len(to_load)} fichier(s) a charger:")
+    for table_name, csv_path in sorted(to_load.items()):
         if not csv_path.exists():
             logger.warning(f"Fichier manquant : {csv_path}")
             continue
@@ -77,11 +219,35 @@ def load_csv_to_db(retries=3):
         while attempt < retries:
             try:
                 logger.info(f"Chargement de {csv_path.name} table '{table_name}'...")
-                df = pd.read_csv(csv_path, low_memory=False)
+                start = time.perf_counter()
+                # codes geographiques en texte : zeros de tete conserves ("01004", "2A")
+                df = pd.read_csv(csv_path, low_memory=False, dtype=CODE_DTYPES)
                 
                 # Insérer dans la DB (remplace la table)
                 df.to_sql(table_name, engine, if_exists="replace", index=False)
-                logger.info(f"{len(df)} lignes inserees dans '{table_name}'")
+                rate = len(df) / max(time.perf_counter() - start, 1e-6)
+                logger.info(f"{len(df)} lignes inserees dans '{table_name}' ({rate:,.0f} lignes/s)")
+
+                # Index spatial (r*tree) : reconstruit avec la table, les rowid ayant change
+                if table_name.startswith("caracteristiques_"):
+                    with engine.connect() as conn:
+                        indexed = build_spatial_index(conn, table_name)
+                        if "com_insee" in df.columns:
+                            conn.execute(
+                                text(
+                                    f"CREATE INDEX IF NOT EXISTS idx_{table_name}_com_insee "
+                                    f"ON {table_name} (com_insee)"
+                                )
+                            )
+                        conn.commit()
+                    logger.info(f"Index spatial {rtree_table(table_name)} cree ({indexed} points)")
+
+                # Statistiques par radar, depuis les mesures deja en memoire
+                if table_name.startswith("radars_"):
+                    radars = store_radar_stats(engine, df, int(table_name.split("_")[1]))
+                    logger.info(f"Table {RADAR_STATS_TABLE} : {radars} radars pour {table_name}")
+                    sketches = store_sketches(engine, df, int(table_name.split("_")[1]))
+                    logger.info(f"Table {SKETCH_TABLE} : {sketches} esquisses pour {table_name}")
                 break
             
             except Exception as e:
@@ -96,6 +262,11 @@ def load_csv_to_db(retries=3):
     engine.dispose()
     logger.info(f"Base de données mise à jour : {DATABASE_PATH}")
 
+    if not derived:
+        # les connexions lecture seule du dashboard voient ainsi les nouvelles tables
+        dispose_read_engine()
+        return
+
     # Création des tables jointes caract/usager/vehicule par année
     try:
         engine = create_engine(DATABASE_URL, connect_args={"timeout": 30})
@@ -183,10 +354,50 @@ def load_csv_to_db(retries=3):
                     """
                 
                 conn.execute(text(join_sql))
+                # filtres usager/vehicule par accident (EXISTS) : acces par identifiant
+                conn.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS idx_{joined_table}_{id_col} "
+                        f"ON {joined_table} ({id_col})"
+                    )
+                )
                 logger.info(f"Table {joined_table} creee")
             conn.commit()
         engine.dispose()
     except Exception as e:
         logger.error(f"Erreur creation des tables jointes: {e}")
+
+    # Agregats des cartes choroplethes (commune / departement / region par annee, variations)
+    try:
+        engine = create_engine(DATABASE_URL, connect_args={"timeout": 30})
+        caract_years = [t.split("_")[1] for t in all_files if t.startswith("caracteristiques_")]
+        counts = build_choropleth_counts(engine, caract_years)
+        if counts is not None:
+            build_choropleth_deltas(engine, counts)
+        build_grid_counts(engine, caract_years)
+        engine.dispose()
+    except Exception as e:
+        logger.error(f"Erreur creation des agregats de carte: {e}")
+
+    # Radar le plus proche de chaque accident (emplacements issus de radar_stats)
+    try:
+        engine = create_engine(DATABASE_URL, connect_args={"timeout": 30})
+        caract_years = [t.split("_")[1] for t in all_files if t.startswith("caracteristiques_")]
+        build_nearest_radar(engine, caract_years)
+        engine.dispose()
+    except Exception as e:
+        logger.error(f"Erreur creation de la table des radars les plus proches: {e}")
+
+    # Points noirs (dbscan par annee et gravite), superposables a la carte
+    try:
+        engine = create_engine(DATABASE_URL, connect_args={"timeout": 30})
+        caract_years = [t.split("_")[1] for t in all_files if t.startswith("caracteristiques_")]
+        build_hotspots(engine, caract_years)
+        engine.dispose()
+    except Exception as e:
+        logger.error(f"Erreur calcul des points noirs: {e}")
+
+    # les connexions lecture seule du dashboard pointent peut-être sur l'ancienne base
+    dispose_read_engine()
 if __name__ == "__main__":
     load_csv_to_db()
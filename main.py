@@ -2,9 +2,13 @@
 
 import sys
 import logging
+import time
 from pathlib import Path
 import re
 
+# début du démarrage (mesure du temps de boot, journalisé une fois l'app prête)
+BOOT_START = time.perf_counter()
+
 import pandas as pd
 
 # Setup logging
@@ -21,7 +25,15 @@ ROOT = Path(__file__).resolve().parent
 # ============================================================================
 
 def setup_data():
-    """Telecharge, nettoie et charge tout dans la DB."""
+    """Telecharge, nettoie et charge tout dans la DB ; renvoie True si la base est prete.
+
+    Chaque jeu de donnees est charge en base des qu'il est nettoye (accidents, puis
+    radars, puis usagers/vehicules et tables jointes) : lancee en tache de fond,
+    l'initialisation rend ainsi les pages disponibles une a une.
+    """
+    from src.utils.setup_progress import step
+
+    step("initialisation des données")
     logger.info(" Initialisation des donnees...")
     
     try:
@@ -60,6 +72,8 @@ def setup_data():
         from src.utils.clean_vehicule_2024 import clean_vehicule_2024
         
         from load_to_db import load_csv_to_db
+        from src.utils.spatial_join import annotate_csv
+        from src.utils.transform_arrondissement import normalize_csv
         
         caract_getters = {
             2020: get_caract_2020,
@@ -120,6 +134,7 @@ def setup_data():
         }
         
         # ============ Nettoyer CARACTÉRISTIQUES (5 années) ============
+        step("préparation des accidents")
         logger.info("Traitement CARACTERISTIQUES...")
         for year in caract_cleaners.keys():
             cleaned_path = ROOT / "data" / "cleaned" / f"caract_clean_{year}.csv"
@@ -160,7 +175,24 @@ def setup_data():
             except Exception as e:
                 logger.error(f" Erreur nettoyage caract {year}: {e}")
         
+        # Codes commune normalises (com_insee), puis jointure spatiale :
+        # departement/commune retrouves depuis lat/lon, ecarts signales
+        for year in caract_cleaners.keys():
+            cleaned_path = ROOT / "data" / "cleaned" / f"caract_clean_{year}.csv"
+            if not cleaned_path.exists():
+                continue
+            try:
+                normalize_csv(cleaned_path)
+                annotate_csv(cleaned_path)
+            except Exception as e:
+                logger.error(f" Erreur normalisation des codes caract {year}: {e}")
+
+        # la carte n'attend pas les autres jeux de données
+        step("chargement des accidents")
+        load_csv_to_db(tables=("caracteristiques_",), derived=False)
+
         # ============ Nettoyer RADARS (2 années) ============
+        step("préparation des radars")
         logger.info("Traitement RADARS...")
         for year in radar_cleaners.keys():
             cleaned_path = ROOT / "data" / "cleaned" / f"radars_delta_clean_{year}.csv"
@@ -186,7 +218,11 @@ def setup_data():
             except Exception as e:
                 logger.error(f" Erreur nettoyage radars {year}: {e}")
         
+        step("chargement des radars")
+        load_csv_to_db(tables=("radars_",), derived=False)
+
         # ============ Nettoyer USAGERS (5 années) ============
+        step("préparation des usagers et véhicules")
         logger.info("Traitement USAGERS...")
         for year in usager_cleaners.keys():
             cleaned_path = ROOT / "data" / "cleaned" / f"usager_clean_{year}.csv"
@@ -241,14 +277,35 @@ def setup_data():
         # ============ Charger tout dans la DB ============
         # TOUJOURS charger la DB (même si les CSV existent déjà)
         # car les tables jointes doivent être créées
+        step("création des tables jointes")
         logger.info("Chargement en base de donnees...")
         try:
-            load_csv_to_db()
+            load_csv_to_db(tables=("usager_", "vehicule_"))
             logger.info("Donnees pretes!")
         except Exception as e:
             logger.error(f"Erreur chargement DB: {e}")
             import traceback
             traceback.print_exc()
+            return False
+
+        step("vérification des données")
+        missing = missing_tables()
+
+        # les premiers visiteurs de chaque vue par défaut lisent le cache
+        try:
+            from src.pages.home import prerender_defaults, warm_up_caches
+            stats = warm_up_caches()
+            entries = sum(info["entries"] for info in stats["cache"].values())
+            logger.info(
+                f"{stats['views']} vues précalculées en {stats['seconds']:.2f}s "
+                f"({entries} entrées en cache)"
+            )
+            # vues par défaut en json : premier affichage sans requête sql
+            stats = prerender_defaults()
+            logger.info(f"{stats['views']} vues prérendues ({stats['bytes']} octets)")
+        except Exception as e:
+            logger.warning(f"Précalcul des vues impossible: {e}")
+        return not missing
         
     except Exception as e:
         logger.error(f"Erreur setup donnees: {e}")
@@ -256,6 +313,33 @@ def setup_data():
         traceback.print_exc()
         logger.warning("Tentative de lancement du dashboard malgre l'erreur...")
         # Ne pas exit - laisser le dashboard se lancer quand même
+        return False
+
+
+REQUIRED_TABLES = [
+    "caract_usager_vehicule_2020",
+    "caract_usager_vehicule_2021",
+    "caract_usager_vehicule_2022",
+    "caract_usager_vehicule_2023",
+]
+
+
+def missing_tables():
+    """Tables jointes essentielles absentes de la base (toutes si la base est illisible)."""
+    from sqlalchemy import inspect
+    from src.utils.db_connection import dispose_read_engine, get_read_engine
+
+    try:
+        tables = inspect(get_read_engine()).get_table_names()
+    except Exception as e:
+        logger.error(f"Erreur vérification DB: {e}")
+        return list(REQUIRED_TABLES)
+    finally:
+        dispose_read_engine()
+    missing = [t for t in REQUIRED_TABLES if t not in tables]
+    if missing:
+        logger.warning(f"Tables manquantes: {missing}")
+    return missing
 
 
 # ============================================================================
@@ -263,85 +347,70 @@ def setup_data():
 # ============================================================================
 
 from dash import Dash
+
+_import_start = time.perf_counter()
+# import sans e/s : aucune requête sql, plotly.express chargé au premier graphique
 from src.pages.home import layout as home_layout
+from src.utils.geometry import geometry_bp, preload_layers
+
+_import_time = time.perf_counter() - _import_start
 
 
 app = Dash(__name__, suppress_callback_exceptions=True)
 server = app.server
 app.layout = home_layout
+# géométries servies une fois au navigateur (url versionnée, cache http longue durée)
+server.register_blueprint(geometry_bp)
+
+# géométries régions/départements chargées une fois par process ; communes au premier usage
+preload_layers()
+
+logger.info(
+    f"application prête en {time.perf_counter() - BOOT_START:.2f}s "
+    f"(dont import des pages {_import_time:.2f}s)"
+)
 
 
 if __name__ == "__main__":
-    # Setup données une fois au démarrage (pas en debug reload)
+    # Setup données une fois par lancement, en tâche de fond dans le process qui sert
     import os
-    from pathlib import Path
-    from sqlalchemy import create_engine, inspect
+    from src.utils.db_connection import DATABASE_PATH
+    from src.utils.setup_progress import start_background_setup
     
-    # Werkzeug sets this to "true" on debug reloads; we only run setup on the FIRST launch
+    # Werkzeug lance un process parent (surveillance) puis un process fils qui sert
+    # les requêtes avec WERKZEUG_RUN_MAIN="true" ; le setup tourne dans le fils
     werkzeug_run = os.environ.get("WERKZEUG_RUN_MAIN")
     logger.info(f"WERKZEUG_RUN_MAIN={werkzeug_run}")
     
     # Flag pour éviter la boucle infinie de rechargement
     setup_done_flag = ROOT / "bdd" / ".setup_done"
     
-    # Vérifier si les tables jointes existent
-    db_path = ROOT / "bdd" / "database.db"
-    need_setup = False
-    
-    if not db_path.exists():
-        logger.info("Base de données inexistante, setup requis")
-        need_setup = True
-    else:
-        try:
-            engine = create_engine(f"sqlite:///{db_path.as_posix()}")
-            inspector = inspect(engine)
-            tables = inspector.get_table_names()
-            
-            # Vérifier si les tables jointes essentielles existent
-            required_tables = [
-                "caract_usager_vehicule_2020",
-                "caract_usager_vehicule_2021",
-                "caract_usager_vehicule_2022", 
-                "caract_usager_vehicule_2023"
-            ]
-            missing_tables = [t for t in required_tables if t not in tables]
-            
-            if missing_tables:
-                logger.warning(f"Tables manquantes: {missing_tables}")
-                # Ne recharger que si ce n'est pas un reload de debug OU si le flag n'existe pas
-                if werkzeug_run != "true" or not setup_done_flag.exists():
-                    logger.info("Rechargement de la base nécessaire")
-                    need_setup = True
-                else:
-                    logger.error(f"Tables toujours manquantes après setup: {missing_tables}")
-                    logger.error("Vérifiez les erreurs dans les logs ci-dessus")
-                    logger.info("Lancement du dashboard malgré les tables manquantes...")
-            else:
-                logger.info("Toutes les tables jointes présentes")
-                # Créer le flag si toutes les tables sont présentes
-                if not setup_done_flag.exists():
-                    setup_done_flag.touch()
-            
-            engine.dispose()
-        except Exception as e:
-            logger.error(f"Erreur vérification DB: {e}")
-            if werkzeug_run != "true":
-                need_setup = True
-    
     if werkzeug_run != "true":
-        # Supprimer le flag au premier lancement
+        # Premier lancement : le fils refera le setup une fois
         if setup_done_flag.exists():
             setup_done_flag.unlink()
-        setup_data()
-        # Créer le flag après setup réussi
-        setup_done_flag.touch()
-    elif need_setup:
-        logger.info("Tables manquantes détectées, rechargement forcé (une seule fois)...")
-        setup_data()
-        # Créer le flag pour éviter la boucle
-        setup_done_flag.touch()
     else:
-        logger.info("(Debug reload detected; skipping setup_data)")
+        need_setup = not setup_done_flag.exists()
+        if not need_setup and not DATABASE_PATH.exists():
+            logger.info("Base de données inexistante, setup requis")
+            need_setup = True
+        elif not need_setup and missing_tables():
+            logger.error("Tables toujours manquantes après setup, vérifiez les logs ci-dessus")
+            logger.info("Lancement du dashboard malgré les tables manquantes...")
+        
+        if need_setup:
+            def _setup_then_flag():
+                try:
+                    return setup_data()
+                finally:
+                    # Créer le flag pour éviter la boucle (même après échec)
+                    setup_done_flag.touch()
+            
+            # Le dashboard répond tout de suite ; chaque page s'ouvre dès que ses
+            # tables sont chargées (progression sur la page de setup)
+            start_background_setup(_setup_then_flag)
+        else:
+            logger.info("(Debug reload detected; skipping setup_data)")
     
     logger.info("Dashboard sur http://127.0.0.1:8050/")
     # Masquer la barre 'Dash Dev Tools' en bas de page tout en gardant le reload
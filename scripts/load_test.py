@@ -0,0 +1,147 @@
+"""test de charge local du dashboard (serveur de dev ou gunicorn).
+
+rejoue en parallèle les requêtes typiques d'une visite : layout, navigation vers
+la carte, changement d'année de la carte et de l'histogramme.
+affiche pour chaque scénario le débit (req/s) et les latences p50 / p95.
+
+usage : python scripts/load_test.py [--url http://127.0.0.1:8050] [-n 200] [-c 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+NAV_BUTTONS = ["btn-about", "btn-histogram", "btn-choropleth", "btn-graph", "btn-authors"]
+CARTE_YEARS = [2024, 2023, 2022, 2021, 2020]
+RADAR_YEARS = [2023, 2021]
+
+
+def _nav_payload(button: str) -> dict:
+    return {
+        "output": "page-content.children",
+        "outputs": {"id": "page-content", "property": "children"},
+        "inputs": [
+            {"id": b, "property": "n_clicks", "value": 1 if b == button else None}
+            for b in NAV_BUTTONS
+        ],
+        "changedPropIds": [f"{button}.n_clicks"],
+        "state": [],
+    }
+
+
+def _year_payload(output: str, outputs: list, kind: str, years: list[int], year: int) -> dict:
+    buttons = [{"type": kind, "year": y} for y in years]
+    return {
+        "output": output,
+        "outputs": [*outputs, [{"id": b, "property": "style"} for b in buttons]],
+        "inputs": [
+            [
+                {"id": b, "property": "n_clicks", "value": 1 if b["year"] == year else 0}
+                for b in buttons
+            ]
+        ],
+        "state": [[{"id": b, "property": "id", "value": b} for b in buttons]],
+        "changedPropIds": [f'{{"type":"{kind}","year":{year}}}.n_clicks'],
+    }
+
+
+def _dependencies(session: requests.Session, url: str) -> dict[str, str]:
+    """id de sortie (tel que dash l'attend) des callbacks testés."""
+    deps = session.get(f"{url}/_dash-dependencies", timeout=30).json()
+    outputs = {}
+    for dep in deps:
+        if '"carte-year"' in dep["output"]:
+            outputs["carte"] = dep["output"]
+        elif '"radar-year"' in dep["output"]:
+            outputs["radar"] = dep["output"]
+    return outputs
+
+
+def _scenarios(session: requests.Session, url: str) -> dict:
+    session.get(f"{url}/_dash-layout", timeout=30).raise_for_status()
+    outputs = _dependencies(session, url)
+    # états de update_carte_year après les ids des boutons, dans l'ordre du callback
+    carte_states = [
+        {"id": "carte-mode-flag", "property": "children", "value": "dept"},
+        {"id": "carte-viewport", "property": "data", "value": None},
+        {"id": "carte-grav", "property": "value", "value": "all"},
+        {"id": "carte-reference", "property": "value", "value": "precedente"},
+    ]
+    carte_outputs = [
+        {"id": "carte-graph", "property": "figure"},
+        {"id": "carte-year-flag", "property": "children"},
+    ]
+
+    def carte(i: int):
+        payload = _year_payload(
+            outputs["carte"], carte_outputs, "carte-year", CARTE_YEARS, CARTE_YEARS[i % 5]
+        )
+        payload["state"].extend(carte_states)
+        return session.post(f"{url}/_dash-update-component", json=payload, timeout=120)
+
+    def radar(i: int):
+        payload = _year_payload(
+            outputs["radar"],
+            [
+                {"id": "histogram-graph", "property": "figure"},
+                {"id": "radar-map", "property": "figure"},
+            ],
+            "radar-year",
+            RADAR_YEARS,
+            RADAR_YEARS[i % 2],
+        )
+        return session.post(f"{url}/_dash-update-component", json=payload, timeout=120)
+
+    def nav(i: int):
+        payload = _nav_payload(NAV_BUTTONS[i % len(NAV_BUTTONS)])
+        return session.post(f"{url}/_dash-update-component", json=payload, timeout=120)
+
+    return {
+        "layout": lambda i: session.get(f"{url}/_dash-layout", timeout=30),
+        "navigation": nav,
+        "carte (année)": carte,
+        "histogramme (année)": radar,
+    }
+
+
+def run(url: str, n_requests: int, concurrency: int) -> None:
+    """lance chaque scénario `n_requests` fois avec `concurrency` requêtes simultanées."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    print(f"{url} : {n_requests} requêtes par scénario, concurrence {concurrency}")
+    print(f"{'scénario':<22}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'erreurs':>9}")
+    for name, request in _scenarios(session, url).items():
+        latencies: list[float] = []
+        errors = 0
+
+        def timed(i: int, request=request):
+            t = time.perf_counter()
+            response = request(i)
+            return time.perf_counter() - t, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for latency, status in pool.map(timed, range(n_requests)):
+                latencies.append(latency)
+                errors += status >= 400
+        elapsed = time.perf_counter() - start
+        q = statistics.quantiles(latencies, n=20)
+        print(
+            f"{name:<22}{n_requests / elapsed:>8.1f}{q[9] * 1000:>9.0f}"
+            f"{q[18] * 1000:>9.0f}{errors:>9d}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8050")
+    parser.add_argument("-n", "--requests", type=int, default=200)
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    run(args.url.rstrip("/"), args.requests, args.concurrency)
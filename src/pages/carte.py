@@ -2,9 +2,7 @@
 
 from __future__ import annotations
 
-from functools import lru_cache
 from pathlib import Path
-import json
 
 from flask import Blueprint, render_template, request
 import pandas as pd
@@ -18,20 +16,23 @@ except ImportError:  # pragma: no cover
         """stub pour pylint en absence du module au linting."""
         raise ImportError("src.utils.get_data introuvable")
 
+from src.utils.geometry import LAYER_PATHS, get_layer
+
 # déclaration du blueprint flask
 carte_bp = Blueprint("carte", __name__, url_prefix="/carte")
 
 # chemin absolu vers le geojson
 ROOT = Path(__file__).resolve().parents[2]
-GEOJSON_DEPTS_PATH = ROOT / "departements-version-simplifiee.geojson"
+GEOJSON_DEPTS_PATH = LAYER_PATHS["dept"]
 
 
 # --- fonctions utilitaires ---
-@lru_cache(maxsize=1)
 def _load_departements_geojson() -> dict:
-    """charge une seule fois le geojson des départements."""
-    with GEOJSON_DEPTS_PATH.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    """geojson des départements, lu une seule fois via le registre des géométries."""
+    layer = get_layer("dept")
+    if layer is None:
+        raise FileNotFoundError(GEOJSON_DEPTS_PATH)
+    return layer.geojson
 
 
 def _detect_featureidkey(geojson: dict) -> str:
@@ -7,21 +7,33 @@ from __future__ import annotations
 from pathlib import Path
 import sys
 import json
+import math
 import re
+import time
 
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash.exceptions import PreventUpdate
+from sqlalchemy.exc import OperationalError
+from dash import (
+    ALL,
+    html,
+    dcc,
+    callback,
+    clientside_callback,
+    ClientsideFunction,
+    Input,
+    Output,
+    Patch,
+    State,
+)
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 
 # permettre l'import absolu de src.utils
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 ROOT = Path(__file__).resolve().parents[2]
-GEOJSON_PATH = ROOT / "departements-version-simplifiee.geojson"
-COMMUNES_GEOJSON_PATH = ROOT / "communes.geojson"
-REGIONS_GEOJSON_PATH = ROOT / "regions-version-simplifiee.geojson"
 
 # import absolu avec repli pour le lint
 try:
@@ -31,257 +43,23 @@ except ImportError:  # pragma: no cover
     def query_db(*_args, **_kwargs):
         raise ImportError("src.utils.get_data introuvable")
 
+from src.utils import grid, raster, spatial
+from src.utils.cache import cache_stats, memoize
+from src.utils.geo_codes import DELTA_REFERENCES, DEPT_NAMES, REGION_NAMES, aggregate_counts
+from src.utils.geometry import LAYER_PATHS, geometry_url, get_layer, level_for_scale
+from src.utils.hotspots import HOTSPOT_TABLE
+from src.utils.parallel import map_years
+from src.utils.prerender import load_prerender, write_prerender
+from src.utils.quantile_sketch import SKETCH_TABLE, SketchCube
+from src.utils.radar_stats import RADAR_STATS_TABLE
+from src.utils.setup_progress import setup_running, setup_snapshot
+
 try:
     from src.pages import about  # type: ignore
 except ImportError:  # pragma: no cover
     about = None
 
-
-# mapping département -> région (codes régions 2016)
-DEPT_TO_REGION: dict[str, str] = {
-    # Auvergne-Rhône-Alpes (84)
-    "01": "84",
-    "03": "84",
-    "07": "84",
-    "15": "84",
-    "26": "84",
-    "38": "84",
-    "42": "84",
-    "43": "84",
-    "63": "84",
-    "69": "84",
-    "73": "84",
-    "74": "84",
-    # Bourgogne-Franche-Comté (27)
-    "21": "27",
-    "25": "27",
-    "39": "27",
-    "58": "27",
-    "70": "27",
-    "71": "27",
-    "89": "27",
-    "90": "27",
-    # Bretagne (53)
-    "22": "53",
-    "29": "53",
-    "35": "53",
-    "56": "53",
-    # Centre-Val de Loire (24)
-    "18": "24",
-    "28": "24",
-    "36": "24",
-    "37": "24",
-    "41": "24",
-    "45": "24",
-    # Corse (94)
-    "2A": "94",
-    "2B": "94",
-    # Grand Est (44)
-    "08": "44",
-    "10": "44",
-    "51": "44",
-    "52": "44",
-    "54": "44",
-    "55": "44",
-    "57": "44",
-    "67": "44",
-    "68": "44",
-    "88": "44",
-    # Hauts-de-France (32)
-    "02": "32",
-    "59": "32",
-    "60": "32",
-    "62": "32",
-    "80": "32",
-    # Île-de-France (11)
-    "75": "11",
-    "77": "11",
-    "78": "11",
-    "91": "11",
-    "92": "11",
-    "93": "11",
-    "94": "11",
-    "95": "11",
-    # Normandie (28)
-    "14": "28",
-    "27": "28",
-    "50": "28",
-    "61": "28",
-    "76": "28",
-    # Nouvelle-Aquitaine (75)
-    "16": "75",
-    "17": "75",
-    "19": "75",
-    "23": "75",
-    "24": "75",
-    "33": "75",
-    "40": "75",
-    "47": "75",
-    "64": "75",
-    "79": "75",
-    "86": "75",
-    "87": "75",
-    # Occitanie (76)
-    "09": "76",
-    "11": "76",
-    "12": "76",
-    "30": "76",
-    "31": "76",
-    "32": "76",
-    "34": "76",
-    "46": "76",
-    "48": "76",
-    "65": "76",
-    "66": "76",
-    "81": "76",
-    "82": "76",
-    # Pays de la Loire (52)
-    "44": "52",
-    "49": "52",
-    "53": "52",
-    "72": "52",
-    "85": "52",
-    # Provence-Alpes-Côte d'Azur (93)
-    "04": "93",
-    "05": "93",
-    "06": "93",
-    "13": "93",
-    "83": "93",
-    "84": "93",
-    # Outre-mer
-    "971": "01",
-    "972": "02",
-    "973": "03",
-    "974": "04",
-    "976": "06",
-}
-
-# noms des régions (codes 2016)
-REGION_NAMES: dict[str, str] = {
-    "84": "Auvergne-Rhône-Alpes",
-    "27": "Bourgogne-Franche-Comté",
-    "53": "Bretagne",
-    "24": "Centre-Val de Loire",
-    "94": "Corse",
-    "44": "Grand Est",
-    "32": "Hauts-de-France",
-    "11": "Île-de-France",
-    "28": "Normandie",
-    "75": "Nouvelle-Aquitaine",
-    "76": "Occitanie",
-    "52": "Pays de la Loire",
-    "93": "Provence-Alpes-Côte d'Azur",
-    "01": "Guadeloupe",
-    "02": "Martinique",
-    "03": "Guyane",
-    "04": "La Réunion",
-    "06": "Mayotte",
-}
-
-# noms des départements
-DEPT_NAMES: dict[str, str] = {
-    "01": "Ain",
-    "02": "Aisne",
-    "03": "Allier",
-    "04": "Alpes-de-Haute-Provence",
-    "05": "Hautes-Alpes",
-    "06": "Alpes-Maritimes",
-    "07": "Ardèche",
-    "08": "Ardennes",
-    "09": "Ariège",
-    "10": "Aube",
-    "11": "Aude",
-    "12": "Aveyron",
-    "13": "Bouches-du-Rhône",
-    "14": "Calvados",
-    "15": "Cantal",
-    "16": "Charente",
-    "17": "Charente-Maritime",
-    "18": "Cher",
-    "19": "Corrèze",
-    "21": "Côte-d'Or",
-    "22": "Côtes-d'Armor",
-    "23": "Creuse",
-    "24": "Dordogne",
-    "25": "Doubs",
-    "26": "Drôme",
-    "27": "Eure",
-    "28": "Eure-et-Loir",
-    "29": "Finistère",
-    "2A": "Corse-du-Sud",
-    "2B": "Haute-Corse",
-    "30": "Gard",
-    "31": "Haute-Garonne",
-    "32": "Gers",
-    "33": "Gironde",
-    "34": "Hérault",
-    "35": "Ille-et-Vilaine",
-    "36": "Indre",
-    "37": "Indre-et-Loire",
-    "38": "Isère",
-    "39": "Jura",
-    "40": "Landes",
-    "41": "Loir-et-Cher",
-    "42": "Loire",
-    "43": "Haute-Loire",
-    "44": "Loire-Atlantique",
-    "45": "Loiret",
-    "46": "Lot",
-    "47": "Lot-et-Garonne",
-    "48": "Lozère",
-    "49": "Maine-et-Loire",
-    "50": "Manche",
-    "51": "Marne",
-    "52": "Haute-Marne",
-    "53": "Mayenne",
-    "54": "Meurthe-et-Moselle",
-    "55": "Meuse",
-    "56": "Morbihan",
-    "57": "Moselle",
-    "58": "Nièvre",
-    "59": "Nord",
-    "60": "Oise",
-    "61": "Orne",
-    "62": "Pas-de-Calais",
-    "63": "Puy-de-Dôme",
-    "64": "Pyrénées-Atlantiques",
-    "65": "Hautes-Pyrénées",
-    "66": "Pyrénées-Orientales",
-    "67": "Bas-Rhin",
-    "68": "Haut-Rhin",
-    "69": "Rhône",
-    "70": "Haute-Saône",
-    "71": "Saône-et-Loire",
-    "72": "Sarthe",
-    "73": "Savoie",
-    "74": "Haute-Savoie",
-    "75": "Paris",
-    "76": "Seine-Maritime",
-    "77": "Seine-et-Marne",
-    "78": "Yvelines",
-    "79": "Deux-Sèvres",
-    "80": "Somme",
-    "81": "Tarn",
-    "82": "Tarn-et-Garonne",
-    "83": "Var",
-    "84": "Vaucluse",
-    "85": "Vendée",
-    "86": "Vienne",
-    "87": "Haute-Vienne",
-    "88": "Vosges",
-    "89": "Yonne",
-    "90": "Territoire de Belfort",
-    "91": "Essonne",
-    "92": "Hauts-de-Seine",
-    "93": "Seine-Saint-Denis",
-    "94": "Val-de-Marne",
-    "95": "Val-d'Oise",
-    "971": "Guadeloupe",
-    "972": "Martinique",
-    "973": "Guyane",
-    "974": "La Réunion",
-    "976": "Mayotte",
-}
+from src.pages.setup import render_setup_page
 
 
 # ============================================================================
@@ -289,6 +67,7 @@ DEPT_NAMES: dict[str, str] = {
 # ============================================================================
 
 
+@memoize()
 def _available_years() -> list[int]:
     """Retourne la liste des années disponibles selon les tables 'caracteristiques_YYYY'."""
     try:
@@ -306,6 +85,7 @@ def _available_years() -> list[int]:
         return [2023, 2021]
 
 
+@memoize()
 def _available_radar_years() -> list[int]:
     """Retourne la liste des années avec données radars disponibles."""
     try:
@@ -330,13 +110,16 @@ def _compute_radar_delta_bounds() -> tuple[float, float]:
         years = _available_radar_years()
         mins: list[float] = []
         maxs: list[float] = []
-        for y in years:
+
+        def _bounds_one(y: int) -> pd.DataFrame:
             table = f"radars_{y}"
             sql = (
                 f"SELECT MIN(mesure - limite) AS min_d, MAX(mesure - limite) AS max_d "
                 f"FROM {table} WHERE mesure IS NOT NULL AND limite IS NOT NULL"
             )
-            df = query_db(sql)
+            return query_db(sql)
+
+        for _, df in map_years(_bounds_one, years):
             if df is not None and not df.empty:
                 min_d = df.iloc[0].get("min_d")
                 max_d = df.iloc[0].get("max_d")
@@ -365,15 +148,70 @@ def _compute_radar_delta_bounds() -> tuple[float, float]:
 # ============================================================================
 
 
+def _figure_patch(
+    fig: go.Figure,
+    trace_keys: tuple[str, ...],
+    n_traces: int = 1,
+    layout_paths: tuple[tuple[str, ...], ...] = (),
+) -> Patch:
+    """patch ne remplaçant que les tableaux de données d'une figure déjà affichée.
+
+    le thème, les hovertemplates et la mise en page restent ceux de la figure
+    initiale du navigateur ; seuls `data[i].<clé>`, le titre, les annotations
+    (message « aucune donnée » / erreur) et les chemins de `layout_paths` sont envoyés.
+    """
+    patched = Patch()
+    for i in range(n_traces):
+        trace = fig.data[i] if i < len(fig.data) else None
+        if trace is not None:
+            patched["data"][i]["type"] = trace.type
+        for key in trace_keys:
+            value = trace[key] if trace is not None else None
+            patched["data"][i][key] = [] if value is None else list(value)
+    layout = fig.to_plotly_json()["layout"]
+    title = layout.get("title", {}).get("text")
+    if title is not None:
+        patched["layout"]["title"]["text"] = title
+    patched["layout"]["annotations"] = layout.get("annotations", [])
+    for path in layout_paths:
+        value = layout
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        target = patched["layout"]
+        for part in path[:-1]:
+            target = target[part]
+        target[path[-1]] = value
+    return patched
+
+
+def _choropleth_counts(niveau: str, year) -> pd.DataFrame:
+    """nombre d'accidents par code (commune, dept ou region) pour une année.
+
+    lit la table `choropleth_counts` construite par load_to_db ; sur une base
+    antérieure à cette table, l'agrégat est calculé à la volée.
+    """
+    try:
+        return query_db(
+            "SELECT code, accidents FROM choropleth_counts "
+            "WHERE niveau = :niveau AND annee = :annee",
+            {"niveau": niveau, "annee": int(year)},
+        )
+    except OperationalError:
+        df = query_db(
+            f"SELECT dep, com, COUNT(*) AS accidents FROM caracteristiques_{int(year)} "
+            "GROUP BY dep, com"
+        )
+        return aggregate_counts(df, niveau)
+
+
 def _make_departments_choropleth(year=2023):
     """carte choroplèthe par département."""
     try:
-        with GEOJSON_PATH.open("r", encoding="utf-8") as f:
-            geojson = json.load(f)
+        layer = get_layer("dept")
+        if layer is None:
+            raise OSError(f"fichier geojson manquant : {LAYER_PATHS['dept'].name}")
 
-        table_name = f"caracteristiques_{year}"
-        sql = f"SELECT dep AS dept, COUNT(*) AS accidents " f"FROM {table_name} GROUP BY dep"
-        df = query_db(sql)
+        df = _choropleth_counts("dept", year).rename(columns={"code": "dept"})
 
         if df is None or df.empty:
             fig = go.Figure()
@@ -387,12 +225,15 @@ def _make_departments_choropleth(year=2023):
             )
             return fig
 
-        df["dept"] = df["dept"].astype(str).str.zfill(2)
+        # codes sans géométrie : invisibles sur la carte, inutile de les envoyer
+        df = df[df["dept"].isin(layer.codes)]
         df["nom"] = df["dept"].map(DEPT_NAMES).fillna(df["dept"])
 
+        import plotly.express as px  # import différé : coûteux, inutile au démarrage
+
         fig = px.choropleth(
             df,
-            geojson=geojson,
+            geojson=geometry_url("dept"),
             locations="dept",
             color="accidents",
             featureidkey="properties.code",
@@ -406,6 +247,7 @@ def _make_departments_choropleth(year=2023):
         fig.update_layout(
             height=600,
             margin={"l": 0, "r": 0, "t": 40, "b": 0},
+            uirevision="carte",  # garder le zoom lors des mises à jour partielles
             template="plotly_dark",
             paper_bgcolor="#181d31",
             plot_bgcolor="#14192a",
@@ -427,10 +269,109 @@ def _make_departments_choropleth(year=2023):
         return fig
 
 
-def _make_communes_choropleth(year=2023):
-    """carte choroplèthe par commune (gère les arrondissements)."""
+# variation affichée bornée à ±100 % : une zone à très faible effectif ne
+# doit pas écraser l'échelle (la valeur exacte reste dans l'infobulle)
+VARIATION_CLIP = 100
+
+
+@memoize()
+def _make_variation_map(year=2023, reference="precedente"):
+    """carte de la variation des accidents par département (table choropleth_deltas).
+
+    reference: "precedente" (année disponible précédente) ou "moyenne" (moyenne des
+    années) ; échelle divergente centrée sur 0 %.
+    """
+    try:
+        layer = get_layer("dept")
+        if layer is None:
+            raise OSError(f"fichier geojson manquant : {LAYER_PATHS['dept'].name}")
+        reference = reference if reference in DELTA_REFERENCES else "precedente"
+
+        df = query_db(
+            "SELECT code AS dept, annee_reference, accidents, reference_accidents, ecart, ratio "
+            "FROM choropleth_deltas "
+            "WHERE niveau = 'dept' AND reference = :reference AND annee = :annee",
+            {"reference": reference, "annee": int(year)},
+        )
+        df = df[df["dept"].isin(layer.codes) & df["ratio"].notna()]
+        if reference == "moyenne":
+            years = _available_years()
+            ref_label = f"MOYENNE {years[0]}-{years[-1]}" if years else "MOYENNE"
+        elif not df.empty:
+            ref_label = str(int(df["annee_reference"].iloc[0]))
+        else:
+            ref_label = "ANNÉE PRÉCÉDENTE"
+        df["variation"] = ((df["ratio"] - 1) * 100).round(1)
+        df["variation_affichee"] = df["variation"].clip(-VARIATION_CLIP, VARIATION_CLIP)
+        df["nom"] = df["dept"].map(DEPT_NAMES).fillna(df["dept"])
+
+        # trace go.Choropleth toujours présente, même vide (première année) : les
+        # patchs d'année et de référence ne renvoient que locations/z/hovertext/customdata
+        fig = go.Figure(
+            go.Choropleth(
+                geojson=geometry_url("dept"),
+                featureidkey="properties.code",
+                locations=df["dept"],
+                z=df["variation_affichee"],
+                zmin=-VARIATION_CLIP,
+                zmax=VARIATION_CLIP,
+                colorscale=[[0, "#01d084"], [0.5, "#1a2035"], [1, "#ff57c2"]],
+                colorbar={"title": {"text": "variation (%)"}},
+                hovertext=df["nom"],
+                customdata=df[["dept", "accidents", "reference_accidents", "ecart", "variation"]],
+                hovertemplate=(
+                    "<b>%{hovertext}</b><br><br>dept=%{customdata[0]}"
+                    "<br>accidents=%{customdata[1]}"
+                    "<br>référence=%{customdata[2]:.1f}"
+                    "<br>écart=%{customdata[3]:+.1f}"
+                    "<br>variation (%)=%{customdata[4]:+.1f}<extra></extra>"
+                ),
+            )
+        )
+        fig.update_geos(fitbounds="locations", visible=False, projection_type="mercator")
+        fig.update_layout(
+            title=f"VARIATION DES ACCIDENTS PAR DÉPARTEMENT - {year} VS {ref_label}",
+            height=600,
+            margin={"l": 0, "r": 0, "t": 40, "b": 0},
+            uirevision="carte",  # garder le zoom lors des mises à jour partielles
+            template="plotly_dark",
+            paper_bgcolor="#181d31",
+            plot_bgcolor="#14192a",
+            font={"color": "#e6e9f2"},
+        )
+        if df.empty:
+            fig.add_annotation(
+                text="aucune année de référence disponible",
+                xref="paper",
+                yref="paper",
+                x=0.5,
+                y=0.5,
+                showarrow=False,
+            )
+        return fig
+    except Exception as err:
+        print(f"erreur carte des variations : {err}")
+        fig = go.Figure()
+        fig.add_annotation(
+            text=f"erreur : {str(err)[:100]}",
+            xref="paper",
+            yref="paper",
+            x=0.5,
+            y=0.5,
+            showarrow=False,
+        )
+        return fig
+
+
+def _make_communes_choropleth(year=2023, level: str | None = None):
+    """carte choroplèthe par commune (gère les arrondissements).
+
+    level: niveau de détail des contours ("low" | "medium" | "high"), par défaut
+    celui de la vue france entière.
+    """
     try:
-        if not COMMUNES_GEOJSON_PATH.exists():
+        layer = get_layer("commune", level or level_for_scale(None))
+        if layer is None:
             fig = go.Figure()
             fig.add_annotation(
                 text="fichier communes.geojson non trouvé",
@@ -442,17 +383,7 @@ def _make_communes_choropleth(year=2023):
             )
             return fig
 
-        with COMMUNES_GEOJSON_PATH.open("r", encoding="utf-8") as f:
-            geojson = json.load(f)
-
-        table_name = f"caracteristiques_{year}"
-        sql = (
-            f"SELECT com AS code_commune, COUNT(*) AS accidents "
-            f"FROM {table_name} "
-            f"WHERE com IS NOT NULL "
-            f"GROUP BY com"
-        )
-        df = query_db(sql)
+        df = _choropleth_counts("commune", year).rename(columns={"code": "code_commune"})
 
         if df is None or df.empty:
             fig = go.Figure()
@@ -466,30 +397,13 @@ def _make_communes_choropleth(year=2023):
             )
             return fig
 
-        # Convertir code commune en string et padding
-        df["code_commune"] = df["code_commune"].astype(str).str.zfill(5)
-
-        # Mapping des arrondissements vers codes INSEE commune
-        # Paris: 75101-75120 -> 75056
-        # Lyon: 69381-69389 -> 69123
-        # Marseille: 13201-13216 -> 13055
-        arrondissement_map = {}
-        for i in range(1, 21):  # Paris 20 arrondissements
-            arrondissement_map[f"751{i:02d}"] = "75056"
-        for i in range(1, 10):  # Lyon 9 arrondissements
-            arrondissement_map[f"6938{i}"] = "69123"
-        for i in range(1, 17):  # Marseille 16 arrondissements
-            arrondissement_map[f"132{i:02d}"] = "13055"
-
-        # Appliquer le mapping
-        df["code_commune"] = df["code_commune"].apply(lambda x: arrondissement_map.get(x, x))
+        df = df[df["code_commune"].isin(layer.codes)]
 
-        # Agréger les accidents après transformation (pour grouper les arrondissements)
-        df = df.groupby("code_commune", as_index=False).agg({"accidents": "sum"})
+        import plotly.express as px  # import différé : coûteux, inutile au démarrage
 
         fig = px.choropleth(
             df,
-            geojson=geojson,
+            geojson=geometry_url("commune", layer.level),
             locations="code_commune",
             color="accidents",
             featureidkey="properties.code",
@@ -504,6 +418,7 @@ def _make_communes_choropleth(year=2023):
         fig.update_layout(
             height=600,
             margin={"l": 0, "r": 0, "t": 40, "b": 0},
+            uirevision="carte",  # garder le zoom lors des mises à jour partielles
             template="plotly_dark",
             paper_bgcolor="#181d31",
             plot_bgcolor="#14192a",
@@ -527,7 +442,8 @@ def _make_communes_choropleth(year=2023):
 def _make_regions_choropleth(year=2023):
     """carte choroplèthe par région (agrégation par code région 2016)."""
     try:
-        if not REGIONS_GEOJSON_PATH.exists():
+        layer = get_layer("region")
+        if layer is None:
             fig = go.Figure()
             fig.add_annotation(
                 text="fichier regions geojson manquant",
@@ -539,12 +455,7 @@ def _make_regions_choropleth(year=2023):
             )
             return fig
 
-        with REGIONS_GEOJSON_PATH.open("r", encoding="utf-8") as f:
-            geojson = json.load(f)
-
-        table_name = f"caracteristiques_{year}"
-        sql = f"SELECT dep AS dept, COUNT(*) AS accidents FROM {table_name} GROUP BY dep"
-        df = query_db(sql)
+        df = _choropleth_counts("region", year).rename(columns={"code": "region"})
 
         if df is None or df.empty:
             fig = go.Figure()
@@ -558,22 +469,14 @@ def _make_regions_choropleth(year=2023):
             )
             return fig
 
-        df["dept"] = df["dept"].astype(str).str.strip().str.upper().str.zfill(2)
-        # préserver 971..976
-        df.loc[df["dept"].str.len() == 3, "dept"] = df.loc[df["dept"].str.len() == 3, "dept"]
-
-        def _map_region(dep: str) -> str | None:
-            return DEPT_TO_REGION.get(dep)
-
-        df["region"] = df["dept"].apply(_map_region)
-        df = (
-            df.dropna(subset=["region"]).groupby("region", as_index=False).agg({"accidents": "sum"})
-        )
+        df = df[df["region"].isin(layer.codes)]
         df["nom"] = df["region"].map(REGION_NAMES).fillna(df["region"])
 
+        import plotly.express as px  # import différé : coûteux, inutile au démarrage
+
         fig = px.choropleth(
             df,
-            geojson=geojson,
+            geojson=geometry_url("region"),
             locations="region",
             color="accidents",
             featureidkey="properties.code",
@@ -588,6 +491,7 @@ def _make_regions_choropleth(year=2023):
         fig.update_layout(
             height=600,
             margin={"l": 0, "r": 0, "t": 40, "b": 0},
+            uirevision="carte",  # garder le zoom lors des mises à jour partielles
             template="plotly_dark",
             paper_bgcolor="#181d31",
             plot_bgcolor="#14192a",
@@ -608,6 +512,7 @@ def _make_regions_choropleth(year=2023):
         return fig
 
 
+@memoize()
 def _make_speed_histogram(year=2023):
     """histogramme des écarts de vitesse."""
     try:
@@ -678,6 +583,8 @@ def _make_speed_histogram(year=2023):
         except Exception:
             x_lo, x_hi = -60.0, 60.0
 
+        import plotly.express as px  # import différé : coûteux, inutile au démarrage
+
         fig = px.histogram(
             df,
             x="delta_v",
@@ -766,151 +673,64 @@ def _make_speed_histogram(year=2023):
         return fig
 
 
-def _make_time_series(
-    year=2023,
-    agg_filter: int | str | None = None,
-    lum_filter: int | str | None = None,
-    atm_filter: int | str | None = None,
-    unit: str = "hour",
-    sexe_filter: int | None = None,
-    trajet_filter: int | None = None,
-    grav_filter: int | None = None,
-    birth_year_min: int | None = None,
-    birth_year_max: int | None = None,
-    catv_filter: int | None = None,
-    motor_filter: int | None = None,
-):
-    """courbe : évolution du nombre d'accidents par heure/jour/mois/jour de semaine.
-
-    unit: "hour" | "day" | "month" | "weekday"
-    year: 2020..2024 | "all" pour agréger plusieurs années.
-    agg_filter: 1 (agglomération) | 2 (hors agglomération)
-    lum_filter: 1-5 (conditions de luminosité)
-    usager filters: sexe (1/2), trajet (int), grav (1-4), age range
-    """
+@memoize()
+def _make_radar_map(year=2023):
+    """carte des radars : une marque par (emplacement, limite), table radar_stats."""
     try:
-        unit = unit or "hour"
-        unit = unit.lower()
-
-        def _query_one(y: int) -> pd.DataFrame:
-            need_join = any(
-                v is not None
-                for v in (
-                    sexe_filter,
-                    trajet_filter,
-                    grav_filter,
-                    birth_year_min,
-                    birth_year_max,
-                    catv_filter,
-                    motor_filter,
-                )
+        df = query_db(
+            "SELECT lat, lon, limite, mesures, part_exces, exces_moyen, p95_delta_v "
+            f"FROM {RADAR_STATS_TABLE} WHERE annee = :annee",
+            {"annee": int(year)},
+        )
+        fig = go.Figure(
+            go.Scattergeo(
+                lon=df["lon"],
+                lat=df["lat"],
+                mode="markers",
+                marker={
+                    # surface proportionnelle au nombre de mesures
+                    "size": (df["mesures"] / max(df["mesures"].max(), 1)) ** 0.5 * 18 + 3,
+                    "color": df["part_exces"] * 100,
+                    "colorscale": [[0, "#01d084"], [0.5, "#f093fb"], [1, "#ff57c2"]],
+                    "cmin": 0,
+                    "cmax": 100,
+                    "colorbar": {"title": {"text": "% en excès"}},
+                    "line": {"width": 0},
+                    "opacity": 0.85,
+                },
+                customdata=df[["limite", "mesures", "exces_moyen", "p95_delta_v"]],
+                hovertemplate=(
+                    "<b>limite %{customdata[0]} km/h</b><br>"
+                    "mesures : %{customdata[1]}<br>"
+                    "en excès : %{marker.color:.1f} %<br>"
+                    "excès moyen : %{customdata[2]:.1f} km/h<br>"
+                    "p95 écart : %{customdata[3]:.1f} km/h<extra></extra>"
+                ),
             )
-            table_name = f"caract_usager_vehicule_{y}" if need_join else f"caracteristiques_{y}"
-            # Les colonnes lum et atm sont toujours dans caracteristiques, donc OK
-            params: dict = {}
-            where_parts = []
-
-            if unit == "hour":
-                select_x = "CAST(SUBSTR(heure,1,2) AS INTEGER) AS x"
-                where_parts.append("heure IS NOT NULL")
-            elif unit == "day":
-                select_x = "CAST(jour AS INTEGER) AS x"
-                where_parts.append("jour IS NOT NULL")
-            elif unit == "month":
-                select_x = "CAST(mois AS INTEGER) AS x"
-                where_parts.append("mois IS NOT NULL")
-            elif unit == "weekday":
-                # On récupère jour et mois, puis on calcule le jour de semaine côté Python
-                select_x = None
-                where_parts.extend(["jour IS NOT NULL", "mois IS NOT NULL"])
-            else:
-                select_x = "CAST(SUBSTR(heure,1,2) AS INTEGER) AS x"
-                where_parts.append("heure IS NOT NULL")
-
-            if agg_filter in (1, 2):
-                where_parts.append("CAST(agg AS INTEGER) = :agg")
-                params["agg"] = agg_filter
-
-            if lum_filter in (1, 2, 3, 4, 5):
-                where_parts.append("CAST(lum AS INTEGER) = :lum")
-                params["lum"] = lum_filter
-            if atm_filter in (1, 2, 3, 4, 5, 6, 7, 8, 9):
-                where_parts.append("CAST(atm AS INTEGER) = :atm")
-                params["atm"] = atm_filter
-
-            # usager filters
-            if sexe_filter is not None:
-                where_parts.append("CAST(sexe AS INTEGER) = :sexe")
-                params["sexe"] = sexe_filter
-            if trajet_filter is not None:
-                where_parts.append("CAST(trajet AS INTEGER) = :trajet")
-                params["trajet"] = trajet_filter
-            if grav_filter is not None:
-                where_parts.append("CAST(grav AS INTEGER) = :grav")
-                params["grav"] = grav_filter
-            if (birth_year_min is not None) and (birth_year_max is not None):
-                where_parts.append(
-                    "CAST(an_nais AS INTEGER) BETWEEN :birth_year_min AND :birth_year_max"
-                )
-                params["birth_year_min"] = birth_year_min
-                params["birth_year_max"] = birth_year_max
-
-            # vehicule filters
-            if catv_filter is not None:
-                where_parts.append("CAST(catv AS INTEGER) = :catv")
-                params["catv"] = catv_filter
-            if motor_filter is not None:
-                where_parts.append("CAST(motor AS INTEGER) = :motor")
-                params["motor"] = motor_filter
-
-            where_clause = " AND ".join(where_parts) if where_parts else "1=1"
-            if unit == "weekday":
-                sql = (
-                    "SELECT CAST(mois AS INTEGER) AS mois, "
-                    "CAST(jour AS INTEGER) AS jour, COUNT(*) AS accidents "
-                    f"FROM {table_name} WHERE {where_clause} "
-                    "GROUP BY mois, jour ORDER BY mois, jour"
-                )
-                df = query_db(sql, params)
-                if df is None or df.empty:
-                    return df
-                # Calculer le jour de semaine (lundi=1 .. dimanche=7)
-                df["mois"] = pd.to_numeric(df["mois"], errors="coerce")
-                df["jour"] = pd.to_numeric(df["jour"], errors="coerce")
-                df = df.dropna(subset=["mois", "jour"]).copy()
-                df["mois"] = df["mois"].astype(int)
-                df["jour"] = df["jour"].astype(int)
-                # Construire des dates avec l'année courante y
-                dates = pd.to_datetime(
-                    {"year": y, "month": df["mois"], "day": df["jour"]}, errors="coerce"
-                )
-                dow = dates.dt.dayofweek  # 0=lundi .. 6=dimanche
-                df = df.assign(x=dow + 1)  # 1..7
-                df = df.groupby("x", as_index=False).agg({"accidents": "sum"})
-                return df
-            else:
-                sql = (
-                    f"SELECT {select_x}, COUNT(*) AS accidents "
-                    f"FROM {table_name} WHERE {where_clause} "
-                    f"GROUP BY x ORDER BY x"
-                )
-                return query_db(sql, params)
-
-        show_leg = False
-        overlay_sets: list[tuple[int, pd.DataFrame]] = []
-        if isinstance(year, str) and year == "all":
-            for y in sorted(_available_years()):
-                d = _query_one(y)
-                if d is not None and not d.empty:
-                    overlay_sets.append((y, d.sort_values(by="x")))
-            show_leg = len(overlay_sets) > 1
-        else:
-            d = _query_one(int(year))
-            if d is not None and not d.empty:
-                overlay_sets.append((int(year), d.sort_values(by="x")))
-
-        if not overlay_sets:
-            fig = go.Figure()
+        )
+        fig.update_geos(
+            projection_type="mercator",
+            lonaxis_range=[raster.FRANCE_BBOX[0], raster.FRANCE_BBOX[2]],
+            lataxis_range=[raster.FRANCE_BBOX[1], raster.FRANCE_BBOX[3]],
+            showland=True,
+            landcolor="#14192a",
+            showcoastlines=True,
+            coastlinecolor="#3a4160",
+            showcountries=True,
+            countrycolor="#3a4160",
+            showframe=False,
+            bgcolor="rgba(0,0,0,0)",
+        )
+        fig.update_layout(
+            title=f"RADARS — PART DES MESURES EN EXCÈS ({year})",
+            title_x=0.5,
+            height=550,
+            margin={"l": 0, "r": 0, "t": 50, "b": 0},
+            template="plotly_dark",
+            paper_bgcolor="#181d31",
+            font={"color": "#e6e9f2"},
+        )
+        if df.empty:
             fig.add_annotation(
                 text="aucune donnée disponible",
                 xref="paper",
@@ -919,105 +739,10 @@ def _make_time_series(
                 y=0.5,
                 showarrow=False,
             )
-            return fig
-
-        title_map = {
-            "hour": "évolution du nombre d'accidents par heure",
-            "day": "évolution du nombre d'accidents par jour",
-            "month": "évolution du nombre d'accidents par mois",
-            "weekday": "évolution du nombre d'accidents par jour de semaine",
-        }
-        x_title_map = {
-            "hour": "heure (0-23)",
-            "day": "jour (1-31)",
-            "month": "mois (1-12)",
-            "weekday": "jour de semaine (1=lundi .. 7=dimanche)",
-        }
-        x_range_map = {
-            "hour": [-0.5, 23.5],
-            "day": [0.5, 31.5],
-            "month": [0.5, 12.5],
-            "weekday": [0.5, 7.5],
-        }
-
-        fig = go.Figure()
-        palette = [
-            "#3ae7ff",  # cyan
-            "#ff57c2",  # pink
-            "#7b5cff",  # purple
-            "#01d084",  # green
-            "#f093fb",  # magenta soft
-        ]
-        for idx, (y, dfx) in enumerate(overlay_sets):
-            color = palette[idx % len(palette)]
-            fig.add_trace(
-                go.Scatter(
-                    x=dfx["x"],
-                    y=dfx["accidents"],
-                    mode="lines+markers",
-                    name=str(y),
-                    line={"color": color, "width": 3, "shape": "spline"},
-                    marker={
-                        "size": 8,
-                        "color": color,
-                        "symbol": "circle",
-                        "line": {"color": "#0e111b", "width": 1},
-                    },
-                    # area fill only for single series to avoid stacking confusion
-                    fill="tozeroy" if not show_leg else None,
-                    fillcolor=("rgba(58, 231, 255, 0.12)" if not show_leg else None),
-                    hovertemplate=(f"<b>année {y}</b><br>accidents: <b>%{{y}}</b><extra></extra>"),
-                )
-            )
-        fig.update_layout(
-            title={
-                "text": title_map.get(unit, title_map["hour"]),
-                "x": 0.5,
-                "xanchor": "center",
-                "font": {"size": 18, "color": "#e6e9f2", "family": "Arial, sans-serif"},
-            },
-            xaxis_title=x_title_map.get(unit, x_title_map["hour"]),
-            yaxis_title="nombre d'accidents",
-            height=550,
-            margin={"l": 80, "r": 60, "t": 100, "b": 80},
-            template="plotly_dark",
-            hovermode="x unified",
-            plot_bgcolor="#14192a",
-            paper_bgcolor="#181d31",
-            font={"family": "Arial, sans-serif", "size": 12, "color": "#e6e9f2"},
-            showlegend=show_leg,
-            legend={"orientation": "h", "y": 1.05},
-        )
-        fig.update_xaxes(
-            tickmode="linear",
-            dtick=1,
-            range=x_range_map.get(unit, x_range_map["hour"]),
-            showgrid=True,
-            gridwidth=1,
-            gridcolor="rgba(200, 200, 200, 0.2)",
-            showline=True,
-            linewidth=2,
-            linecolor="#ddd",
-        )
-        if unit == "weekday":
-            fig.update_xaxes(
-                tickmode="array",
-                tickvals=[1, 2, 3, 4, 5, 6, 7],
-                ticktext=["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"],
-                range=[0.5, 7.5],
-            )
-        fig.update_yaxes(
-            showgrid=True,
-            gridwidth=1,
-            gridcolor="rgba(200, 200, 200, 0.2)",
-            showline=True,
-            linewidth=2,
-            linecolor="#ddd",
-        )
         return fig
 
-    except Exception as err:  # type: ignore[used-before-def]
-        print(f"erreur courbe temporelle : {err}")
+    except Exception as err:
+        print(f"erreur carte des radars : {err}")
         fig = go.Figure()
         fig.add_annotation(
             text=f"erreur: {str(err)[:100]}",
@@ -1030,6 +755,252 @@ def _make_time_series(
         return fig
 
 
+@memoize(maxsize=1)
+def _radar_sketches() -> SketchCube:
+    """cube des esquisses de quantiles radar (une seule lecture par génération de base)."""
+    return SketchCube.from_rows(query_db(f"SELECT * FROM {SKETCH_TABLE}"))
+
+
+def _radar_quantiles(year=None, limite=None, heure=None, mois=None) -> dict:
+    """centiles de l'écart de vitesse pour une combinaison de filtres (None = tous)."""
+    try:
+        cube = _radar_sketches()
+        total, values = cube.quantiles(year=year, limite=limite, heure=heure, mois=mois)
+        return {
+            "years": list(cube.years),
+            "limits": list(cube.limits),
+            "total": total,
+            "quantiles": [[q, v] for q, v in values.items()],
+        }
+    except Exception as err:
+        print(f"erreur centiles radar : {err}")
+        return {"years": [], "limits": [], "total": 0, "quantiles": [], "error": str(err)[:100]}
+
+
+def _quantile_summary(result: dict) -> list:
+    """rendu des centiles (p50/p90/p99) et du nombre de mesures fusionnées."""
+    if result.get("error"):
+        return [html.Div(f"erreur : {result['error']}")]
+    if not result["total"]:
+        return [html.Div("aucune mesure pour ces filtres")]
+    return [
+        *(
+            html.Div(
+                [html.Span(f"p{round(q * 100)} "), html.B(f"{v:+d} km/h")],
+                style={"fontSize": "15px", "margin": "4px 0"},
+            )
+            for q, v in result["quantiles"]
+        ),
+        html.Div(
+            f"{result['total']:,} mesures".replace(",", " "),
+            style={"fontSize": "12px", "color": "var(--text-300)", "marginTop": "6px"},
+        ),
+    ]
+
+
+def _quantile_dropdown(component_id: str, label: str, options: list[tuple[str, int]]):
+    """sélecteur (libellé + dropdown « tous ») du panneau des centiles radar."""
+    return html.Div(
+        [
+            html.Label(label, style=FILTER_LABEL_STYLE),
+            dcc.Dropdown(
+                id=component_id,
+                options=[{"label": "tous", "value": "all"}]
+                + [{"label": text, "value": value} for text, value in options],
+                value="all",
+                clearable=False,
+                style={"marginBottom": "8px"},
+            ),
+        ]
+    )
+
+
+# libellés partagés par les figures serveur et le rendu côté navigateur (assets/graph_views.js)
+TS_TITLES: dict[str, str] = {
+    "hour": "évolution du nombre d'accidents par heure",
+    "day": "évolution du nombre d'accidents par jour",
+    "month": "évolution du nombre d'accidents par mois",
+    "weekday": "évolution du nombre d'accidents par jour de semaine",
+}
+TS_X_TITLES: dict[str, str] = {
+    "hour": "heure (0-23)",
+    "day": "jour (1-31)",
+    "month": "mois (1-12)",
+    "weekday": "jour de semaine (1=lundi .. 7=dimanche)",
+}
+TS_X_RANGES: dict[str, list[float]] = {
+    "hour": [-0.5, 23.5],
+    "day": [0.5, 31.5],
+    "month": [0.5, 12.5],
+    "weekday": [0.5, 7.5],
+}
+WEEKDAY_LABELS = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+TS_PALETTE = [
+    "#3ae7ff",  # cyan
+    "#ff57c2",  # pink
+    "#7b5cff",  # purple
+    "#01d084",  # green
+    "#f093fb",  # magenta soft
+]
+
+# tranches d'âge : (libellé, âge min, âge max, couleur néon)
+AGE_TRANCHES: list[tuple[str, int, int, str]] = [
+    ("0-17 ans", 0, 17, "#3ae7ff"),
+    ("18-24 ans", 18, 24, "#4ecfff"),
+    ("25-34 ans", 25, 34, "#5db7ff"),
+    ("35-44 ans", 35, 44, "#6d9fff"),
+    ("45-54 ans", 45, 54, "#7d87ff"),
+    ("55-64 ans", 55, 64, "#8d6fff"),
+    ("65-74 ans", 65, 74, "#9d57ff"),
+    ("75+ ans", 75, 120, "#ad3fff"),
+]
+
+
+def _filter_where(
+    agg_filter: int | str | None = None,
+    lum_filter: int | str | None = None,
+    atm_filter: int | str | None = None,
+    sexe_filter: int | None = None,
+    trajet_filter: int | None = None,
+    grav_filter: int | None = None,
+    birth_year_min: int | None = None,
+    birth_year_max: int | None = None,
+    catv_filter: int | None = None,
+    motor_filter: int | None = None,
+    *,
+    with_birth_years: bool = True,
+) -> tuple[list[str], dict]:
+    """clauses WHERE et paramètres sql correspondant aux filtres de la page graphique."""
+    where_parts: list[str] = []
+    params: dict = {}
+    if agg_filter in (1, 2):
+        where_parts.append("CAST(agg AS INTEGER) = :agg")
+        params["agg"] = agg_filter
+    if lum_filter in (1, 2, 3, 4, 5):
+        where_parts.append("CAST(lum AS INTEGER) = :lum")
+        params["lum"] = lum_filter
+    if atm_filter in (1, 2, 3, 4, 5, 6, 7, 8, 9):
+        where_parts.append("CAST(atm AS INTEGER) = :atm")
+        params["atm"] = atm_filter
+    if sexe_filter is not None:
+        where_parts.append("CAST(sexe AS INTEGER) = :sexe")
+        params["sexe"] = sexe_filter
+    if trajet_filter is not None:
+        where_parts.append("CAST(trajet AS INTEGER) = :trajet")
+        params["trajet"] = trajet_filter
+    if grav_filter is not None:
+        where_parts.append("CAST(grav AS INTEGER) = :grav")
+        params["grav"] = grav_filter
+    if with_birth_years and (birth_year_min is not None) and (birth_year_max is not None):
+        where_parts.append("CAST(an_nais AS INTEGER) BETWEEN :birth_year_min AND :birth_year_max")
+        params["birth_year_min"] = birth_year_min
+        params["birth_year_max"] = birth_year_max
+    if catv_filter is not None:
+        where_parts.append("CAST(catv AS INTEGER) = :catv")
+        params["catv"] = catv_filter
+    if motor_filter is not None:
+        where_parts.append("CAST(motor AS INTEGER) = :motor")
+        params["motor"] = motor_filter
+    return where_parts, params
+
+
+@memoize()
+def _time_series_payload(
+    year=2023,
+    agg_filter: int | str | None = None,
+    lum_filter: int | str | None = None,
+    atm_filter: int | str | None = None,
+    sexe_filter: int | None = None,
+    trajet_filter: int | None = None,
+    grav_filter: int | None = None,
+    birth_year_min: int | None = None,
+    birth_year_max: int | None = None,
+    catv_filter: int | None = None,
+    motor_filter: int | None = None,
+) -> dict:
+    """agrégat compact de la courbe temporelle pour un état de filtres.
+
+    une seule requête par année ; on renvoie les comptes par heure et par (mois, jour),
+    dont se déduisent les vues heure/jour/mois/jour de semaine sans nouvelle requête.
+    """
+    need_join = any(
+        v is not None
+        for v in (
+            sexe_filter,
+            trajet_filter,
+            grav_filter,
+            birth_year_min,
+            birth_year_max,
+            catv_filter,
+            motor_filter,
+        )
+    )
+    where_parts, params = _filter_where(
+        agg_filter,
+        lum_filter,
+        atm_filter,
+        sexe_filter,
+        trajet_filter,
+        grav_filter,
+        birth_year_min,
+        birth_year_max,
+        catv_filter,
+        motor_filter,
+    )
+    where_clause = " AND ".join(where_parts) if where_parts else "1=1"
+
+    def _query_one(y: int) -> pd.DataFrame:
+        # Les colonnes lum et atm sont toujours dans caracteristiques, donc OK
+        table_name = f"caract_usager_vehicule_{y}" if need_join else f"caracteristiques_{y}"
+        sql = (
+            "SELECT CAST(mois AS INTEGER) AS mois, CAST(jour AS INTEGER) AS jour, "
+            "CAST(SUBSTR(heure,1,2) AS INTEGER) AS h, COUNT(*) AS accidents "
+            f"FROM {table_name} WHERE {where_clause} "
+            "GROUP BY 1, 2, 3"
+        )
+        return query_db(sql, params)
+
+    years = sorted(_available_years()) if year == "all" else [int(year)]
+    series = []
+    for y, df in map_years(_query_one, years):
+        if df is None or df.empty:
+            continue
+        hours = df.dropna(subset=["h"]).groupby("h", as_index=False)["accidents"].sum()
+        # 0 = mois/jour inconnu (exclu des vues correspondantes)
+        days = df.fillna({"mois": 0, "jour": 0}).astype({"mois": int, "jour": int})
+        days = days.groupby(["mois", "jour"], as_index=False)["accidents"].sum()
+        series.append(
+            {
+                "year": int(y),
+                "hours": {
+                    "x": hours["h"].astype(int).tolist(),
+                    "y": hours["accidents"].astype(int).tolist(),
+                },
+                "days": {
+                    "mois": days["mois"].tolist(),
+                    "jour": days["jour"].tolist(),
+                    "n": days["accidents"].astype(int).tolist(),
+                },
+            }
+        )
+    return {
+        "series": series,
+        "meta": {
+            "titles": TS_TITLES,
+            "x_titles": TS_X_TITLES,
+            "x_ranges": TS_X_RANGES,
+            "weekday_labels": WEEKDAY_LABELS,
+            "palette": TS_PALETTE,
+        },
+    }
+
+
+def _time_series_skeleton() -> go.Figure:
+    """figure vide portant le thème de la courbe (complétée côté navigateur)."""
+    return go.Figure(layout={"template": "plotly_dark"})
+
+
+@memoize()
 def _make_accidents_pie_chart(
     year=2023,
     agg_filter: int | str | None = None,
@@ -1052,38 +1023,19 @@ def _make_accidents_pie_chart(
         def _query_one(y: int) -> pd.DataFrame:
             # Always use joined table since we're querying 'sexe' column from usager
             table_name = f"caract_usager_vehicule_{y}"
-            where_parts = ["sexe IS NOT NULL"]
-            params = {}
-            if agg_filter in (1, 2):
-                where_parts.append("CAST(agg AS INTEGER) = :agg")
-                params["agg"] = agg_filter
-            if lum_filter in (1, 2, 3, 4, 5):
-                where_parts.append("CAST(lum AS INTEGER) = :lum")
-                params["lum"] = lum_filter
-            if atm_filter in (1, 2, 3, 4, 5, 6, 7, 8, 9):
-                where_parts.append("CAST(atm AS INTEGER) = :atm")
-                params["atm"] = atm_filter
-            if sexe_filter is not None:
-                where_parts.append("CAST(sexe AS INTEGER) = :sexe")
-                params["sexe"] = sexe_filter
-            if trajet_filter is not None:
-                where_parts.append("CAST(trajet AS INTEGER) = :trajet")
-                params["trajet"] = trajet_filter
-            if grav_filter is not None:
-                where_parts.append("CAST(grav AS INTEGER) = :grav")
-                params["grav"] = grav_filter
-            if (birth_year_min is not None) and (birth_year_max is not None):
-                where_parts.append(
-                    "CAST(an_nais AS INTEGER) BETWEEN :birth_year_min AND :birth_year_max"
-                )
-                params["birth_year_min"] = birth_year_min
-                params["birth_year_max"] = birth_year_max
-            if catv_filter is not None:
-                where_parts.append("CAST(catv AS INTEGER) = :catv")
-                params["catv"] = catv_filter
-            if motor_filter is not None:
-                where_parts.append("CAST(motor AS INTEGER) = :motor")
-                params["motor"] = motor_filter
+            where_parts, params = _filter_where(
+                agg_filter,
+                lum_filter,
+                atm_filter,
+                sexe_filter,
+                trajet_filter,
+                grav_filter,
+                birth_year_min,
+                birth_year_max,
+                catv_filter,
+                motor_filter,
+            )
+            where_parts = ["sexe IS NOT NULL"] + where_parts
             where_clause = " AND ".join(where_parts)
             sql = (
                 f"SELECT sexe, COUNT(*) AS count "
@@ -1092,9 +1044,7 @@ def _make_accidents_pie_chart(
             return query_db(sql, params)
 
         if isinstance(year, str) and year == "all":
-            df1 = _query_one(2021)
-            df2 = _query_one(2023)
-            df = pd.concat([df1, df2], ignore_index=True)
+            df = pd.concat([d for _, d in map_years(_query_one, [2021, 2023])], ignore_index=True)
             df = df.groupby("sexe", as_index=False).agg({"count": "sum"})
         else:
             df = _query_one(int(year))
@@ -1173,6 +1123,7 @@ def _make_accidents_pie_chart(
         return fig
 
 
+@memoize()
 def _make_catv_pie_chart(
     year=2023,
     agg_filter: int | str | None = None,
@@ -1192,38 +1143,19 @@ def _make_catv_pie_chart(
         def _query_one(y: int) -> pd.DataFrame:
             # Always use joined table since we're querying 'catv' column from vehicule
             table_name = f"caract_usager_vehicule_{y}"
-            where_parts = ["catv IS NOT NULL"]
-            params = {}
-            if agg_filter in (1, 2):
-                where_parts.append("CAST(agg AS INTEGER) = :agg")
-                params["agg"] = agg_filter
-            if lum_filter in (1, 2, 3, 4, 5):
-                where_parts.append("CAST(lum AS INTEGER) = :lum")
-                params["lum"] = lum_filter
-            if atm_filter in (1, 2, 3, 4, 5, 6, 7, 8, 9):
-                where_parts.append("CAST(atm AS INTEGER) = :atm")
-                params["atm"] = atm_filter
-            if sexe_filter is not None:
-                where_parts.append("CAST(sexe AS INTEGER) = :sexe")
-                params["sexe"] = sexe_filter
-            if trajet_filter is not None:
-                where_parts.append("CAST(trajet AS INTEGER) = :trajet")
-                params["trajet"] = trajet_filter
-            if grav_filter is not None:
-                where_parts.append("CAST(grav AS INTEGER) = :grav")
-                params["grav"] = grav_filter
-            if (birth_year_min is not None) and (birth_year_max is not None):
-                where_parts.append(
-                    "CAST(an_nais AS INTEGER) BETWEEN :birth_year_min AND :birth_year_max"
-                )
-                params["birth_year_min"] = birth_year_min
-                params["birth_year_max"] = birth_year_max
-            if catv_filter is not None:
-                where_parts.append("CAST(catv AS INTEGER) = :catv")
-                params["catv"] = catv_filter
-            if motor_filter is not None:
-                where_parts.append("CAST(motor AS INTEGER) = :motor")
-                params["motor"] = motor_filter
+            where_parts, params = _filter_where(
+                agg_filter,
+                lum_filter,
+                atm_filter,
+                sexe_filter,
+                trajet_filter,
+                grav_filter,
+                birth_year_min,
+                birth_year_max,
+                catv_filter,
+                motor_filter,
+            )
+            where_parts = ["catv IS NOT NULL"] + where_parts
             where_clause = " AND ".join(where_parts)
             sql = (
                 "SELECT catv, COUNT(*) AS count "
@@ -1233,11 +1165,11 @@ def _make_catv_pie_chart(
             return query_db(sql, params)
 
         if isinstance(year, str) and year == "all":
-            dfs = []
-            for y in [2020, 2021, 2022, 2023, 2024]:
-                df = _query_one(y)
-                if df is not None and not df.empty:
-                    dfs.append(df)
+            dfs = [
+                d
+                for _, d in map_years(_query_one, [2020, 2021, 2022, 2023, 2024])
+                if d is not None and not d.empty
+            ]
             if dfs:
                 df = pd.concat(dfs, ignore_index=True)
                 df = df.groupby("catv", as_index=False).agg({"count": "sum"})
@@ -1335,6 +1267,7 @@ def _make_catv_pie_chart(
         return fig
 
 
+@memoize()
 def _make_motor_pie_chart(
     year=2023,
     agg_filter: int | str | None = None,
@@ -1354,38 +1287,19 @@ def _make_motor_pie_chart(
         def _query_one(y: int) -> pd.DataFrame:
             # Always use joined table since we're querying 'motor' column from vehicule
             table_name = f"caract_usager_vehicule_{y}"
-            where_parts = ["motor IS NOT NULL"]
-            params = {}
-            if agg_filter in (1, 2):
-                where_parts.append("CAST(agg AS INTEGER) = :agg")
-                params["agg"] = agg_filter
-            if lum_filter in (1, 2, 3, 4, 5):
-                where_parts.append("CAST(lum AS INTEGER) = :lum")
-                params["lum"] = lum_filter
-            if atm_filter in (1, 2, 3, 4, 5, 6, 7, 8, 9):
-                where_parts.append("CAST(atm AS INTEGER) = :atm")
-                params["atm"] = atm_filter
-            if sexe_filter is not None:
-                where_parts.append("CAST(sexe AS INTEGER) = :sexe")
-                params["sexe"] = sexe_filter
-            if trajet_filter is not None:
-                where_parts.append("CAST(trajet AS INTEGER) = :trajet")
-                params["trajet"] = trajet_filter
-            if grav_filter is not None:
-                where_parts.append("CAST(grav AS INTEGER) = :grav")
-                params["grav"] = grav_filter
-            if (birth_year_min is not None) and (birth_year_max is not None):
-                where_parts.append(
-                    "CAST(an_nais AS INTEGER) BETWEEN :birth_year_min AND :birth_year_max"
-                )
-                params["birth_year_min"] = birth_year_min
-                params["birth_year_max"] = birth_year_max
-            if catv_filter is not None:
-                where_parts.append("CAST(catv AS INTEGER) = :catv")
-                params["catv"] = catv_filter
-            if motor_filter is not None:
-                where_parts.append("CAST(motor AS INTEGER) = :motor")
-                params["motor"] = motor_filter
+            where_parts, params = _filter_where(
+                agg_filter,
+                lum_filter,
+                atm_filter,
+                sexe_filter,
+                trajet_filter,
+                grav_filter,
+                birth_year_min,
+                birth_year_max,
+                catv_filter,
+                motor_filter,
+            )
+            where_parts = ["motor IS NOT NULL"] + where_parts
             where_clause = " AND ".join(where_parts)
             sql = (
                 "SELECT motor, COUNT(*) AS count "
@@ -1395,11 +1309,11 @@ def _make_motor_pie_chart(
             return query_db(sql, params)
 
         if isinstance(year, str) and year == "all":
-            dfs = []
-            for y in [2020, 2021, 2022, 2023, 2024]:
-                df = _query_one(y)
-                if df is not None and not df.empty:
-                    dfs.append(df)
+            dfs = [
+                d
+                for _, d in map_years(_query_one, [2020, 2021, 2022, 2023, 2024])
+                if d is not None and not d.empty
+            ]
             if dfs:
                 df = pd.concat(dfs, ignore_index=True)
                 df = df.groupby("motor", as_index=False).agg({"count": "sum"})
@@ -1477,6 +1391,7 @@ def _make_motor_pie_chart(
         return fig
 
 
+@memoize()
 def _make_catv_gender_bar_chart(
     year=2023,
     agg_filter: int | str | None = None,
@@ -1496,38 +1411,19 @@ def _make_catv_gender_bar_chart(
         def _query_one(y: int) -> pd.DataFrame:
             # Always use joined table since we're querying 'catv' and 'sexe' columns
             table_name = f"caract_usager_vehicule_{y}"
-            where_parts = ["catv IS NOT NULL", "sexe IS NOT NULL"]
-            params = {}
-            if agg_filter in (1, 2):
-                where_parts.append("CAST(agg AS INTEGER) = :agg")
-                params["agg"] = agg_filter
-            if lum_filter in (1, 2, 3, 4, 5):
-                where_parts.append("CAST(lum AS INTEGER) = :lum")
-                params["lum"] = lum_filter
-            if atm_filter in (1, 2, 3, 4, 5, 6, 7, 8, 9):
-                where_parts.append("CAST(atm AS INTEGER) = :atm")
-                params["atm"] = atm_filter
-            if sexe_filter is not None:
-                where_parts.append("CAST(sexe AS INTEGER) = :sexe")
-                params["sexe"] = sexe_filter
-            if trajet_filter is not None:
-                where_parts.append("CAST(trajet AS INTEGER) = :trajet")
-                params["trajet"] = trajet_filter
-            if grav_filter is not None:
-                where_parts.append("CAST(grav AS INTEGER) = :grav")
-                params["grav"] = grav_filter
-            if (birth_year_min is not None) and (birth_year_max is not None):
-                where_parts.append(
-                    "CAST(an_nais AS INTEGER) BETWEEN :birth_year_min AND :birth_year_max"
-                )
-                params["birth_year_min"] = birth_year_min
-                params["birth_year_max"] = birth_year_max
-            if catv_filter is not None:
-                where_parts.append("CAST(catv AS INTEGER) = :catv")
-                params["catv"] = catv_filter
-            if motor_filter is not None:
-                where_parts.append("CAST(motor AS INTEGER) = :motor")
-                params["motor"] = motor_filter
+            where_parts, params = _filter_where(
+                agg_filter,
+                lum_filter,
+                atm_filter,
+                sexe_filter,
+                trajet_filter,
+                grav_filter,
+                birth_year_min,
+                birth_year_max,
+                catv_filter,
+                motor_filter,
+            )
+            where_parts = ["catv IS NOT NULL", "sexe IS NOT NULL"] + where_parts
             where_clause = " AND ".join(where_parts)
             sql = (
                 "SELECT catv, sexe, COUNT(*) AS count "
@@ -1537,11 +1433,11 @@ def _make_catv_gender_bar_chart(
             return query_db(sql, params)
 
         if isinstance(year, str) and year == "all":
-            dfs = []
-            for y in [2020, 2021, 2022, 2023, 2024]:
-                df = _query_one(y)
-                if df is not None and not df.empty:
-                    dfs.append(df)
+            dfs = [
+                d
+                for _, d in map_years(_query_one, [2020, 2021, 2022, 2023, 2024])
+                if d is not None and not d.empty
+            ]
             if dfs:
                 df = pd.concat(dfs, ignore_index=True)
                 df = df.groupby(["catv", "sexe"], as_index=False).agg({"count": "sum"})
@@ -1698,7 +1594,8 @@ def _make_catv_gender_bar_chart(
         return fig
 
 
-def _make_age_histogram(
+@memoize()
+def _age_payload(
     year=2023,
     agg_filter: int | str | None = None,
     lum_filter: int | str | None = None,
@@ -1710,384 +1607,170 @@ def _make_age_histogram(
     birth_year_max: int | None = None,
     catv_filter: int | None = None,
     motor_filter: int | None = None,
-):
-    """histogramme de distribution par âge des conducteurs."""
-    try:
-        # Convertir birth_year en age pour le filtrage après calcul
-        age_min_filter = None
-        age_max_filter = None
-        if birth_year_min is not None and birth_year_max is not None:
-            age_min_filter = 2024 - birth_year_max
-            age_max_filter = 2024 - birth_year_min
+) -> dict:
+    """agrégat compact (âge -> nombre de conducteurs) commun aux vues détail et tranches."""
+    # Convertir birth_year en age pour le filtrage après calcul
+    age_min_filter = None
+    age_max_filter = None
+    if birth_year_min is not None and birth_year_max is not None:
+        age_min_filter = 2024 - birth_year_max
+        age_max_filter = 2024 - birth_year_min
+
+    # NE PAS filtrer par birth_year dans la requête SQL
+    where_parts, params = _filter_where(
+        agg_filter,
+        lum_filter,
+        atm_filter,
+        sexe_filter,
+        trajet_filter,
+        grav_filter,
+        catv_filter=catv_filter,
+        motor_filter=motor_filter,
+        with_birth_years=False,
+    )
+    where_clause = " AND ".join(
+        ["an_nais IS NOT NULL", "CAST(an_nais AS INTEGER) > 0", *where_parts]
+    )
 
-        def _query_one(y: int) -> pd.DataFrame:
-            # Always use joined table when querying with usager columns
-            table_name = f"caract_usager_vehicule_{y}"
+    def _query_one(y: int) -> pd.DataFrame:
+        # Always use joined table when querying with usager columns
+        sql = (
+            "SELECT an_nais, annee, COUNT(*) AS count "
+            f"FROM caract_usager_vehicule_{y} WHERE {where_clause} "
+            "GROUP BY an_nais, annee"
+        )
+        return query_db(sql, params)
+
+    years = [2020, 2021, 2022, 2023, 2024] if year == "all" else [int(year)]
+    dfs = [d for _, d in map_years(_query_one, years) if d is not None and not d.empty]
+    payload: dict = {
+        "ages": [],
+        "counts": [],
+        "tranches": [[label, lo, hi, color] for label, lo, hi, color in AGE_TRANCHES],
+    }
+    if not dfs:
+        return payload
+
+    df = pd.concat(dfs, ignore_index=True)
+    df["an_nais"] = pd.to_numeric(df["an_nais"], errors="coerce")
+    df["annee"] = pd.to_numeric(df["annee"], errors="coerce")
+    df = df.dropna(subset=["an_nais", "annee"])
+    df["an_nais"] = df["an_nais"].astype(int)
+    df["annee"] = df["annee"].astype(int)
+    df = df[(df["an_nais"] >= 1900) & (df["an_nais"] <= 2024)]  # Filtrer les années aberrantes
+    # Calculer l'âge au moment de l'accident
+    df["age"] = df["annee"] - df["an_nais"]
+    df = df[(df["age"] >= 0) & (df["age"] <= 120)]  # Filtrer les âges aberrants
+    # Appliquer le filtre d'âge si spécifié
+    if age_min_filter is not None and age_max_filter is not None:
+        df = df[(df["age"] >= age_min_filter) & (df["age"] <= age_max_filter)]
+    df = df.groupby("age", as_index=False)["count"].sum().sort_values("age")
+    payload["ages"] = df["age"].astype(int).tolist()
+    payload["counts"] = df["count"].astype(int).tolist()
+    return payload
+
+
+# ----------------------------------------------------------------------------
+# densité des accidents (rasterisée côté serveur)
+# ----------------------------------------------------------------------------
+
+_USER_FILTER_KEYS = (
+    "sexe_filter",
+    "trajet_filter",
+    "grav_filter",
+    "birth_year_min",
+    "birth_year_max",
+    "catv_filter",
+    "motor_filter",
+)
 
-            where_parts = ["an_nais IS NOT NULL", "CAST(an_nais AS INTEGER) > 0"]
-            params = {}
-            if agg_filter in (1, 2):
-                where_parts.append("CAST(agg AS INTEGER) = :agg")
-                params["agg"] = agg_filter
-            if lum_filter in (1, 2, 3, 4, 5):
-                where_parts.append("CAST(lum AS INTEGER) = :lum")
-                params["lum"] = lum_filter
-            if atm_filter in (1, 2, 3, 4, 5, 6, 7, 8, 9):
-                where_parts.append("CAST(atm AS INTEGER) = :atm")
-                params["atm"] = atm_filter
-            if sexe_filter is not None:
-                where_parts.append("CAST(sexe AS INTEGER) = :sexe")
-                params["sexe"] = sexe_filter
-            if trajet_filter is not None:
-                where_parts.append("CAST(trajet AS INTEGER) = :trajet")
-                params["trajet"] = trajet_filter
-            if grav_filter is not None:
-                where_parts.append("CAST(grav AS INTEGER) = :grav")
-                params["grav"] = grav_filter
-            # NE PAS filtrer par birth_year dans la requête SQL
-            if catv_filter is not None:
-                where_parts.append("CAST(catv AS INTEGER) = :catv")
-                params["catv"] = catv_filter
-            if motor_filter is not None:
-                where_parts.append("CAST(motor AS INTEGER) = :motor")
-                params["motor"] = motor_filter
-            where_clause = " AND ".join(where_parts)
-            sql = (
-                "SELECT an_nais, annee, COUNT(*) AS count "
-                f"FROM {table_name} WHERE {where_clause} "
-                "GROUP BY an_nais, annee"
-            )
-            return query_db(sql, params)
 
-        if isinstance(year, str) and year == "all":
-            dfs = []
-            for y in [2020, 2021, 2022, 2023, 2024]:
-                df = _query_one(y)
-                if df is not None and not df.empty:
-                    dfs.append(df)
-            if dfs:
-                df = pd.concat(dfs, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = _query_one(int(year))
+def _tile_points(year, bbox: raster.BBox, **filters) -> tuple[np.ndarray, np.ndarray]:
+    """coordonnées (lon, lat) des accidents filtrés d'une emprise, un point par accident.
 
-        if df is None or df.empty:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="aucune donnée disponible",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False,
+    l'emprise passe par le r*tree ; les filtres usager/véhicule portent sur la table
+    jointe (une ligne par usager et véhicule) par un EXISTS : l'accident n'y est
+    retenu qu'une fois, la densité reste un nombre d'accidents.
+    """
+    need_join = any(filters.get(k) is not None for k in _USER_FILTER_KEYS)
+    where_parts, params = _filter_where(**filters)
+    where_clause = " AND ".join(where_parts)
+
+    def _query_one(y: int) -> pd.DataFrame:
+        where = where_clause
+        if need_join:
+            where = (
+                f"EXISTS (SELECT 1 FROM caract_usager_vehicule_{y} j "
+                f"WHERE j.acc_id = c.acc_id AND {where_clause})"
             )
-            return fig
+        return spatial.points_in_bbox(y, bbox, ("lon", "lat"), where=where, params=params)
 
-        # Convertir an_nais et annee en entiers et calculer l'âge
-        df["an_nais"] = pd.to_numeric(df["an_nais"], errors="coerce")
-        df["annee"] = pd.to_numeric(df["annee"], errors="coerce")
-        df = df.dropna(subset=["an_nais", "annee"])
-        df["an_nais"] = df["an_nais"].astype(int)
-        df["annee"] = df["annee"].astype(int)
-        df = df[
-            (df["an_nais"] >= 1900) & (df["an_nais"] <= 2024)
-        ]  # Filtrer les années aberrantes
-        # Calculer l'âge au moment de l'accident
-        df["age"] = df["annee"] - df["an_nais"]
-        df = df[(df["age"] >= 0) & (df["age"] <= 120)]  # Filtrer les âges aberrants
-        # Appliquer le filtre d'âge si spécifié
-        if age_min_filter is not None and age_max_filter is not None:
-            df = df[(df["age"] >= age_min_filter) & (df["age"] <= age_max_filter)]
-        # Définir les tranches d'âge
-        def categorize_age(age):
-            if age < 18:
-                return "0-17 ans"
-            elif age < 25:
-                return "18-24 ans"
-            elif age < 35:
-                return "25-34 ans"
-            elif age < 45:
-                return "35-44 ans"
-            elif age < 55:
-                return "45-54 ans"
-            elif age < 65:
-                return "55-64 ans"
-            elif age < 75:
-                return "65-74 ans"
-            else:
-                return "75+ ans"
-        df["tranche_age"] = df["age"].apply(categorize_age)
-        # Agréger par âge
-        df = df.groupby(["age", "tranche_age"], as_index=False).agg({"count": "sum"})
-        df = df.sort_values("age")
-        # Couleurs pour chaque tranche d'âge (néon du dashboard)
-        color_map = {
-            "0-17 ans": "#3ae7ff",
-            "18-24 ans": "#4ecfff",
-            "25-34 ans": "#5db7ff",
-            "35-44 ans": "#6d9fff",
-            "45-54 ans": "#7d87ff",
-            "55-64 ans": "#8d6fff",
-            "65-74 ans": "#9d57ff",
-            "75+ ans": "#ad3fff"
-        }
-        df["color"] = df["tranche_age"].map(color_map)
-        fig = go.Figure()
-        fig.add_trace(
-            go.Bar(
-                x=df["age"],
-                y=df["count"],
-                marker={"color": df["color"], "line": {"color": "#1a1d2e", "width": 1}},
-                hovertemplate=(
-                    "<b>Âge: %{x} ans</b><br>Tranche: %{customdata}<br>"
-                    "Accidents: %{y}<extra></extra>"
-                ),
-                customdata=df["tranche_age"],
-                showlegend=False,
-            )
-        )
-        # Ajouter la légende manuellement avec les tranches d'âge
-        for tranche, color in color_map.items():
-            fig.add_trace(
-                go.Scatter(
-                    x=[None],
-                    y=[None],
-                    mode="markers",
-                    marker={"size": 10, "color": color},
-                    name=tranche,
-                    showlegend=True,
-                )
-            )
+    years = sorted(_available_years()) if year == "all" else [int(year)]
+    frames = [df for _, df in map_years(_query_one, years) if df is not None and not df.empty]
+    if not frames:
+        return np.empty(0), np.empty(0)
+    df = pd.concat(frames, ignore_index=True)
+    return df["lon"].to_numpy(dtype=float), df["lat"].to_numpy(dtype=float)
 
-        fig.update_layout(
-            title={
-                "text": "RÉPARTITION DES CONDUCTEURS PAR ÂGE",
-                "x": 0.5,
-                "xanchor": "center",
-                "font": {"size": 16, "color": "#e6e9f2"},
-            },
-            xaxis={
-                "title": "Âge (années)",
-                "gridcolor": "#2d3548",
-                "tickfont": {"color": "#e6e9f2"},
-                "tickmode": "linear",
-                "dtick": 5,
-            },
-            yaxis={
-                "title": "Nombre d'accidents",
-                "gridcolor": "#2d3548",
-                "tickfont": {"color": "#e6e9f2"},
-            },
-            height=500,
-            margin={"l": 60, "r": 20, "t": 80, "b": 60},
-            font={"family": "Arial, sans-serif", "size": 12, "color": "#e6e9f2"},
-            paper_bgcolor="#1a1d2e",
-            plot_bgcolor="#1a1d2e",
-            bargap=0.1,
-            showlegend=True,
-            legend={
-                "orientation": "v",
-                "yanchor": "top",
-                "y": 0.98,
-                "xanchor": "right",
-                "x": 0.98,
-                "bgcolor": "rgba(26, 29, 46, 0.8)",
-                "bordercolor": "#6b5bd3",
-                "borderwidth": 1,
-                "font": {"color": "#e6e9f2", "size": 11},
-            },
-        )
-        return fig
-    except Exception as err:
-        fig = go.Figure()
-        fig.add_annotation(
-            text=f"erreur: {str(err)[:100]}",
-            xref="paper",
-            yref="paper",
-            x=0.5,
-            y=0.5,
-            showarrow=False,
-        )
-        return fig
 
+@memoize(maxsize=1024)
+def _density_tile(year, z: int, tx: int, ty: int, **filters) -> np.ndarray:
+    """comptes d'une tuile (mise en cache tuile par tuile, points lus dans son emprise)."""
+    lon, lat = _tile_points(year, raster.tile_bounds(z, tx, ty), **filters)
+    return raster.rasterize_tile(lon, lat, z, tx, ty)
 
-def _make_age_tranche_histogram(
-    year=2023,
-    agg_filter: int | str | None = None,
-    lum_filter: int | str | None = None,
-    atm_filter: int | str | None = None,
-    sexe_filter: int | None = None,
-    trajet_filter: int | None = None,
-    grav_filter: int | None = None,
-    birth_year_min: int | None = None,
-    birth_year_max: int | None = None,
-    catv_filter: int | None = None,
-    motor_filter: int | None = None,
-):
-    """histogramme de distribution par tranches d'âge uniquement."""
-    try:
-        # Convertir birth_year en age pour le filtrage après calcul
-        age_min_filter = None
-        age_max_filter = None
-        if birth_year_min is not None and birth_year_max is not None:
-            age_min_filter = 2024 - birth_year_max
-            age_max_filter = 2024 - birth_year_min
-        def _query_one(y: int) -> pd.DataFrame:
-            # Always use joined table when querying with usager columns
-            table_name = f"caract_usager_vehicule_{y}"
-            where_parts = ["an_nais IS NOT NULL", "CAST(an_nais AS INTEGER) > 0"]
-            params = {}
-            if agg_filter in (1, 2):
-                where_parts.append("CAST(agg AS INTEGER) = :agg")
-                params["agg"] = agg_filter
-            if lum_filter in (1, 2, 3, 4, 5):
-                where_parts.append("CAST(lum AS INTEGER) = :lum")
-                params["lum"] = lum_filter
-            if atm_filter in (1, 2, 3, 4, 5, 6, 7, 8, 9):
-                where_parts.append("CAST(atm AS INTEGER) = :atm")
-                params["atm"] = atm_filter
-            if sexe_filter is not None:
-                where_parts.append("CAST(sexe AS INTEGER) = :sexe")
-                params["sexe"] = sexe_filter
-            if trajet_filter is not None:
-                where_parts.append("CAST(trajet AS INTEGER) = :trajet")
-                params["trajet"] = trajet_filter
-            if grav_filter is not None:
-                where_parts.append("CAST(grav AS INTEGER) = :grav")
-                params["grav"] = grav_filter
-            # NE PAS filtrer par birth_year dans la requête SQL
-            if catv_filter is not None:
-                where_parts.append("CAST(catv AS INTEGER) = :catv")
-                params["catv"] = catv_filter
-            if motor_filter is not None:
-                where_parts.append("CAST(motor AS INTEGER) = :motor")
-                params["motor"] = motor_filter
-            where_clause = " AND ".join(where_parts)
-            sql = (
-                "SELECT an_nais, annee, COUNT(*) AS count "
-                f"FROM {table_name} WHERE {where_clause} "
-                "GROUP BY an_nais, annee"
-            )
-            return query_db(sql, params)
 
-        if isinstance(year, str) and year == "all":
-            dfs = []
-            for y in [2020, 2021, 2022, 2023, 2024]:
-                df = _query_one(y)
-                if df is not None and not df.empty:
-                    dfs.append(df)
-            if dfs:
-                df = pd.concat(dfs, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = _query_one(int(year))
+def _density_grid(year, bbox: raster.BBox, **filters):
+    """grille de densité de la vue : (centres lon, centres lat, comptes)."""
+    z = raster.zoom_for_bbox(bbox)
+    cols, rows = raster.tiles_for_bbox(bbox, z)
+    tiles = {(tx, ty): _density_tile(year, z, tx, ty, **filters) for tx in cols for ty in rows}
+    return raster.mosaic(tiles, z, cols, rows, bbox)
 
-        if df is None or df.empty:
-            fig = go.Figure()
-            fig.add_annotation(
-                text="aucune donnée disponible",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False,
-            )
-            return fig
 
-        df["an_nais"] = pd.to_numeric(df["an_nais"], errors="coerce")
-        df["annee"] = pd.to_numeric(df["annee"], errors="coerce")
-        df = df.dropna(subset=["an_nais", "annee"])
-        df["an_nais"] = df["an_nais"].astype(int)
-        df["annee"] = df["annee"].astype(int)
-        df = df[(df["an_nais"] >= 1900) & (df["an_nais"] <= 2024)]
-        df["age"] = df["annee"] - df["an_nais"]
-        df = df[(df["age"] >= 0) & (df["age"] <= 120)]
-        # Appliquer le filtre d'âge si spécifié
-        if age_min_filter is not None and age_max_filter is not None:
-            df = df[(df["age"] >= age_min_filter) & (df["age"] <= age_max_filter)]
-        def categorize_age(age):
-            if age < 18:
-                return "0-17 ans"
-            elif age < 25:
-                return "18-24 ans"
-            elif age < 35:
-                return "25-34 ans"
-            elif age < 45:
-                return "35-44 ans"
-            elif age < 55:
-                return "45-54 ans"
-            elif age < 65:
-                return "55-64 ans"
-            elif age < 75:
-                return "65-74 ans"
-            else:
-                return "75+ ans"
-        df["tranche_age"] = df["age"].apply(categorize_age)
-        # Agréger par TRANCHE uniquement
-        df_tranche = df.groupby("tranche_age", as_index=False).agg({"count": "sum"})
-        # Ordre des tranches
-        tranche_order = [
-            "0-17 ans",
-            "18-24 ans",
-            "25-34 ans",
-            "35-44 ans",
-            "45-54 ans",
-            "55-64 ans",
-            "65-74 ans",
-            "75+ ans",
-        ]
-        df_tranche["tranche_age"] = pd.Categorical(
-            df_tranche["tranche_age"],
-            categories=tranche_order,
-            ordered=True,
-        )
-        df_tranche = df_tranche.sort_values("tranche_age")
-        color_map = {
-            "0-17 ans": "#3ae7ff",
-            "18-24 ans": "#4ecfff",
-            "25-34 ans": "#5db7ff",
-            "35-44 ans": "#6d9fff",
-            "45-54 ans": "#7d87ff",
-            "55-64 ans": "#8d6fff",
-            "65-74 ans": "#9d57ff",
-            "75+ ans": "#ad3fff"
-        }
-        df_tranche["color"] = df_tranche["tranche_age"].map(color_map)
-        fig = go.Figure()
-        fig.add_trace(
-            go.Bar(
-                x=df_tranche["tranche_age"],
-                y=df_tranche["count"],
-                marker={"color": df_tranche["color"], "line": {"color": "#1a1d2e", "width": 1}},
-                hovertemplate="<b>%{x}</b><br>Accidents: %{y}<extra></extra>",
+def _density_trace_data(year, bbox: raster.BBox, **filters) -> dict:
+    """données de la heatmap (cellules vides transparentes), partagées figure et patch."""
+    lon, lat, counts = _density_grid(year, bbox, **filters)
+    # nan -> null en json : cellule non dessinée
+    return {"x": lon, "y": lat, "z": np.where(counts > 0, counts, np.nan)}
+
+
+def _make_density_heatmap(year="all", bbox: raster.BBox = raster.FRANCE_BBOX, **filters):
+    """heatmap de densité des accidents (lon/lat), recalculée à chaque zoom."""
+    try:
+        data = _density_trace_data(year, bbox, **filters)
+        fig = go.Figure(
+            go.Heatmap(
+                **data,
+                colorscale=[
+                    [0.0, "#1b1f3b"],
+                    [0.3, "#7b5cff"],
+                    [0.7, "#ff57c2"],
+                    [1.0, "#3ae7ff"],
+                ],
+                zsmooth=False,
+                colorbar={"title": {"text": "accidents"}},
+                hovertemplate="lon %{x:.3f}, lat %{y:.3f}<br>accidents: %{z}<extra></extra>",
             )
         )
+        # échelle lon/lat corrigée de la latitude moyenne (vue quasi conforme)
+        ratio = 1.0 / math.cos(math.radians((bbox[1] + bbox[3]) / 2))
         fig.update_layout(
-            title={
-                "text": "RÉPARTITION PAR TRANCHES D'ÂGE",
-                "x": 0.5,
-                "xanchor": "center",
-                "font": {"size": 16, "color": "#e6e9f2"},
-            },
-            xaxis={
-                "title": "Tranche d'âge",
-                "gridcolor": "#2d3548",
-                "tickfont": {"color": "#e6e9f2"},
-            },
+            title={"text": "densité des accidents", "x": 0.5, "xanchor": "center"},
+            xaxis={"title": {"text": "longitude"}, "range": [bbox[0], bbox[2]], "showgrid": False},
             yaxis={
-                "title": "Nombre d'accidents",
-                "gridcolor": "#2d3548",
-                "tickfont": {"color": "#e6e9f2"},
+                "title": {"text": "latitude"},
+                "range": [bbox[1], bbox[3]],
+                "scaleanchor": "x",
+                "scaleratio": ratio,
+                "showgrid": False,
             },
-            height=500,
-            margin={"l": 60, "r": 20, "t": 80, "b": 60},
+            height=600,
+            margin={"l": 60, "r": 20, "t": 60, "b": 50},
+            plot_bgcolor="#0e111b",
+            paper_bgcolor="#181d31",
             font={"family": "Arial, sans-serif", "size": 12, "color": "#e6e9f2"},
-            paper_bgcolor="#1a1d2e",
-            plot_bgcolor="#1a1d2e",
-            bargap=0.1,
-            showlegend=False,
+            uirevision="densite",
         )
         return fig
     except Exception as err:
@@ -2110,42 +1793,96 @@ def _make_age_tranche_histogram(
 about_page = about.layout() if about else html.Div("page à propos non disponible")
 
 
-def create_histogram_page(year=2023):
-    """crée la page histogramme avec sélection d’année (barre à gauche)."""
-    fig = _make_speed_histogram(year)
-
-    base_btn = {
-        "padding": "12px 16px",
-        "fontSize": "14px",
-        "fontWeight": "700",
-        "cursor": "pointer",
-        "borderRadius": "10px",
-        "border": "1px solid var(--border)",
-        "backgroundColor": "#1a2035",
-        "color": "#b9bfd3",
-        "textAlign": "center",
-        "boxShadow": "0 6px 20px rgba(0,0,0,0.25)",
-        "margin": "6px 0",
-    }
-    active_btn = {
-        **base_btn,
+# styles des boutons de sélection (dark + néon), partagés avec les callbacks d'année
+CARTE_BTN_STYLE: dict[str, str] = {
+    "padding": "12px 16px",
+    "fontSize": "14px",
+    "fontWeight": "700",
+    "cursor": "pointer",
+    "borderRadius": "10px",
+    "border": "1px solid var(--border)",
+    "backgroundColor": "#1a2035",
+    "color": "#b9bfd3",
+    "textAlign": "center",
+    "boxShadow": "0 6px 20px rgba(0,0,0,0.25)",
+}
+CARTE_YEAR_ACTIVE_STYLE: dict[str, str] = {
+    **CARTE_BTN_STYLE,
+    "backgroundColor": "#3ae7ff",
+    "color": "#0e111b",
+    "border": "1px solid rgba(58,231,255,0.9)",
+    "boxShadow": "0 0 10px rgba(58,231,255,0.55)",
+}
+CARTE_MODE_ACTIVE_STYLES: dict[str, dict[str, str]] = {
+    "region": {
+        **CARTE_BTN_STYLE,
         "backgroundColor": "#3ae7ff",
         "color": "#0e111b",
-        "border": "1px solid rgba(58,231,255,0.9)",
-        "boxShadow": "0 0 10px rgba(58,231,255,0.55)",
-    }
-    inactive_btn = base_btn
+        "boxShadow": "0 0 10px rgba(58,231,255,0.6)",
+        "border": "1px solid rgba(58,231,255,0.85)",
+    },
+    "dept": {
+        **CARTE_BTN_STYLE,
+        "backgroundColor": "#7b5cff",
+        "color": "white",
+        "boxShadow": "0 0 10px rgba(123,92,255,0.6)",
+        "border": "1px solid rgba(123,92,255,0.8)",
+    },
+    "commune": {
+        **CARTE_BTN_STYLE,
+        "backgroundColor": "#ff57c2",
+        "color": "white",
+        "boxShadow": "0 0 10px rgba(255,87,194,0.6)",
+        "border": "1px solid rgba(255,87,194,0.8)",
+    },
+    "grille": {
+        **CARTE_BTN_STYLE,
+        "backgroundColor": "#f093fb",
+        "color": "#0e111b",
+        "boxShadow": "0 0 10px rgba(240,147,251,0.6)",
+        "border": "1px solid rgba(240,147,251,0.8)",
+    },
+    "variation": {
+        **CARTE_BTN_STYLE,
+        "backgroundColor": "#01d084",
+        "color": "#0e111b",
+        "boxShadow": "0 0 10px rgba(1,208,132,0.6)",
+        "border": "1px solid rgba(1,208,132,0.8)",
+    },
+}
+CARTE_MODES = tuple(CARTE_MODE_ACTIVE_STYLES)
+HIST_BTN_STYLE: dict[str, str] = {**CARTE_BTN_STYLE, "margin": "6px 0"}
+HIST_YEAR_ACTIVE_STYLE: dict[str, str] = {**CARTE_YEAR_ACTIVE_STYLE, "margin": "6px 0"}
+
 
-    radar_years = sorted(_available_radar_years(), reverse=True)
+def create_histogram_page(year=2023):
+    """crée la page histogramme avec sélection d’année (barre à gauche)."""
+    fig = _default_view(f"histogramme-{year}", lambda: _make_speed_histogram(year))
+
+    radar_years = sorted(_default_view("annees-radars"), reverse=True)
     year_buttons = [
         html.Button(
             str(y),
-            id=f"btn-year-{y}",
+            id={"type": "radar-year", "year": y},
             n_clicks=0,
-            style=active_btn if y == year else inactive_btn,
+            style=HIST_YEAR_ACTIVE_STYLE if y == year else HIST_BTN_STYLE,
         )
         for y in radar_years
     ]
+    quantiles = _default_view("radars-centiles")
+    quantile_panel = [
+        html.Div(
+            "centiles de l'écart",
+            style={"fontSize": "12px", "color": "var(--text-300)", "marginBottom": "8px"},
+        ),
+        _quantile_dropdown("quantile-annee", "année", [(str(y), y) for y in quantiles["years"]]),
+        _quantile_dropdown(
+            "quantile-limite", "limite", [(f"{v} km/h", v) for v in quantiles["limits"]]
+        ),
+        _quantile_dropdown("quantile-heure", "heure", [(f"{h:02d} h", h) for h in range(24)]),
+        _quantile_dropdown("quantile-mois", "mois", [(str(m), m) for m in range(1, 13)]),
+        html.Div(_quantile_summary(quantiles), id="radar-quantiles"),
+    ]
 
     return html.Div(
         [
@@ -2164,6 +1901,7 @@ def create_histogram_page(year=2023):
                             ),
                             *year_buttons,
                             html.Hr(style={"margin": "16px 0"}),
+                            *quantile_panel,
                         ],
                         className="page-card",
                         style={
@@ -2181,9 +1919,18 @@ def create_histogram_page(year=2023):
                     html.Div(
                         [
                             dcc.Graph(
+                                id="histogram-graph",
                                 figure=fig,
                                 config={"responsive": True, "displayModeBar": True},
                             ),
+                            dcc.Graph(
+                                id="radar-map",
+                                figure=_default_view(
+                                    f"radars-carte-{year}", lambda: _make_radar_map(year)
+                                ),
+                                config={"responsive": True, "displayModeBar": True},
+                                style={"marginTop": "24px"},
+                            ),
                         ],
                         className="page-card",
                         style={
@@ -2199,80 +1946,210 @@ def create_histogram_page(year=2023):
     )
 
 
-histogram_page = create_histogram_page()
+# au niveau de maille le plus fin, accidents affichés un à un s'ils sont peu nombreux
+GRID_POINTS_MAX = 2000
+
+
+def _grid_points(year: int, level: int, bbox: raster.BBox, grav=None) -> pd.DataFrame:
+    """accidents de la vue (index r*tree) au niveau le plus fin, vide sinon.
+
+    la gravité est portée par les usagers : avec un filtre de gravité, seules les
+    mailles sont affichées.
+    """
+    empty = pd.DataFrame(columns=["acc_id", "lat", "lon"])
+    if level != grid.GRID_LEVELS[-1] or grav is not None:
+        return empty
+    if spatial.count_in_bbox(year, bbox) > GRID_POINTS_MAX:
+        return empty
+    return spatial.points_in_bbox(year, bbox)
+
+
+def _make_grid_map(year=2023, view: dict | None = None, grav=None):
+    """carte des accidents par maille carrée, au niveau adapté à la vue.
+
+    view: centre et échelle de la carte (`grid.merge_view`), france entière par défaut.
+    grav: code de gravité de l'accident (usager le plus atteint), toutes si None.
+    """
+    try:
+        bbox = grid.view_bbox(view)
+        level, df = grid.visible_cells(year, bbox, grav)
+        points = _grid_points(year, level, bbox, grav)
+        dlon, _ = grid.cell_size(level)
+        size_km = dlon * 111.32 * math.cos(math.radians(46.5))
+        grav_label = f" - {grid.GRAV_LABELS[int(grav)].upper()}" if grav is not None else ""
+        fig = go.Figure(
+            go.Choropleth(
+                geojson=grid.cells_geojson(level, df["cx"], df["cy"]),
+                locations=grid.cell_id(level, df["cx"], df["cy"]),
+                z=df["accidents"],
+                featureidkey="id",
+                colorscale=[[0, "#1a2035"], [0.5, "#3ae7ff"], [1, "#ff57c2"]],
+                marker_line_width=0,
+                colorbar={"title": {"text": "accidents"}},
+                hovertemplate="%{z} accidents<extra></extra>",
+            )
+        )
+        fig.add_trace(
+            go.Scattergeo(
+                lon=points["lon"],
+                lat=points["lat"],
+                customdata=points["acc_id"],
+                mode="markers",
+                marker={"size": 5, "color": "#ffd166", "line": {"width": 0}},
+                hovertemplate="accident %{customdata}<extra></extra>",
+                showlegend=False,
+            )
+        )
+        fig.update_geos(
+            projection_type="mercator",
+            lonaxis_range=[raster.FRANCE_BBOX[0], raster.FRANCE_BBOX[2]],
+            lataxis_range=[raster.FRANCE_BBOX[1], raster.FRANCE_BBOX[3]],
+            showland=False,
+            showcoastlines=True,
+            coastlinecolor="#3a4160",
+            showcountries=True,
+            countrycolor="#3a4160",
+            showframe=False,
+            bgcolor="rgba(0,0,0,0)",
+        )
+        fig.update_layout(
+            title=f"ACCIDENTS PAR MAILLE (~{size_km:.0f} KM) - {year}{grav_label}",
+            height=600,
+            margin={"l": 0, "r": 0, "t": 40, "b": 0},
+            # vue propre au mode maille : l'échelle 1 correspond à FRANCE_BBOX
+            uirevision="carte-grille",
+            template="plotly_dark",
+            paper_bgcolor="#181d31",
+            plot_bgcolor="#14192a",
+            font={"color": "#e6e9f2"},
+        )
+        if df.empty:
+            fig.add_annotation(
+                text="aucune donnée disponible",
+                xref="paper",
+                yref="paper",
+                x=0.5,
+                y=0.5,
+                showarrow=False,
+            )
+        return fig
+    except Exception as err:
+        print(f"erreur carte par maille : {err}")
+        fig = go.Figure()
+        fig.add_annotation(
+            text=f"erreur : {str(err)[:100]}",
+            xref="paper",
+            yref="paper",
+            x=0.5,
+            y=0.5,
+            showarrow=False,
+        )
+        return fig
+
+
+def _grid_patch(fig: go.Figure) -> Patch:
+    """patch des mailles visibles (géométrie, identifiants, comptes), des accidents et du titre."""
+    patched = _figure_patch(fig, ("locations", "z"))
+    if fig.data:
+        patched["data"][0]["geojson"] = fig.data[0].geojson
+    if len(fig.data) > 1:
+        for key in ("lon", "lat", "customdata"):
+            patched["data"][1][key] = list(fig.data[1][key])
+    return patched
+
+
+@memoize()
+def _hotspot_trace(year: int, grav: int | None = None) -> dict:
+    """contours des points noirs précalculés (table hotspots), en trace scattergeo.
+
+    trace vide si la table manque ou si l'année n'a aucun point noir ; les
+    polygones sont séparés par des valeurs nulles dans une seule trace.
+    """
+    try:
+        df = query_db(
+            "SELECT accidents, mortels, rayon_m, contour "
+            f"FROM {HOTSPOT_TABLE} WHERE annee = :annee AND grav IS :grav",
+            {"annee": int(year), "grav": grav},
+        )
+    except Exception as err:
+        print(f"erreur points noirs : {err}")
+        df = pd.DataFrame(columns=["accidents", "mortels", "rayon_m", "contour"])
+    lon, lat, text = [], [], []
+    for row in df.itertuples(index=False):
+        ring = json.loads(row.contour)["coordinates"][0]
+        label = (
+            f"<b>{row.accidents} accidents</b><br>dont {row.mortels} mortels"
+            f"<br>rayon {row.rayon_m:.0f} m"
+        )
+        lon += [x for x, _ in ring] + [None]
+        lat += [y for _, y in ring] + [None]
+        text += [label] * len(ring) + [None]
+    return go.Scattergeo(
+        lon=lon,
+        lat=lat,
+        text=text,
+        mode="lines",
+        fill="toself",
+        fillcolor="rgba(255,209,102,0.35)",
+        line={"color": "#ffd166", "width": 1.5},
+        hoverinfo="text",
+        showlegend=False,
+        name="points noirs",
+    ).to_plotly_json()
+
+
+@memoize()
+def _make_choropleth(carte_mode: str, year: int) -> go.Figure:
+    """figure de la carte selon le mode courant."""
+    if carte_mode == "grille":
+        return _make_grid_map(year)
+    if carte_mode == "variation":
+        return _make_variation_map(year)
+    if carte_mode == "commune":
+        return _make_communes_choropleth(year)
+    if carte_mode == "region":
+        return _make_regions_choropleth(year)
+    return _make_departments_choropleth(year)
+
+
+def _carte_mode_styles(carte_mode: str) -> list[dict[str, str]]:
+    """styles des boutons région / département / commune / maille / variation pour le mode actif."""
+    return [
+        CARTE_MODE_ACTIVE_STYLES[mode] if mode == carte_mode else CARTE_BTN_STYLE
+        for mode in CARTE_MODES
+    ]
 
 
 def create_choropleth_page(carte_mode="dept", year=2023):
     """crée la page choroplèthe avec une barre latérale à gauche."""
-    # figure selon le mode
-    if carte_mode == "commune":
-        fig = _make_communes_choropleth(year)
-    elif carte_mode == "region":
-        fig = _make_regions_choropleth(year)
-    else:
-        fig = _make_departments_choropleth(year)
+    fig = _default_view(f"carte-{carte_mode}-{year}", lambda: _make_choropleth(carte_mode, year))
 
     # palette et styles boutons (dark + néon)
-    base_btn = {
-        "padding": "12px 16px",
-        "fontSize": "14px",
-        "fontWeight": "700",
-        "cursor": "pointer",
-        "borderRadius": "10px",
-        "border": "1px solid var(--border)",
-        "backgroundColor": "#1a2035",
-        "color": "#b9bfd3",
-        "textAlign": "center",
-        "boxShadow": "0 6px 20px rgba(0,0,0,0.25)",
-    }
-    region_active = {
-        **base_btn,
-        "backgroundColor": "#3ae7ff",
-        "color": "#0e111b",
-        "boxShadow": "0 0 10px rgba(58,231,255,0.6)",
-        "border": "1px solid rgba(58,231,255,0.85)",
-    }
-    dept_active = {
-        **base_btn,
-        "backgroundColor": "#7b5cff",
-        "color": "white",
-        "boxShadow": "0 0 10px rgba(123,92,255,0.6)",
-        "border": "1px solid rgba(123,92,255,0.8)",
-    }
-    commune_active = {
-        **base_btn,
-        "backgroundColor": "#ff57c2",
-        "color": "white",
-        "boxShadow": "0 0 10px rgba(255,87,194,0.6)",
-        "border": "1px solid rgba(255,87,194,0.8)",
-    }
-    region_style = region_active if carte_mode == "region" else base_btn
-    dept_style = dept_active if carte_mode == "dept" else base_btn
-    commune_style = commune_active if carte_mode == "commune" else base_btn
-
-    active_year_style = {
-        **base_btn,
-        "backgroundColor": "#3ae7ff",
-        "color": "#0e111b",
-        "border": "1px solid rgba(58,231,255,0.9)",
-        "boxShadow": "0 0 10px rgba(58,231,255,0.55)",
-    }
-    inactive_year_style = base_btn
+    base_btn = CARTE_BTN_STYLE
+    region_style, dept_style, commune_style, grille_style, variation_style = _carte_mode_styles(
+        carte_mode
+    )
 
-    available_carte_years = sorted(_available_years(), reverse=True)
+    available_carte_years = sorted(_default_view("annees"), reverse=True)
     year_buttons = [
         html.Button(
             str(y),
-            id=f"btn-carte-year-{y}",
+            id={"type": "carte-year", "year": y},
             n_clicks=0,
-            style=active_year_style if y == year else inactive_year_style,
+            style=CARTE_YEAR_ACTIVE_STYLE if y == year else base_btn,
         )
         for y in available_carte_years
     ]
 
     # Affichage simple: une seule carte selon le mode + année courante
     maps_content = html.Div(
-        [dcc.Graph(figure=fig, config={"responsive": True, "displayModeBar": True})],
+        [
+            dcc.Graph(
+                id="carte-graph",
+                figure=fig,
+                config={"responsive": True, "displayModeBar": True},
+            )
+        ],
         className="page-card",
         style={"padding": "20px", "flex": "1", "minWidth": "0"},
     )
@@ -2310,6 +2187,53 @@ def create_choropleth_page(carte_mode="dept", year=2023):
                                 n_clicks=0,
                                 style=commune_style,
                             ),
+                            html.Button(
+                                "vue par maille",
+                                id="btn-carte-grille",
+                                n_clicks=0,
+                                style=grille_style,
+                            ),
+                            html.Button(
+                                "variation annuelle",
+                                id="btn-carte-variation",
+                                n_clicks=0,
+                                style=variation_style,
+                            ),
+                            dcc.Dropdown(
+                                id="carte-reference",
+                                options=[
+                                    {"label": "vs année précédente", "value": "precedente"},
+                                    {"label": "vs moyenne des années", "value": "moyenne"},
+                                ],
+                                value="precedente",
+                                clearable=False,
+                            ),
+                            html.Div(
+                                "gravité (maille, points noirs)",
+                                style={
+                                    "fontSize": "12px",
+                                    "color": "var(--text-300)",
+                                    "marginTop": "6px",
+                                },
+                            ),
+                            dcc.Dropdown(
+                                id="carte-grav",
+                                options=[
+                                    {"label": "toutes", "value": "all"},
+                                    *(
+                                        {"label": label, "value": code}
+                                        for code, label in grid.GRAV_LABELS.items()
+                                    ),
+                                ],
+                                value="all",
+                                clearable=False,
+                            ),
+                            dcc.Checklist(
+                                id="carte-hotspots",
+                                options=[{"label": " points noirs", "value": "on"}],
+                                value=[],
+                                style={"fontSize": "13px"},
+                            ),
                             html.Hr(style={"margin": "16px 0"}),
                             html.Div(
                                 "année",
@@ -2347,605 +2271,648 @@ def create_choropleth_page(carte_mode="dept", year=2023):
             # Hidden flags to keep current mode/year in state
             html.Div(carte_mode, id="carte-mode-flag", style={"display": "none"}),
             html.Div(str(year), id="carte-year-flag", style={"display": "none"}),
+            html.Div(level_for_scale(None), id="carte-level-flag", style={"display": "none"}),
+            # centre et échelle de la vue par maille (relayoutData cumulés)
+            dcc.Store(id="carte-viewport", data=None),
         ],
         id="choropleth-page-container",
     )
 
+# style des libellés de filtres de la page graphique
+FILTER_LABEL_STYLE: dict[str, str] = {"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"}
 
-try:
-    choropleth_page = create_choropleth_page("dept")
-except Exception:
-    choropleth_page = html.Div(
-        html.P("Données en chargement... Rafraîchissez la page dans quelques secondes."),
-        style={"padding": "40px", "textAlign": "center", "color": "#999", "fontSize": "16px"},
-    )
 
-graph_page = html.Div(
-    [
-        html.H2("analyses temporelles — évolution des accidents"),
-        html.Div(
-            [
-                # Sidebar filtres à gauche
-                html.Div(
-                    [
-                        html.H3(
-                            "filtres",
-                            style={
-                                "fontSize": "16px",
-                                "fontWeight": "700",
-                                "color": "#e6e9f2",
-                                "marginBottom": "16px",
-                                "borderBottom": "2px solid #6b5bd3",
-                                "paddingBottom": "12px",
-                            },
-                        ),
-                        html.Label(
-                            "sexe",
-                            style={"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"},
-                        ),
-                        dcc.Dropdown(
-                            id="filter-usager-sexe",
-                            options=[
-                                {"label": "tous", "value": "all"},
-                                {"label": "homme", "value": 1},
-                                {"label": "femme", "value": 2},
-                            ],
-                            value="all",
-                            clearable=False,
-                            style={"marginBottom": "12px"},
-                        ),
-                        html.Label(
-                            "trajet",
-                            style={"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"},
-                        ),
-                        dcc.Dropdown(
-                            id="filter-usager-trajet",
-                            options=[
-                                {"label": "tous", "value": "all"},
-                                {"label": "domicile - travail", "value": 1},
-                                {"label": "domicile - école", "value": 2},
-                                {"label": "courses - achats", "value": 3},
-                                {"label": "professionnel", "value": 4},
-                                {"label": "promenade - loisirs", "value": 5},
-                                {"label": "autre", "value": 9},
-                            ],
-                            value="all",
-                            clearable=False,
-                            style={"marginBottom": "12px"},
-                        ),
-                        html.Label(
-                            "gravité de blessure",
-                            style={"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"},
-                        ),
-                        dcc.Dropdown(
-                            id="filter-usager-grav",
-                            options=[
-                                {"label": "tous", "value": "all"},
-                                {"label": "indemne", "value": 1},
-                                {"label": "tué", "value": 2},
-                                {"label": "blessé hospitalisé", "value": 3},
-                                {"label": "blessé léger", "value": 4},
-                            ],
-                            value="all",
-                            clearable=False,
-                            style={"marginBottom": "12px"},
-                        ),
-                        html.Label(
-                            "âge du conducteur",
-                            style={
-                                "fontWeight": "600",
-                                "fontSize": "13px",
-                                "marginBottom": "6px",
-                            },
-                        ),
-                        html.Div(
-                            [
-                                html.Div(
-                                    [
-                                        html.Label(
-                                            "Min:",
-                                            style={
-                                                "fontSize": "11px",
-                                                "color": "#b9bfd3",
-                                                "marginRight": "6px",
-                                            },
-                                        ),
-                                        dcc.Input(
-                                            id="filter-usager-age-min",
-                                            type="number",
-                                            value=18,
-                                            min=0,
-                                            max=120,
-                                            style={
-                                                "width": "70px",
-                                                "padding": "6px",
-                                                "borderRadius": "4px",
-                                                "border": "1px solid var(--border)",
-                                                "backgroundColor": "#1a2035",
-                                                "color": "#e6e9f2",
-                                            },
-                                        ),
-                                    ],
-                                    style={"display": "flex", "alignItems": "center", "marginBottom": "8px"},
-                                ),
-                                html.Div(
-                                    [
-                                        html.Label(
-                                            "Max:",
-                                            style={
-                                                "fontSize": "11px",
-                                                "color": "#b9bfd3",
-                                                "marginRight": "6px",
-                                            },
-                                        ),
-                                        dcc.Input(
-                                            id="filter-usager-age-max",
-                                            type="number",
-                                            value=99,
-                                            min=0,
-                                            max=120,
-                                            style={
-                                                "width": "70px",
-                                                "padding": "6px",
-                                                "borderRadius": "4px",
-                                                "border": "1px solid var(--border)",
-                                                "backgroundColor": "#1a2035",
-                                                "color": "#e6e9f2",
-                                            },
-                                        ),
-                                    ],
-                                    style={"display": "flex", "alignItems": "center"},
-                                ),
-                            ],
-                            style={"marginBottom": "12px"},
-                        ),
-                        html.Hr(style={"margin": "16px 0"}),
-                        html.H6(
-                            "Filtres véhicule",
-                            style={
-                                "color": "#6b5bd3",
-                                "fontWeight": "700",
-                                "marginBottom": "8px",
-                                "borderBottom": "2px solid #6b5bd3",
-                                "paddingBottom": "12px",
-                            },
-                        ),
-                        html.Div(
-                            [
-                                html.I(
-                                    className="fas fa-info-circle",
-                                    style={"marginRight": "6px", "color": "#ff9800"},
-                                ),
-                                html.Span(
-                                    "",  # message retiré (véhicules 2024 désormais disponibles)
-                                ),
-                            ],
-                            style={
-                                # style conservé pour ne pas casser la mise en page; vide désormais
-                                "display": "none",
-                            },
-                        ),
-                        html.Label(
-                            "catégorie véhicule",
-                            style={"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"},
-                        ),
-                        dcc.Dropdown(
-                            id="filter-vehicule-catv",
-                            options=[
-                                {"label": "tous", "value": "all"},
-                                {"label": "vélo", "value": 1},
-                                {"label": "cyclo <50cm3", "value": 2},
-                                {"label": "voiturette", "value": 3},
-                                {"label": "scooter immatriculé", "value": 30},
-                                {"label": "moto >50cm3", "value": 31},
-                                {"label": "scooter <50cm3", "value": 32},
-                                {"label": "moto >125cm3", "value": 33},
-                                {"label": "scooter >125cm3", "value": 34},
-                                {"label": "quad léger", "value": 40},
-                                {"label": "quad lourd", "value": 41},
-                                {"label": "cyclomoteur", "value": 42},
-                                {"label": "VL seul", "value": 7},
-                                {"label": "VL + caravane", "value": 10},
-                                {"label": "VL + remorque", "value": 13},
-                                {"label": "VU seul 1.5T-3.5T", "value": 14},
-                                {"label": "VU seul + 3.5T", "value": 15},
-                                {"label": "VU + remorque", "value": 16},
-                                {"label": "PL seul 3.5T-7.5T", "value": 17},
-                                {"label": "PL seul > 7.5T", "value": 18},
-                                {"label": "PL > 3.5T + remorque", "value": 19},
-                                {"label": "tracteur routier seul", "value": 20},
-                                {"label": "tracteur routier + semi-remorque", "value": 21},
-                                {"label": "transport en commun", "value": 37},
-                                {"label": "tramway", "value": 38},
-                                {"label": "EDP motorisé", "value": 50},
-                                {"label": "EDP non motorisé", "value": 60},
-                                {"label": "autre", "value": 99},
-                            ],
-                            value="all",
-                            clearable=False,
-                            style={"marginBottom": "12px"},
-                        ),
-                        html.Label(
-                            "motorisation",
-                            style={"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"},
-                        ),
-                        dcc.Dropdown(
-                            id="filter-vehicule-motor",
-                            options=[
-                                {"label": "tous", "value": "all"},
-                                {"label": "hydrocarbure", "value": 1},
-                                {"label": "électrique", "value": 2},
-                                {"label": "hydrogène", "value": 3},
-                                {"label": "humaine", "value": 4},
-                                {"label": "hybride", "value": 5},
-                                {"label": "GPL", "value": 6},
-                                {"label": "autre", "value": 9},
-                            ],
-                            value="all",
-                            clearable=False,
-                            style={"marginBottom": "12px"},
-                        ),
-                        html.Hr(style={"margin": "16px 0"}),
-                        html.Label(
-                            "année",
-                            style={"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"},
-                        ),
-                        dcc.Dropdown(
-                            id="filter-annee",
-                            options=(
-                                [{"label": "toutes", "value": "all"}]
-                                + [
-                                    {"label": str(y), "value": y}
-                                    for y in sorted(_available_years(), reverse=True)
-                                ]
+def create_graph_page():
+    """crée la page graphique (filtres à gauche, graphiques mis à jour par callbacks)."""
+    return html.Div(
+        [
+            html.H2("analyses temporelles — évolution des accidents"),
+            # filtres normalisés et vue courante des graphiques à bascule
+            dcc.Store(id="ts-unit-store", data="hour"),
+            dcc.Store(id="age-view-store", data="detail"),
+            # état initial prérendu : le premier affichage ne fait aucune requête, les
+            # callbacks serveur ne partent qu'au premier changement de filtre
+            dcc.Store(
+                id="graph-filters-store",
+                data={"year": "all", "filters": _default_graph_filters()},
+            ),
+            dcc.Store(id="ts-payload-store", data=_default_view("graph-ts-payload")),
+            dcc.Store(id="age-payload-store", data=_default_view("graph-age-payload")),
+            html.Div(
+                [
+                    # Sidebar filtres à gauche
+                    html.Div(
+                        [
+                            html.H3(
+                                "filtres",
+                                style={
+                                    "fontSize": "16px",
+                                    "fontWeight": "700",
+                                    "color": "#e6e9f2",
+                                    "marginBottom": "16px",
+                                    "borderBottom": "2px solid #6b5bd3",
+                                    "paddingBottom": "12px",
+                                },
                             ),
-                            value="all",
-                            clearable=False,
-                            style={"marginBottom": "12px"},
-                        ),
-                        html.Label(
-                            "luminosité",
-                            style={"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"},
-                        ),
-                        dcc.Dropdown(
-                            id="filter-luminosite",
-                            options=[
-                                {"label": "toutes", "value": "all"},
-                                {"label": "jour", "value": 1},
-                                {"label": "crépuscule/aube", "value": 2},
-                                {"label": "nuit", "value": 3},
-                                {"label": "nuit sans éclairage", "value": 4},
-                                {"label": "nuit avec éclairage", "value": 5},
-                            ],
-                            value="all",
-                            clearable=False,
-                            style={"marginBottom": "12px"},
-                        ),
-                        html.Label(
-                            "conditions atmosphériques",
-                            style={"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"},
-                        ),
-                        dcc.Dropdown(
-                            id="filter-atm",
-                            options=[
-                                {"label": "toutes", "value": "all"},
-                                {"label": "normale", "value": 1},
-                                {"label": "pluie légère", "value": 2},
-                                {"label": "pluie forte", "value": 3},
-                                {"label": "neige/grêle", "value": 4},
-                                {"label": "brouillard/fumée", "value": 5},
-                                {"label": "vent fort/tempête", "value": 6},
-                                {"label": "éblouissant", "value": 7},
-                                {"label": "couvert", "value": 8},
-                                {"label": "autre", "value": 9},
-                            ],
-                            value="all",
-                            clearable=False,
-                            style={"marginBottom": "12px"},
-                        ),
-                        html.Label(
-                            "agglomération",
-                            style={"fontWeight": "600", "fontSize": "13px", "marginBottom": "6px"},
-                        ),
-                        dcc.Dropdown(
-                            id="filter-agglomeration",
-                            options=[
-                                {"label": "tous", "value": "all"},
-                                {"label": "agglomération", "value": 1},
-                                {"label": "hors agglomération", "value": 2},
-                            ],
-                            value="all",
-                            clearable=False,
-                        ),
-                        html.Button(
-                            "réinitialiser filtres",
-                            id="btn-reset-filters",
-                            n_clicks=0,
-                            style={
-                                "marginTop": "16px",
-                                "padding": "10px 16px",
-                                "backgroundColor": "#1a2035",
-                                "border": "1px solid var(--border)",
-                                "borderRadius": "8px",
-                                "cursor": "pointer",
-                                "fontSize": "13px",
-                                "color": "#b9bfd3",
-                                "boxShadow": "0 6px 20px rgba(0,0,0,0.25)",
-                            },
-                        ),
-                    ],
-                    className="page-card",
-                    style={
-                        "width": "260px",
-                        "padding": "20px",
-                        "alignSelf": "flex-start",
-                    },
-                ),
-                # Contenu principal à droite
-                html.Div(
-                    [
-                        html.Div(
-                            [
-                                html.Div(
-                                    [
-                                        html.H3(
-                                            "courbe — accidents (heures/jours/mois)",
-                                            style={
-                                                "fontSize": "16px",
-                                                "fontWeight": "600",
-                                                "color": "#e6e9f2",
-                                                "marginBottom": "12px",
-                                                "borderLeft": "4px solid #6b5bd3",
-                                                "paddingLeft": "12px",
-                                            },
-                                        ),
-                                        html.Div(
-                                            [
-                                                html.Button(
-                                                    "heures",
-                                                    id="btn-ts-hour",
-                                                    n_clicks=0,
-                                                    style={
-                                                        "padding": "8px 14px",
-                                                        "borderRadius": "8px",
-                                                        "border": "1px solid var(--border)",
-                                                        "backgroundColor": "#1a2035",
-                                                        "color": "#b9bfd3",
-                                                    },
-                                                ),
-                                                html.Button(
-                                                    "jours",
-                                                    id="btn-ts-day",
-                                                    n_clicks=0,
-                                                    style={
-                                                        "padding": "8px 14px",
-                                                        "borderRadius": "8px",
-                                                        "border": "1px solid var(--border)",
-                                                        "backgroundColor": "#1a2035",
-                                                        "color": "#b9bfd3",
-                                                        "marginLeft": "8px",
-                                                    },
-                                                ),
-                                                html.Button(
-                                                    "mois",
-                                                    id="btn-ts-month",
-                                                    n_clicks=0,
-                                                    style={
-                                                        "padding": "8px 14px",
-                                                        "borderRadius": "8px",
-                                                        "border": "1px solid var(--border)",
-                                                        "backgroundColor": "#1a2035",
-                                                        "color": "#b9bfd3",
-                                                        "marginLeft": "8px",
-                                                    },
-                                                ),
-                                                html.Button(
-                                                    "jours semaine",
-                                                    id="btn-ts-weekday",
-                                                    n_clicks=0,
-                                                    style={
-                                                        "padding": "8px 14px",
-                                                        "borderRadius": "8px",
-                                                        "border": "1px solid var(--border)",
-                                                        "backgroundColor": "#1a2035",
-                                                        "color": "#b9bfd3",
-                                                        "marginLeft": "8px",
-                                                    },
-                                                ),
-                                            ],
-                                            style={
-                                                "display": "flex",
-                                                "justifyContent": "flex-start",
-                                                "marginBottom": "12px",
-                                            },
-                                        ),
-                                    ]
-                                ),
-                                dcc.Graph(
-                                    id="graph-accidents-heure",
-                                    figure=_make_time_series(),
-                                    config={"responsive": True, "displayModeBar": True},
-                                ),
-                            ],
-                            className="page-card",
-                            style={"padding": "20px", "borderTop": "4px solid #7b5cff"},
-                        ),
-                        html.Div(
-                            [
-                                html.H3(
-                                    "courbe 2 — distribution par sexe",
-                                    style={
-                                        "fontSize": "16px",
-                                        "fontWeight": "600",
-                                        "color": "#e6e9f2",
-                                        "marginBottom": "16px",
-                                        "borderLeft": "4px solid #f093fb",
-                                        "paddingLeft": "12px",
-                                    },
-                                ),
-                                dcc.Graph(
-                                    id="graph-accidents-pie",
-                                    figure=_make_accidents_pie_chart(),
-                                    config={"responsive": True, "displayModeBar": True},
-                                ),
-                            ],
-                            className="page-card",
-                            style={
-                                "padding": "20px",
-                                "borderTop": "4px solid #ff57c2",
-                                "marginTop": "24px",
-                            },
-                        ),
-                        html.Div(
-                            [
-                                html.H3(
-                                    "courbe 3 — top catégories véhicule",
-                                    style={
-                                        "fontSize": "16px",
-                                        "fontWeight": "600",
-                                        "color": "#e6e9f2",
-                                        "marginBottom": "16px",
-                                        "borderLeft": "4px solid #f093fb",
-                                        "paddingLeft": "12px",
-                                    },
-                                ),
-                                dcc.Graph(
-                                    id="graph-catv-pie",
-                                    figure=_make_catv_pie_chart(),
-                                    config={"responsive": True, "displayModeBar": True},
-                                ),
-                            ],
-                            className="page-card",
-                            style={
-                                "padding": "20px",
-                                "borderTop": "4px solid #3ae7ff",
-                                "marginTop": "24px",
-                            },
-                        ),
-                        html.Div(
-                            [
-                                html.H3(
-                                    "courbe 4 — distribution par motorisation",
-                                    style={
-                                        "fontSize": "16px",
-                                        "fontWeight": "600",
-                                        "color": "#e6e9f2",
-                                        "marginBottom": "16px",
-                                        "borderLeft": "4px solid #f093fb",
-                                        "paddingLeft": "12px",
-                                    },
-                                ),
-                                dcc.Graph(
-                                    id="graph-motor-pie",
-                                    figure=_make_motor_pie_chart(),
-                                    config={"responsive": True, "displayModeBar": True},
-                                ),
-                            ],
-                            className="page-card",
-                            style={
-                                "padding": "20px",
-                                "borderTop": "4px solid #ff57c2",
-                                "marginTop": "24px",
-                            },
-                        ),
-                        html.Div(
-                            [
-                                html.H3(
-                                    "courbe 5 — répartition H/F par véhicule",
-                                    style={
-                                        "fontSize": "16px",
-                                        "fontWeight": "600",
-                                        "color": "#e6e9f2",
-                                        "marginBottom": "16px",
-                                        "borderLeft": "4px solid #3ae7ff",
-                                        "paddingLeft": "12px",
-                                    },
-                                ),
-                                dcc.Graph(
-                                    id="graph-catv-gender",
-                                    figure=_make_catv_gender_bar_chart(),
-                                    config={"responsive": True, "displayModeBar": True},
-                                ),
-                            ],
-                            className="page-card",
-                            style={
-                                "padding": "20px",
-                                "borderTop": "4px solid #3ae7ff",
-                                "marginTop": "24px",
-                            },
-                        ),
-                        html.Div(
-                            [
-                                html.Div(
-                                    [
-                                        html.H3(
-                                            "courbe 6 — répartition des conducteurs par âge",
-                                            style={
-                                                "fontSize": "16px",
-                                                "fontWeight": "600",
-                                                "color": "#e6e9f2",
-                                                "marginBottom": "12px",
-                                                "borderLeft": "4px solid #f093fb",
-                                                "paddingLeft": "12px",
-                                            },
-                                        ),
-                                        html.Div(
-                                            [
-                                                html.Button(
-                                                    "Vue détaillée",
-                                                    id="btn-age-detail",
-                                                    n_clicks=0,
-                                                    style={
-                                                        "padding": "8px 14px",
-                                                        "borderRadius": "8px",
-                                                        "border": "1px solid var(--border)",
-                                                        "backgroundColor": "#1a2035",
-                                                        "color": "#b9bfd3",
-                                                    },
-                                                ),
-                                                html.Button(
-                                                    "Tranches d'âge",
-                                                    id="btn-age-tranche",
-                                                    n_clicks=0,
-                                                    style={
-                                                        "padding": "8px 14px",
-                                                        "borderRadius": "8px",
-                                                        "border": "1px solid var(--border)",
-                                                        "backgroundColor": "#1a2035",
-                                                        "color": "#b9bfd3",
-                                                        "marginLeft": "8px",
-                                                    },
-                                                ),
-                                            ],
-                                            style={
-                                                "display": "flex",
-                                                "justifyContent": "flex-start",
-                                                "marginBottom": "12px",
-                                            },
-                                        ),
+                            html.Label(
+                                "sexe",
+                                style=FILTER_LABEL_STYLE,
+                            ),
+                            dcc.Dropdown(
+                                id="filter-usager-sexe",
+                                options=[
+                                    {"label": "tous", "value": "all"},
+                                    {"label": "homme", "value": 1},
+                                    {"label": "femme", "value": 2},
+                                ],
+                                value="all",
+                                clearable=False,
+                                style={"marginBottom": "12px"},
+                            ),
+                            html.Label(
+                                "trajet",
+                                style=FILTER_LABEL_STYLE,
+                            ),
+                            dcc.Dropdown(
+                                id="filter-usager-trajet",
+                                options=[
+                                    {"label": "tous", "value": "all"},
+                                    {"label": "domicile - travail", "value": 1},
+                                    {"label": "domicile - école", "value": 2},
+                                    {"label": "courses - achats", "value": 3},
+                                    {"label": "professionnel", "value": 4},
+                                    {"label": "promenade - loisirs", "value": 5},
+                                    {"label": "autre", "value": 9},
+                                ],
+                                value="all",
+                                clearable=False,
+                                style={"marginBottom": "12px"},
+                            ),
+                            html.Label(
+                                "gravité de blessure",
+                                style=FILTER_LABEL_STYLE,
+                            ),
+                            dcc.Dropdown(
+                                id="filter-usager-grav",
+                                options=[
+                                    {"label": "tous", "value": "all"},
+                                    {"label": "indemne", "value": 1},
+                                    {"label": "tué", "value": 2},
+                                    {"label": "blessé hospitalisé", "value": 3},
+                                    {"label": "blessé léger", "value": 4},
+                                ],
+                                value="all",
+                                clearable=False,
+                                style={"marginBottom": "12px"},
+                            ),
+                            html.Label(
+                                "âge du conducteur",
+                                style={
+                                    "fontWeight": "600",
+                                    "fontSize": "13px",
+                                    "marginBottom": "6px",
+                                },
+                            ),
+                            html.Div(
+                                [
+                                    html.Div(
+                                        [
+                                            html.Label(
+                                                "Min:",
+                                                style={
+                                                    "fontSize": "11px",
+                                                    "color": "#b9bfd3",
+                                                    "marginRight": "6px",
+                                                },
+                                            ),
+                                            dcc.Input(
+                                                id="filter-usager-age-min",
+                                                type="number",
+                                                value=18,
+                                                min=0,
+                                                max=120,
+                                                style={
+                                                    "width": "70px",
+                                                    "padding": "6px",
+                                                    "borderRadius": "4px",
+                                                    "border": "1px solid var(--border)",
+                                                    "backgroundColor": "#1a2035",
+                                                    "color": "#e6e9f2",
+                                                },
+                                            ),
+                                        ],
+                                        style={
+                                            "display": "flex",
+                                            "alignItems": "center",
+                                            "marginBottom": "8px",
+                                        },
+                                    ),
+                                    html.Div(
+                                        [
+                                            html.Label(
+                                                "Max:",
+                                                style={
+                                                    "fontSize": "11px",
+                                                    "color": "#b9bfd3",
+                                                    "marginRight": "6px",
+                                                },
+                                            ),
+                                            dcc.Input(
+                                                id="filter-usager-age-max",
+                                                type="number",
+                                                value=99,
+                                                min=0,
+                                                max=120,
+                                                style={
+                                                    "width": "70px",
+                                                    "padding": "6px",
+                                                    "borderRadius": "4px",
+                                                    "border": "1px solid var(--border)",
+                                                    "backgroundColor": "#1a2035",
+                                                    "color": "#e6e9f2",
+                                                },
+                                            ),
+                                        ],
+                                        style={"display": "flex", "alignItems": "center"},
+                                    ),
+                                ],
+                                style={"marginBottom": "12px"},
+                            ),
+                            html.Hr(style={"margin": "16px 0"}),
+                            html.H6(
+                                "Filtres véhicule",
+                                style={
+                                    "color": "#6b5bd3",
+                                    "fontWeight": "700",
+                                    "marginBottom": "8px",
+                                    "borderBottom": "2px solid #6b5bd3",
+                                    "paddingBottom": "12px",
+                                },
+                            ),
+                            html.Div(
+                                [
+                                    html.I(
+                                        className="fas fa-info-circle",
+                                        style={"marginRight": "6px", "color": "#ff9800"},
+                                    ),
+                                    html.Span(
+                                        # message retiré (véhicules 2024 désormais disponibles)
+                                        "",
+                                    ),
+                                ],
+                                style={
+                                    # style conservé pour ne pas casser la mise en page
+                                    # (vide désormais)
+                                    "display": "none",
+                                },
+                            ),
+                            html.Label(
+                                "catégorie véhicule",
+                                style=FILTER_LABEL_STYLE,
+                            ),
+                            dcc.Dropdown(
+                                id="filter-vehicule-catv",
+                                options=[
+                                    {"label": "tous", "value": "all"},
+                                    {"label": "vélo", "value": 1},
+                                    {"label": "cyclo <50cm3", "value": 2},
+                                    {"label": "voiturette", "value": 3},
+                                    {"label": "scooter immatriculé", "value": 30},
+                                    {"label": "moto >50cm3", "value": 31},
+                                    {"label": "scooter <50cm3", "value": 32},
+                                    {"label": "moto >125cm3", "value": 33},
+                                    {"label": "scooter >125cm3", "value": 34},
+                                    {"label": "quad léger", "value": 40},
+                                    {"label": "quad lourd", "value": 41},
+                                    {"label": "cyclomoteur", "value": 42},
+                                    {"label": "VL seul", "value": 7},
+                                    {"label": "VL + caravane", "value": 10},
+                                    {"label": "VL + remorque", "value": 13},
+                                    {"label": "VU seul 1.5T-3.5T", "value": 14},
+                                    {"label": "VU seul + 3.5T", "value": 15},
+                                    {"label": "VU + remorque", "value": 16},
+                                    {"label": "PL seul 3.5T-7.5T", "value": 17},
+                                    {"label": "PL seul > 7.5T", "value": 18},
+                                    {"label": "PL > 3.5T + remorque", "value": 19},
+                                    {"label": "tracteur routier seul", "value": 20},
+                                    {"label": "tracteur routier + semi-remorque", "value": 21},
+                                    {"label": "transport en commun", "value": 37},
+                                    {"label": "tramway", "value": 38},
+                                    {"label": "EDP motorisé", "value": 50},
+                                    {"label": "EDP non motorisé", "value": 60},
+                                    {"label": "autre", "value": 99},
+                                ],
+                                value="all",
+                                clearable=False,
+                                style={"marginBottom": "12px"},
+                            ),
+                            html.Label(
+                                "motorisation",
+                                style=FILTER_LABEL_STYLE,
+                            ),
+                            dcc.Dropdown(
+                                id="filter-vehicule-motor",
+                                options=[
+                                    {"label": "tous", "value": "all"},
+                                    {"label": "hydrocarbure", "value": 1},
+                                    {"label": "électrique", "value": 2},
+                                    {"label": "hydrogène", "value": 3},
+                                    {"label": "humaine", "value": 4},
+                                    {"label": "hybride", "value": 5},
+                                    {"label": "GPL", "value": 6},
+                                    {"label": "autre", "value": 9},
+                                ],
+                                value="all",
+                                clearable=False,
+                                style={"marginBottom": "12px"},
+                            ),
+                            html.Hr(style={"margin": "16px 0"}),
+                            html.Label(
+                                "année",
+                                style=FILTER_LABEL_STYLE,
+                            ),
+                            dcc.Dropdown(
+                                id="filter-annee",
+                                options=(
+                                    [{"label": "toutes", "value": "all"}]
+                                    + [
+                                        {"label": str(y), "value": y}
+                                        for y in sorted(_default_view("annees"), reverse=True)
                                     ]
                                 ),
-                                dcc.Graph(
-                                    id="graph-age-histogram",
-                                    figure=_make_age_histogram(),
-                                    config={"responsive": True, "displayModeBar": True},
-                                ),
-                            ],
-                            className="page-card",
-                            style={
-                                "padding": "20px",
-                                "borderTop": "4px solid #f093fb",
-                                "marginTop": "24px",
-                            },
-                        ),
-                    ],
-                    style={"flex": "1", "minWidth": "0"},
-                ),
-            ],
-            style={"display": "flex", "gap": "24px"},
-        ),
-    ]
-)
+                                value="all",
+                                clearable=False,
+                                style={"marginBottom": "12px"},
+                            ),
+                            html.Label(
+                                "luminosité",
+                                style=FILTER_LABEL_STYLE,
+                            ),
+                            dcc.Dropdown(
+                                id="filter-luminosite",
+                                options=[
+                                    {"label": "toutes", "value": "all"},
+                                    {"label": "jour", "value": 1},
+                                    {"label": "crépuscule/aube", "value": 2},
+                                    {"label": "nuit", "value": 3},
+                                    {"label": "nuit sans éclairage", "value": 4},
+                                    {"label": "nuit avec éclairage", "value": 5},
+                                ],
+                                value="all",
+                                clearable=False,
+                                style={"marginBottom": "12px"},
+                            ),
+                            html.Label(
+                                "conditions atmosphériques",
+                                style=FILTER_LABEL_STYLE,
+                            ),
+                            dcc.Dropdown(
+                                id="filter-atm",
+                                options=[
+                                    {"label": "toutes", "value": "all"},
+                                    {"label": "normale", "value": 1},
+                                    {"label": "pluie légère", "value": 2},
+                                    {"label": "pluie forte", "value": 3},
+                                    {"label": "neige/grêle", "value": 4},
+                                    {"label": "brouillard/fumée", "value": 5},
+                                    {"label": "vent fort/tempête", "value": 6},
+                                    {"label": "éblouissant", "value": 7},
+                                    {"label": "couvert", "value": 8},
+                                    {"label": "autre", "value": 9},
+                                ],
+                                value="all",
+                                clearable=False,
+                                style={"marginBottom": "12px"},
+                            ),
+                            html.Label(
+                                "agglomération",
+                                style=FILTER_LABEL_STYLE,
+                            ),
+                            dcc.Dropdown(
+                                id="filter-agglomeration",
+                                options=[
+                                    {"label": "tous", "value": "all"},
+                                    {"label": "agglomération", "value": 1},
+                                    {"label": "hors agglomération", "value": 2},
+                                ],
+                                value="all",
+                                clearable=False,
+                            ),
+                            html.Button(
+                                "réinitialiser filtres",
+                                id="btn-reset-filters",
+                                n_clicks=0,
+                                style={
+                                    "marginTop": "16px",
+                                    "padding": "10px 16px",
+                                    "backgroundColor": "#1a2035",
+                                    "border": "1px solid var(--border)",
+                                    "borderRadius": "8px",
+                                    "cursor": "pointer",
+                                    "fontSize": "13px",
+                                    "color": "#b9bfd3",
+                                    "boxShadow": "0 6px 20px rgba(0,0,0,0.25)",
+                                },
+                            ),
+                        ],
+                        className="page-card",
+                        style={
+                            "width": "260px",
+                            "padding": "20px",
+                            "alignSelf": "flex-start",
+                        },
+                    ),
+                    # Contenu principal à droite
+                    html.Div(
+                        [
+                            html.Div(
+                                [
+                                    html.Div(
+                                        [
+                                            html.H3(
+                                                "courbe — accidents (heures/jours/mois)",
+                                                style={
+                                                    "fontSize": "16px",
+                                                    "fontWeight": "600",
+                                                    "color": "#e6e9f2",
+                                                    "marginBottom": "12px",
+                                                    "borderLeft": "4px solid #6b5bd3",
+                                                    "paddingLeft": "12px",
+                                                },
+                                            ),
+                                            html.Div(
+                                                [
+                                                    html.Button(
+                                                        "heures",
+                                                        id="btn-ts-hour",
+                                                        n_clicks=0,
+                                                        style={
+                                                            "padding": "8px 14px",
+                                                            "borderRadius": "8px",
+                                                            "border": "1px solid var(--border)",
+                                                            "backgroundColor": "#1a2035",
+                                                            "color": "#b9bfd3",
+                                                        },
+                                                    ),
+                                                    html.Button(
+                                                        "jours",
+                                                        id="btn-ts-day",
+                                                        n_clicks=0,
+                                                        style={
+                                                            "padding": "8px 14px",
+                                                            "borderRadius": "8px",
+                                                            "border": "1px solid var(--border)",
+                                                            "backgroundColor": "#1a2035",
+                                                            "color": "#b9bfd3",
+                                                            "marginLeft": "8px",
+                                                        },
+                                                    ),
+                                                    html.Button(
+                                                        "mois",
+                                                        id="btn-ts-month",
+                                                        n_clicks=0,
+                                                        style={
+                                                            "padding": "8px 14px",
+                                                            "borderRadius": "8px",
+                                                            "border": "1px solid var(--border)",
+                                                            "backgroundColor": "#1a2035",
+                                                            "color": "#b9bfd3",
+                                                            "marginLeft": "8px",
+                                                        },
+                                                    ),
+                                                    html.Button(
+                                                        "jours semaine",
+                                                        id="btn-ts-weekday",
+                                                        n_clicks=0,
+                                                        style={
+                                                            "padding": "8px 14px",
+                                                            "borderRadius": "8px",
+                                                            "border": "1px solid var(--border)",
+                                                            "backgroundColor": "#1a2035",
+                                                            "color": "#b9bfd3",
+                                                            "marginLeft": "8px",
+                                                        },
+                                                    ),
+                                                ],
+                                                style={
+                                                    "display": "flex",
+                                                    "justifyContent": "flex-start",
+                                                    "marginBottom": "12px",
+                                                },
+                                            ),
+                                        ]
+                                    ),
+                                    dcc.Graph(
+                                        id="graph-accidents-heure",
+                                        figure=_time_series_skeleton(),
+                                        config={"responsive": True, "displayModeBar": True},
+                                    ),
+                                ],
+                                className="page-card",
+                                style={"padding": "20px", "borderTop": "4px solid #7b5cff"},
+                            ),
+                            html.Div(
+                                [
+                                    html.H3(
+                                        "courbe 2 — distribution par sexe",
+                                        style={
+                                            "fontSize": "16px",
+                                            "fontWeight": "600",
+                                            "color": "#e6e9f2",
+                                            "marginBottom": "16px",
+                                            "borderLeft": "4px solid #f093fb",
+                                            "paddingLeft": "12px",
+                                        },
+                                    ),
+                                    dcc.Graph(
+                                        id="graph-accidents-pie",
+                                        figure=_default_view("graph-accidents-pie"),
+                                        config={"responsive": True, "displayModeBar": True},
+                                    ),
+                                ],
+                                className="page-card",
+                                style={
+                                    "padding": "20px",
+                                    "borderTop": "4px solid #ff57c2",
+                                    "marginTop": "24px",
+                                },
+                            ),
+                            html.Div(
+                                [
+                                    html.H3(
+                                        "courbe 3 — top catégories véhicule",
+                                        style={
+                                            "fontSize": "16px",
+                                            "fontWeight": "600",
+                                            "color": "#e6e9f2",
+                                            "marginBottom": "16px",
+                                            "borderLeft": "4px solid #f093fb",
+                                            "paddingLeft": "12px",
+                                        },
+                                    ),
+                                    dcc.Graph(
+                                        id="graph-catv-pie",
+                                        figure=_default_view("graph-catv-pie"),
+                                        config={"responsive": True, "displayModeBar": True},
+                                    ),
+                                ],
+                                className="page-card",
+                                style={
+                                    "padding": "20px",
+                                    "borderTop": "4px solid #3ae7ff",
+                                    "marginTop": "24px",
+                                },
+                            ),
+                            html.Div(
+                                [
+                                    html.H3(
+                                        "courbe 4 — distribution par motorisation",
+                                        style={
+                                            "fontSize": "16px",
+                                            "fontWeight": "600",
+                                            "color": "#e6e9f2",
+                                            "marginBottom": "16px",
+                                            "borderLeft": "4px solid #f093fb",
+                                            "paddingLeft": "12px",
+                                        },
+                                    ),
+                                    dcc.Graph(
+                                        id="graph-motor-pie",
+                                        figure=_default_view("graph-motor-pie"),
+                                        config={"responsive": True, "displayModeBar": True},
+                                    ),
+                                ],
+                                className="page-card",
+                                style={
+                                    "padding": "20px",
+                                    "borderTop": "4px solid #ff57c2",
+                                    "marginTop": "24px",
+                                },
+                            ),
+                            html.Div(
+                                [
+                                    html.H3(
+                                        "courbe 5 — répartition H/F par véhicule",
+                                        style={
+                                            "fontSize": "16px",
+                                            "fontWeight": "600",
+                                            "color": "#e6e9f2",
+                                            "marginBottom": "16px",
+                                            "borderLeft": "4px solid #3ae7ff",
+                                            "paddingLeft": "12px",
+                                        },
+                                    ),
+                                    dcc.Graph(
+                                        id="graph-catv-gender",
+                                        figure=_default_view("graph-catv-gender"),
+                                        config={"responsive": True, "displayModeBar": True},
+                                    ),
+                                ],
+                                className="page-card",
+                                style={
+                                    "padding": "20px",
+                                    "borderTop": "4px solid #3ae7ff",
+                                    "marginTop": "24px",
+                                },
+                            ),
+                            html.Div(
+                                [
+                                    html.Div(
+                                        [
+                                            html.H3(
+                                                "courbe 6 — répartition des conducteurs par âge",
+                                                style={
+                                                    "fontSize": "16px",
+                                                    "fontWeight": "600",
+                                                    "color": "#e6e9f2",
+                                                    "marginBottom": "12px",
+                                                    "borderLeft": "4px solid #f093fb",
+                                                    "paddingLeft": "12px",
+                                                },
+                                            ),
+                                            html.Div(
+                                                [
+                                                    html.Button(
+                                                        "Vue détaillée",
+                                                        id="btn-age-detail",
+                                                        n_clicks=0,
+                                                        style={
+                                                            "padding": "8px 14px",
+                                                            "borderRadius": "8px",
+                                                            "border": "1px solid var(--border)",
+                                                            "backgroundColor": "#1a2035",
+                                                            "color": "#b9bfd3",
+                                                        },
+                                                    ),
+                                                    html.Button(
+                                                        "Tranches d'âge",
+                                                        id="btn-age-tranche",
+                                                        n_clicks=0,
+                                                        style={
+                                                            "padding": "8px 14px",
+                                                            "borderRadius": "8px",
+                                                            "border": "1px solid var(--border)",
+                                                            "backgroundColor": "#1a2035",
+                                                            "color": "#b9bfd3",
+                                                            "marginLeft": "8px",
+                                                        },
+                                                    ),
+                                                ],
+                                                style={
+                                                    "display": "flex",
+                                                    "justifyContent": "flex-start",
+                                                    "marginBottom": "12px",
+                                                },
+                                            ),
+                                        ]
+                                    ),
+                                    dcc.Graph(
+                                        id="graph-age-histogram",
+                                        figure=go.Figure(),
+                                        config={"responsive": True, "displayModeBar": True},
+                                    ),
+                                ],
+                                className="page-card",
+                                style={
+                                    "padding": "20px",
+                                    "borderTop": "4px solid #f093fb",
+                                    "marginTop": "24px",
+                                },
+                            ),
+                            html.Div(
+                                [
+                                    html.H3(
+                                        "courbe 7 — densité des accidents",
+                                        style={
+                                            "fontSize": "16px",
+                                            "fontWeight": "600",
+                                            "color": "#e6e9f2",
+                                            "marginBottom": "12px",
+                                            "borderLeft": "4px solid #7b5cff",
+                                            "paddingLeft": "12px",
+                                        },
+                                    ),
+                                    dcc.Graph(
+                                        id="graph-density",
+                                        figure=_default_view("graph-density"),
+                                        config={"responsive": True, "displayModeBar": True},
+                                    ),
+                                ],
+                                className="page-card",
+                                style={
+                                    "padding": "20px",
+                                    "borderTop": "4px solid #7b5cff",
+                                    "marginTop": "24px",
+                                },
+                            ),
+                        ],
+                        style={"flex": "1", "minWidth": "0"},
+                    ),
+                ],
+                style={"display": "flex", "gap": "24px"},
+            ),
+        ]
+    )
 
 authors_page = html.Div(
     [
@@ -3111,6 +3078,79 @@ layout = html.Div(
 )
 
 
+# constructeurs des pages, appelés à la première visite seulement : naviguer ne
+# déclenche plus le travail (sql, figures) des autres pages
+PAGE_BUILDERS = {
+    "btn-about": lambda: about_page,
+    "btn-histogram": create_histogram_page,
+    "btn-choropleth": lambda: create_choropleth_page("dept"),
+    "btn-graph": create_graph_page,
+    "btn-authors": lambda: authors_page,
+}
+
+
+# tables dont dépend chaque page : pendant l'initialisation en tâche de fond, une
+# page s'ouvre dès que ses tables sont chargées
+PAGE_TABLES = {
+    "btn-histogram": "radars_",
+    "btn-choropleth": "caracteristiques_",
+    "btn-graph": "caract_usager_vehicule_",
+}
+
+
+@memoize()
+def _cached_page(button_id: str):
+    """squelette de page construit une fois par génération de la base.
+
+    les callbacks en mettent ensuite à jour le contenu ; une page construite pendant
+    une reconstruction (figures d'erreur) est refaite dès que la base change.
+    """
+    return PAGE_BUILDERS[button_id]()
+
+
+def _page_ready(button_id: str) -> bool:
+    """vrai si les tables de la page sont en base (toujours vrai hors initialisation)."""
+    prefix = PAGE_TABLES.get(button_id)
+    if prefix is None or not setup_running():
+        return True
+    try:
+        df = query_db(
+            f"SELECT 1 FROM sqlite_master WHERE type='table' AND name LIKE '{prefix}%' LIMIT 1"
+        )
+        return not df.empty
+    except Exception:  # base pas encore créée
+        return False
+
+
+def _build_page(button_id: str):
+    """page demandée ; pendant l'initialisation, construite sans cache (données partielles)."""
+    if setup_running():
+        return PAGE_BUILDERS[button_id]()
+    return _cached_page(button_id)
+
+
+def _setup_progress_page() -> html.Div:
+    """page de progression de l'initialisation (étapes, journal)."""
+    state = setup_snapshot()
+    return render_setup_page(
+        state.messages,
+        state.current_step,
+        completed=state.completed,
+        success=state.success,
+    )
+
+
+def _setup_wait_page(button_id: str) -> html.Div:
+    """attente d'une page : la progression est rafraîchie jusqu'à ce que ses données arrivent."""
+    return html.Div(
+        [
+            dcc.Store(id="setup-target", data=button_id),
+            dcc.Interval(id="setup-interval", interval=1000),
+            html.Div(_setup_progress_page(), id="setup-progress"),
+        ]
+    )
+
+
 @callback(
     Output("page-content", "children"),
     [
@@ -3122,119 +3162,285 @@ layout = html.Div(
     ],
 )
 def display_page(_about_clicks, _hist_clicks, _chor_clicks, _graph_clicks, _auth_clicks):
-    """affiche la page demandée selon le bouton cliqué."""
+    """affiche la page demandée selon le bouton cliqué (seule cette page est construite)."""
     ctx = dash.callback_context
     if not ctx.triggered:
         return about_page
 
     button_id = ctx.triggered[0]["prop_id"].split(".")[0]
-    mapping = {
-        "btn-about": about_page,
-        "btn-histogram": histogram_page,
-        "btn-choropleth": create_choropleth_page("dept"),
-        "btn-graph": graph_page,
-        "btn-authors": authors_page,
-    }
-    return mapping.get(button_id, about_page)
+    if button_id not in PAGE_BUILDERS:
+        return about_page
+    if not _page_ready(button_id):
+        return _setup_wait_page(button_id)
+    try:
+        return _build_page(button_id)
+    except Exception as err:  # base en cours de création : réessayer au prochain clic
+        print(f"erreur construction page {button_id} : {err}")
+        return html.Div(
+            html.P("Données en chargement... Rafraîchissez la page dans quelques secondes."),
+            style={"padding": "40px", "textAlign": "center", "color": "#999", "fontSize": "16px"},
+        )
+
+
+@callback(
+    Output("setup-progress", "children"),
+    Output("setup-interval", "disabled"),
+    Input("setup-interval", "n_intervals"),
+    State("setup-target", "data"),
+    prevent_initial_call=True,
+)
+def poll_setup(_n_intervals, button_id):
+    """rafraîchit la progression ; affiche la page attendue dès que ses tables sont prêtes."""
+    if button_id in PAGE_BUILDERS and _page_ready(button_id):
+        try:
+            return _build_page(button_id), True
+        except Exception as err:  # table en cours d'écriture : nouvel essai au prochain tick
+            print(f"erreur construction page {button_id} : {err}")
+    state = setup_snapshot()
+    # initialisation terminée en échec : garder le message, arrêter le rafraîchissement
+    return _setup_progress_page(), state.completed
 
 
 @callback(
-    Output("page-content", "children", allow_duplicate=True),
+    Output("carte-graph", "figure", allow_duplicate=True),
+    Output("carte-mode-flag", "children"),
+    Output("carte-level-flag", "children", allow_duplicate=True),
+    Output("btn-carte-region", "style"),
+    Output("btn-carte-dept", "style"),
+    Output("btn-carte-commune", "style"),
+    Output("btn-carte-grille", "style"),
+    Output("btn-carte-variation", "style"),
+    Output("carte-viewport", "data", allow_duplicate=True),
     [
         Input("btn-carte-region", "n_clicks"),
         Input("btn-carte-dept", "n_clicks"),
         Input("btn-carte-commune", "n_clicks"),
-        *[Input(f"btn-carte-year-{y}", "n_clicks") for y in _available_years()],
+        Input("btn-carte-grille", "n_clicks"),
+        Input("btn-carte-variation", "n_clicks"),
     ],
-    [State("carte-mode-flag", "children"), State("carte-year-flag", "children")],
+    State("carte-year-flag", "children"),
+    State("carte-grav", "value"),
+    State("carte-reference", "value"),
     prevent_initial_call=True,
 )
-def update_carte_view(*_args):
-    """met à jour la vue de la carte selon le mode et l'année."""
-    ctx = dash.callback_context
-    if not ctx.triggered:
-        default_year = _available_years()[-1] if _available_years() else 2023
-        return create_choropleth_page("dept", default_year)
+def update_carte_view(
+    _n_region, _n_dept, _n_commune, _n_grille, _n_variation, current_year_str, grav, reference
+):
+    """change le mode de la carte (région/département/commune/maille/variation) en gardant l'année.
 
-    button_id = ctx.triggered[0]["prop_id"].split(".")[0]
+    la figure ne contient que l'url de la géométrie, déjà en cache navigateur
+    après le premier affichage de chaque mode ; la vue par maille repart de la
+    france entière.
+    """
+    button_id = dash.callback_context.triggered[0]["prop_id"].split(".")[0]
+    mode = button_id.removeprefix("btn-carte-")
+    mode = mode if mode in CARTE_MODES else "dept"
+    # garder l'année courante si possible
+    try:
+        year = int(current_year_str) if current_year_str else None
+    except Exception:
+        year = None
+    year = year or (_available_years()[-1] if _available_years() else 2023)
+    if mode == "grille":
+        fig = _make_grid_map(year, None, _grav_value(grav))
+    elif mode == "variation":
+        fig = _make_variation_map(year, reference)
+    else:
+        fig = _make_choropleth(mode, year)
+    return [fig, mode, level_for_scale(None), *_carte_mode_styles(mode), None]
+
+
+def _grav_value(grav) -> int | None:
+    """code de gravité du sélecteur de la carte, None pour toutes."""
+    return None if grav in (None, "all") else int(grav)
+
+
+def _clicked_year(button_type: str) -> int:
+    """année du bouton (id à motif `{"type": ..., "year": ...}`) qui a déclenché le callback."""
+    triggered = dash.ctx.triggered_id
+    if (
+        not isinstance(triggered, dict)
+        or triggered.get("type") != button_type
+        or not dash.ctx.triggered[0]["value"]
+    ):
+        raise PreventUpdate
+    return int(triggered["year"])
 
-    # Déterminer le mode (dept, region, ou commune)
-    if button_id in ["btn-carte-region", "btn-carte-dept", "btn-carte-commune"]:
-        mode = (
-            "region"
-            if button_id == "btn-carte-region"
-            else ("commune" if button_id == "btn-carte-commune" else "dept")
+
+# boutons d'année à id à motif : les listes d'inputs ne dépendent plus des tables
+# présentes en base, l'import du module ne fait aucune requête
+@callback(
+    Output("carte-graph", "figure", allow_duplicate=True),
+    Output("carte-year-flag", "children"),
+    Output({"type": "carte-year", "year": ALL}, "style"),
+    Input({"type": "carte-year", "year": ALL}, "n_clicks"),
+    State({"type": "carte-year", "year": ALL}, "id"),
+    State("carte-mode-flag", "children"),
+    State("carte-viewport", "data"),
+    State("carte-grav", "value"),
+    State("carte-reference", "value"),
+    prevent_initial_call=True,
+)
+def update_carte_year(_n_clicks, button_ids, current_mode, viewport, grav, reference):
+    """change l'année de la carte : seules les valeurs (locations/z) et le titre sont envoyés.
+
+    la géométrie, déjà présente dans la figure du navigateur, n'est pas renvoyée
+    (sauf en vue par maille, où elle dépend des mailles visibles).
+    """
+    year = _clicked_year("carte-year")
+    mode = current_mode if current_mode in CARTE_MODES else "dept"
+    if mode == "grille":
+        patched = _grid_patch(_make_grid_map(year, viewport, _grav_value(grav)))
+    else:
+        fig = (
+            _make_variation_map(year, reference)
+            if mode == "variation"
+            else _make_choropleth(mode, year)
         )
-        # garder l'année courante si possible
-        current_year_str = dash.callback_context.states.get("carte-year-flag.children")
-        try:
-            current_year = int(current_year_str) if current_year_str else None
-        except Exception:
-            current_year = None
-        year_to_use = current_year or (_available_years()[-1] if _available_years() else 2023)
-        return create_choropleth_page(mode, year_to_use)
+        patched = _figure_patch(fig, ("locations", "z", "hovertext", "customdata"))
+    styles = [
+        CARTE_YEAR_ACTIVE_STYLE if b["year"] == year else CARTE_BTN_STYLE for b in button_ids
+    ]
+    return patched, str(year), styles
 
-    # Déterminer l'année
-    m = re.match(r"btn-carte-year-(\d{4})", button_id)
-    if m:
-        year = int(m.group(1))
-        # lire le mode courant depuis le state caché
-        current_mode = dash.callback_context.states.get("carte-mode-flag.children")
-        mode = current_mode if current_mode in ("dept", "region", "commune") else "dept"
-        return create_choropleth_page(mode, year)
 
-    default_year = _available_years()[-1] if _available_years() else 2023
-    return create_choropleth_page("dept", default_year)
+@callback(
+    Output("carte-graph", "figure", allow_duplicate=True),
+    Output("carte-level-flag", "children", allow_duplicate=True),
+    Input("carte-graph", "relayoutData"),
+    State("carte-mode-flag", "children"),
+    State("carte-level-flag", "children"),
+    prevent_initial_call=True,
+)
+def update_carte_level(relayout, mode, current_level):
+    """adapte le niveau de détail des contours communaux au zoom de la carte."""
+    if mode != "commune" or not relayout or "geo.projection.scale" not in relayout:
+        raise PreventUpdate
+    level = level_for_scale(relayout["geo.projection.scale"])
+    if level == current_level:
+        raise PreventUpdate
+    layer = get_layer("commune", level)
+    if layer is None or layer.level != level:
+        # niveaux non générés : la carte affiche déjà la couche complète
+        raise PreventUpdate
+    # seule l'url change : le navigateur télécharge (ou relit de son cache) ce niveau
+    patched = Patch()
+    patched["data"][0]["geojson"] = geometry_url("commune", level)
+    return patched, level
+
+
+# vue par maille : à chaque zoom ou déplacement, seules les mailles visibles du
+# niveau adapté sont lues (table grid_counts) et envoyées
+@callback(
+    Output("carte-graph", "figure", allow_duplicate=True),
+    Output("carte-viewport", "data"),
+    Input("carte-graph", "relayoutData"),
+    Input("carte-grav", "value"),
+    State("carte-mode-flag", "children"),
+    State("carte-year-flag", "children"),
+    State("carte-viewport", "data"),
+    prevent_initial_call=True,
+)
+def update_carte_grid(relayout, grav, mode, year_str, viewport):
+    """recalcule les mailles de la vue par maille pour la vue et la gravité courantes."""
+    if mode != "grille":
+        raise PreventUpdate
+    if dash.ctx.triggered_id == "carte-graph":
+        viewport = grid.merge_view(viewport, relayout)
+    try:
+        year = int(year_str)
+    except (TypeError, ValueError):
+        year = _available_years()[-1] if _available_years() else 2023
+    return _grid_patch(_make_grid_map(year, viewport, _grav_value(grav))), viewport
 
 
+# variation : changer de référence ne renvoie que les valeurs et le titre
 @callback(
-    Output("page-content", "children", allow_duplicate=True),
-    [Input(f"btn-year-{y}", "n_clicks") for y in _available_radar_years()],
+    Output("carte-graph", "figure", allow_duplicate=True),
+    Input("carte-reference", "value"),
+    State("carte-mode-flag", "children"),
+    State("carte-year-flag", "children"),
     prevent_initial_call=True,
 )
-def update_histogram_year(*_args):
-    """met à jour l'histogramme selon l'année sélectionnée."""
-    ctx = dash.callback_context
-    if not ctx.triggered:
-        return create_histogram_page()
+def update_carte_reference(reference, mode, year_str):
+    """change la référence de la vue variation (année précédente ou moyenne)."""
+    if mode != "variation":
+        raise PreventUpdate
+    try:
+        year = int(year_str)
+    except (TypeError, ValueError):
+        year = _available_years()[-1] if _available_years() else 2023
+    return _figure_patch(
+        _make_variation_map(year, reference), ("locations", "z", "hovertext", "customdata")
+    )
 
-    button_id = ctx.triggered[0]["prop_id"].split(".")[0]
-    m = re.match(r"btn-year-(\d{4})", button_id)
-    year = int(m.group(1)) if m else None
-    return create_histogram_page(year)
+
+# points noirs : contours lus dans la table hotspots, superposés après les traces de
+# la carte ; suit aussi les changements de vue et d'année (drapeaux), qui laissent
+# cette trace intacte
+@callback(
+    Output("carte-graph", "figure", allow_duplicate=True),
+    Input("carte-hotspots", "value"),
+    Input("carte-grav", "value"),
+    Input("carte-mode-flag", "children"),
+    Input("carte-year-flag", "children"),
+    prevent_initial_call=True,
+)
+def update_carte_hotspots(show, grav, mode, year_str):
+    """superpose (ou retire) les points noirs de l'année et de la gravité courantes."""
+    if not show and dash.ctx.triggered_id != "carte-hotspots":
+        raise PreventUpdate
+    try:
+        year = int(year_str)
+    except (TypeError, ValueError):
+        year = _available_years()[-1] if _available_years() else 2023
+    patched = Patch()
+    # la vue par maille porte déjà deux traces (mailles, accidents)
+    patched["data"][2 if mode == "grille" else 1] = (
+        _hotspot_trace(year, _grav_value(grav))
+        if show
+        else {"type": "scattergeo", "lon": [], "lat": [], "showlegend": False}
+    )
+    return patched
 
 
+# esquisses fusionnées en mémoire : aucune requête, quelques dizaines de µs
 @callback(
-    [
-        Output("graph-accidents-heure", "figure"),
-        Output("graph-accidents-pie", "figure"),
-        Output("graph-catv-pie", "figure"),
-        Output("graph-motor-pie", "figure"),
-        Output("graph-catv-gender", "figure"),
-        Output("graph-age-histogram", "figure"),
-    ],
-    [
-        Input("filter-annee", "value"),
-        Input("filter-agglomeration", "value"),
-        Input("filter-luminosite", "value"),
-        Input("filter-atm", "value"),
-        Input("filter-usager-sexe", "value"),
-        Input("filter-usager-trajet", "value"),
-        Input("filter-usager-grav", "value"),
-        Input("filter-usager-age-min", "value"),
-        Input("filter-usager-age-max", "value"),
-        Input("filter-vehicule-catv", "value"),
-        Input("filter-vehicule-motor", "value"),
-        Input("btn-ts-hour", "n_clicks"),
-        Input("btn-ts-day", "n_clicks"),
-        Input("btn-ts-month", "n_clicks"),
-        Input("btn-ts-weekday", "n_clicks"),
-        Input("btn-age-detail", "n_clicks"),
-        Input("btn-age-tranche", "n_clicks"),
-    ],
+    Output("radar-quantiles", "children"),
+    Input("quantile-annee", "value"),
+    Input("quantile-limite", "value"),
+    Input("quantile-heure", "value"),
+    Input("quantile-mois", "value"),
+    prevent_initial_call=True,
 )
-def update_graph_page_charts(
-    annee,
+def update_radar_quantiles(annee, limite, heure, mois):
+    """p50/p90/p99 de l'écart de vitesse pour la combinaison choisie."""
+    filters = [None if v in (None, "all") else int(v) for v in (annee, limite, heure, mois)]
+    return _quantile_summary(_radar_quantiles(*filters))
+
+
+@callback(
+    Output("histogram-graph", "figure"),
+    Output("radar-map", "figure"),
+    Output({"type": "radar-year", "year": ALL}, "style"),
+    Input({"type": "radar-year", "year": ALL}, "n_clicks"),
+    State({"type": "radar-year", "year": ALL}, "id"),
+    prevent_initial_call=True,
+)
+def update_histogram_year(_n_clicks, button_ids):
+    """met à jour l'histogramme (données, plage et zones seulement) et la carte des radars."""
+    year = _clicked_year("radar-year")
+    patched = _figure_patch(
+        _make_speed_histogram(year),
+        ("x", "customdata"),
+        layout_paths=(("shapes",), ("xaxis", "range")),
+    )
+    styles = [HIST_YEAR_ACTIVE_STYLE if b["year"] == year else HIST_BTN_STYLE for b in button_ids]
+    # quelques milliers de points agrégés : figure complète, sans patch
+    return patched, _make_radar_map(year), styles
+
+
+def _normalize_graph_filters(
     agg_value,
     lum_value,
     atm_value,
@@ -3245,17 +3451,8 @@ def update_graph_page_charts(
     age_max,
     catv_value,
     motor_value,
-    _n_h,
-    _n_d,
-    _n_m,
-    _n_w,
-    _n_age_detail,
-    _n_age_tranche,
-):
-    """met à jour la courbe temporelle (heures/jours/mois/jour de semaine) et les camemberts."""
-    ctx = dash.callback_context
-    year = annee
-
+) -> dict:
+    """convertit les valeurs brutes des filtres en arguments des fonctions _make_*."""
     # normaliser l'agglo
     if agg_value == "all" or agg_value is None:
         agg_filter = None
@@ -3290,7 +3487,7 @@ def update_graph_page_charts(
     sexe_filter = None if (sexe_value in (None, "all")) else int(sexe_value)
     trajet_filter = None if (trajet_value in (None, "all")) else int(trajet_value)
     grav_filter = None if (grav_value in (None, "all")) else int(grav_value)
-    
+
     # Convertir les âges en années de naissance
     birth_year_min, birth_year_max = (None, None)
     if age_min is not None and age_max is not None:
@@ -3302,117 +3499,274 @@ def update_graph_page_charts(
     catv_filter = None if (catv_value in (None, "all")) else int(catv_value)
     motor_filter = None if (motor_value in (None, "all")) else int(motor_value)
 
-    # déterminer l'unité depuis le bouton cliqué
-    unit = "hour"
-    age_view = "detail"  # Par défaut, vue détaillée
-    if ctx.triggered:
-        btn = ctx.triggered[0]["prop_id"].split(".")[0]
-        if btn == "btn-ts-day":
-            unit = "day"
-        elif btn == "btn-ts-month":
-            unit = "month"
-        elif btn == "btn-ts-weekday":
-            unit = "weekday"
-        elif btn == "btn-age-tranche":
-            age_view = "tranche"
-        elif btn == "btn-age-detail":
-            age_view = "detail"
-
-    return (
-        _make_time_series(
-            year,
-            agg_filter=agg_filter,
-            lum_filter=lum_filter,
-            atm_filter=atm_filter,
-            unit=unit,
-            sexe_filter=sexe_filter,
-            trajet_filter=trajet_filter,
-            grav_filter=grav_filter,
-            birth_year_min=birth_year_min,
-            birth_year_max=birth_year_max,
-            catv_filter=catv_filter,
-            motor_filter=motor_filter,
-        ),
-        _make_accidents_pie_chart(
-            year,
-            agg_filter=agg_filter,
-            lum_filter=lum_filter,
-            atm_filter=atm_filter,
-            sexe_filter=sexe_filter,
-            trajet_filter=trajet_filter,
-            grav_filter=grav_filter,
-            birth_year_min=birth_year_min,
-            birth_year_max=birth_year_max,
-            catv_filter=catv_filter,
-            motor_filter=motor_filter,
-        ),
-        _make_catv_pie_chart(
-            year,
-            agg_filter=agg_filter,
-            lum_filter=lum_filter,
-            atm_filter=atm_filter,
-            sexe_filter=sexe_filter,
-            trajet_filter=trajet_filter,
-            grav_filter=grav_filter,
-            birth_year_min=birth_year_min,
-            birth_year_max=birth_year_max,
-            catv_filter=catv_filter,
-            motor_filter=motor_filter,
-        ),
-        _make_motor_pie_chart(
-            year,
-            agg_filter=agg_filter,
-            lum_filter=lum_filter,
-            atm_filter=atm_filter,
-            sexe_filter=sexe_filter,
-            trajet_filter=trajet_filter,
-            grav_filter=grav_filter,
-            birth_year_min=birth_year_min,
-            birth_year_max=birth_year_max,
-            catv_filter=catv_filter,
-            motor_filter=motor_filter,
-        ),
-        _make_catv_gender_bar_chart(
-            year,
-            agg_filter=agg_filter,
-            lum_filter=lum_filter,
-            atm_filter=atm_filter,
-            sexe_filter=sexe_filter,
-            trajet_filter=trajet_filter,
-            grav_filter=grav_filter,
-            birth_year_min=birth_year_min,
-            birth_year_max=birth_year_max,
-            catv_filter=catv_filter,
-            motor_filter=motor_filter,
-        ),
-        _make_age_histogram(
-            year,
-            agg_filter=agg_filter,
-            lum_filter=lum_filter,
-            atm_filter=atm_filter,
-            sexe_filter=sexe_filter,
-            trajet_filter=trajet_filter,
-            grav_filter=grav_filter,
-            birth_year_min=birth_year_min,
-            birth_year_max=birth_year_max,
-            catv_filter=catv_filter,
-            motor_filter=motor_filter,
-        ) if age_view == "detail" else _make_age_tranche_histogram(
-            year,
-            agg_filter=agg_filter,
-            lum_filter=lum_filter,
-            atm_filter=atm_filter,
-            sexe_filter=sexe_filter,
-            trajet_filter=trajet_filter,
-            grav_filter=grav_filter,
-            birth_year_min=birth_year_min,
-            birth_year_max=birth_year_max,
-            catv_filter=catv_filter,
-            motor_filter=motor_filter,
-        ),
+    return {
+        "agg_filter": agg_filter,
+        "lum_filter": lum_filter,
+        "atm_filter": atm_filter,
+        "sexe_filter": sexe_filter,
+        "trajet_filter": trajet_filter,
+        "grav_filter": grav_filter,
+        "birth_year_min": birth_year_min,
+        "birth_year_max": birth_year_max,
+        "catv_filter": catv_filter,
+        "motor_filter": motor_filter,
+    }
+
+
+def _filters_from_store(store: dict | None) -> tuple[int | str, dict]:
+    """lit (année, filtres normalisés) depuis le store partagé de la page graphique."""
+    store = store or {}
+    return store.get("year", "all"), store.get("filters") or {}
+
+
+# valeurs initiales des filtres de la page graphique (ordre de _normalize_graph_filters)
+GRAPH_FILTER_DEFAULTS = ("all", "all", "all", "all", "all", "all", 18, 99, "all", "all")
+
+
+def _payload_or_error(build, label: str, year, filters: dict) -> dict:
+    """agrégat d'un graphique rendu côté navigateur, ou `{"error": ...}` qu'il affiche."""
+    try:
+        return build(year, **filters)
+    except Exception as err:
+        print(f"erreur {label} : {err}")
+        return {"error": str(err)[:100]}
+
+
+def _default_graph_filters() -> dict:
+    """filtres normalisés correspondant aux valeurs initiales de la page graphique."""
+    return _normalize_graph_filters(*GRAPH_FILTER_DEFAULTS)
+
+
+# vues identiques pour tous les visiteurs, prérendues en json après chaque build
+DEFAULT_VIEWS = {
+    "annees": _available_years,
+    "annees-radars": _available_radar_years,
+    "carte-dept-2023": lambda: _make_choropleth("dept", 2023),
+    "histogramme-2023": lambda: _make_speed_histogram(2023),
+    "radars-carte-2023": lambda: _make_radar_map(2023),
+    "radars-centiles": _radar_quantiles,
+    "graph-ts-payload": lambda: _payload_or_error(
+        _time_series_payload, "courbe temporelle", "all", _default_graph_filters()
+    ),
+    "graph-age-payload": lambda: _payload_or_error(
+        _age_payload, "histogramme des âges", "all", _default_graph_filters()
+    ),
+    "graph-accidents-pie": lambda: _make_accidents_pie_chart("all", **_default_graph_filters()),
+    "graph-catv-pie": lambda: _make_catv_pie_chart("all", **_default_graph_filters()),
+    "graph-motor-pie": lambda: _make_motor_pie_chart("all", **_default_graph_filters()),
+    "graph-catv-gender": lambda: _make_catv_gender_bar_chart("all", **_default_graph_filters()),
+    "graph-density": lambda: _make_density_heatmap("all", **_default_graph_filters()),
+}
+
+
+def _default_view(name: str, build=None):
+    """vue par défaut : json prérendu de la génération courante, sinon calculée."""
+    data = load_prerender(name)
+    if data is not None:
+        return data
+    return (build or DEFAULT_VIEWS[name])()
+
+
+def prerender_defaults(only_missing: bool = False) -> dict:
+    """écrit les vues par défaut en json (versionnées par génération de la base).
+
+    `only_missing` : ne recalcule que les vues sans fichier pour la génération courante.
+    """
+    start = time.perf_counter()
+    names = [n for n in DEFAULT_VIEWS if not only_missing or load_prerender(n) is None]
+    size = sum(write_prerender(name, DEFAULT_VIEWS[name]()) for name in names)
+    load_prerender.cache_clear()
+    return {
+        "views": len(names),
+        "bytes": size,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def warm_up_caches() -> dict:
+    """précalcule les vues par défaut (années × modes de carte, filtres initiaux).
+
+    à appeler après une reconstruction de la base ou au démarrage du serveur :
+    le premier visiteur de chaque vue lit alors le cache au lieu de la base.
+    renvoie la durée et le contenu du cache pour le journal de l'appelant.
+    """
+    start = time.perf_counter()
+    years = _available_years()
+    filters = _default_graph_filters()
+    views = 0
+    for year in years:
+        for mode in CARTE_MODES:
+            _make_choropleth(mode, year)
+            views += 1
+        _make_variation_map(year, "moyenne")
+        views += 1
+    for year in _available_radar_years():
+        _make_speed_histogram(year)
+        _make_radar_map(year)
+        views += 2
+    for year in ["all", *years]:
+        _time_series_payload(year, **filters)
+        _age_payload(year, **filters)
+        _make_accidents_pie_chart(year, **filters)
+        _make_catv_pie_chart(year, **filters)
+        _make_motor_pie_chart(year, **filters)
+        _make_catv_gender_bar_chart(year, **filters)
+        _density_grid(year, raster.FRANCE_BBOX, **filters)
+        views += 7
+    return {
+        "views": views,
+        "seconds": round(time.perf_counter() - start, 2),
+        "cache": cache_stats(),
+    }
+
+
+@callback(
+    Output("graph-filters-store", "data"),
+    [
+        Input("filter-annee", "value"),
+        Input("filter-agglomeration", "value"),
+        Input("filter-luminosite", "value"),
+        Input("filter-atm", "value"),
+        Input("filter-usager-sexe", "value"),
+        Input("filter-usager-trajet", "value"),
+        Input("filter-usager-grav", "value"),
+        Input("filter-usager-age-min", "value"),
+        Input("filter-usager-age-max", "value"),
+        Input("filter-vehicule-catv", "value"),
+        Input("filter-vehicule-motor", "value"),
+    ],
+    prevent_initial_call=True,
+)
+def update_graph_filters(annee, *filter_values):
+    """regroupe les filtres de la page graphique dans le store partagé par les graphiques."""
+    return {"year": annee, "filters": _normalize_graph_filters(*filter_values)}
+
+
+# bascules de vue côté navigateur (assets/graph_views.js) : aucun aller-retour serveur
+clientside_callback(
+    ClientsideFunction(namespace="graphs", function_name="selectTimeUnit"),
+    Output("ts-unit-store", "data"),
+    [
+        Input("btn-ts-hour", "n_clicks"),
+        Input("btn-ts-day", "n_clicks"),
+        Input("btn-ts-month", "n_clicks"),
+        Input("btn-ts-weekday", "n_clicks"),
+    ],
+    prevent_initial_call=True,
+)
+
+clientside_callback(
+    ClientsideFunction(namespace="graphs", function_name="selectAgeView"),
+    Output("age-view-store", "data"),
+    [Input("btn-age-detail", "n_clicks"), Input("btn-age-tranche", "n_clicks")],
+    prevent_initial_call=True,
+)
+
+
+# un seul agrégat par état de filtres ; les vues en sont dérivées dans le navigateur
+@callback(
+    Output("ts-payload-store", "data"),
+    Input("graph-filters-store", "data"),
+    prevent_initial_call=True,
+)
+def update_time_series_payload(store):
+    """calcule l'agrégat (heures, mois/jour) de la courbe temporelle."""
+    year, filters = _filters_from_store(store)
+    return _payload_or_error(_time_series_payload, "courbe temporelle", year, filters)
+
+
+clientside_callback(
+    ClientsideFunction(namespace="graphs", function_name="timeSeries"),
+    Output("graph-accidents-heure", "figure"),
+    [Input("ts-payload-store", "data"), Input("ts-unit-store", "data")],
+    State("graph-accidents-heure", "figure"),
+)
+
+
+@callback(
+    Output("age-payload-store", "data"),
+    Input("graph-filters-store", "data"),
+    prevent_initial_call=True,
+)
+def update_age_payload(store):
+    """calcule l'agrégat âge -> nombre de conducteurs de l'histogramme des âges."""
+    year, filters = _filters_from_store(store)
+    return _payload_or_error(_age_payload, "histogramme des âges", year, filters)
+
+
+clientside_callback(
+    ClientsideFunction(namespace="graphs", function_name="ageHistogram"),
+    Output("graph-age-histogram", "figure"),
+    [Input("age-payload-store", "data"), Input("age-view-store", "data")],
+)
+
+
+# un callback par graphique : un clic ne recalcule que sa propre figure et n'en
+# renvoie que les données (Patch), la mise en page restant celle du navigateur ;
+# l'état initial (filtres par défaut) est celui, prérendu, du layout
+@callback(
+    Output("graph-accidents-pie", "figure"),
+    Input("graph-filters-store", "data"),
+    prevent_initial_call=True,
+)
+def update_accidents_pie(store):
+    """met à jour le camembert par sexe."""
+    year, filters = _filters_from_store(store)
+    return _figure_patch(_make_accidents_pie_chart(year, **filters), ("labels", "values"))
+
+
+@callback(
+    Output("graph-catv-pie", "figure"),
+    Input("graph-filters-store", "data"),
+    prevent_initial_call=True,
+)
+def update_catv_pie(store):
+    """met à jour le camembert par catégorie de véhicule."""
+    year, filters = _filters_from_store(store)
+    return _figure_patch(_make_catv_pie_chart(year, **filters), ("labels", "values"))
+
+
+@callback(
+    Output("graph-motor-pie", "figure"),
+    Input("graph-filters-store", "data"),
+    prevent_initial_call=True,
+)
+def update_motor_pie(store):
+    """met à jour le camembert par motorisation."""
+    year, filters = _filters_from_store(store)
+    return _figure_patch(_make_motor_pie_chart(year, **filters), ("labels", "values"))
+
+
+@callback(
+    Output("graph-catv-gender", "figure"),
+    Input("graph-filters-store", "data"),
+    prevent_initial_call=True,
+)
+def update_catv_gender(store):
+    """met à jour les barres H/F par catégorie de véhicule."""
+    year, filters = _filters_from_store(store)
+    return _figure_patch(
+        _make_catv_gender_bar_chart(year, **filters), ("x", "y", "text"), n_traces=2
     )
 
 
+# la grille suit le zoom : chaque déplacement ne recalcule que les tuiles manquantes
+@callback(
+    Output("graph-density", "figure"),
+    Input("graph-filters-store", "data"),
+    Input("graph-density", "relayoutData"),
+    prevent_initial_call=True,
+)
+def update_density(store, relayout):
+    """met à jour la heatmap de densité pour les filtres et la vue affichée."""
+    # relayoutData sans emprise (autosize du premier rendu) : la figure est déjà à jour
+    if dash.ctx.triggered_id == "graph-density" and not raster.is_view_change(relayout):
+        raise PreventUpdate
+    year, filters = _filters_from_store(store)
+    bbox = raster.bbox_from_relayout(relayout)
+    return _figure_patch(_make_density_heatmap(year, bbox, **filters), ("x", "y", "z"))
+
+
 # Réinitialisation des filtres de la page graphique
 @callback(
     Output("filter-annee", "value"),
@@ -5,10 +5,16 @@ from __future__ import annotations
 from typing import Iterable
 from dash import html
 
+# étapes publiées par main.setup_data : chaque jeu de données est chargé en base
+# dès qu'il est prêt, les pages qui en dépendent deviennent disponibles aussitôt
 STEP_FLOW = [
     "initialisation des données",
-    "téléchargement du csv",
-    "initialisation de la base sqlite",
+    "préparation des accidents",
+    "chargement des accidents",
+    "préparation des radars",
+    "chargement des radars",
+    "préparation des usagers et véhicules",
+    "création des tables jointes",
     "vérification des données",
     "initialisation terminée",
 ]
@@ -38,7 +44,7 @@ def _status_texts(
     if not completed:
         return (
             clean_step or "initialisation en cours...",
-            "merci de patienter pendant la préparation des données.",
+            "cette page s'affichera dès que ses données seront chargées.",
         )
     if success:
         return "initialisation terminée.", "redirection vers l'accueil en cours..."
@@ -97,6 +103,9 @@ def _build_step_list(
             return "[>]"
         if step in seen_steps:
             return "[x]"
+        # étape ancienne sortie de la fenêtre des messages mais déjà franchie
+        if clean_step in STEP_FLOW and STEP_FLOW.index(step) < STEP_FLOW.index(clean_step):
+            return "[x]"
         return "[ ]"
 
     return html.Div(
@@ -115,6 +124,25 @@ def _build_step_list(
     )
 
 
+def _build_log(messages: Iterable[str], limit: int = 8) -> html.Div:
+    """dernières lignes du journal (hors étapes) : fichiers chargés, lignes/s."""
+    lines = [m for m in messages if not m.startswith("[STEP] ")][-limit:]
+    return html.Div(
+        [html.Div(line) for line in lines],
+        style={
+            "marginTop": "20px",
+            "padding": "12px",
+            "backgroundColor": "#f8fafc",
+            "border": "1px solid #e4e7eb",
+            "borderRadius": "8px",
+            "fontFamily": "monospace",
+            "fontSize": "12px",
+            "color": "#52606d",
+            "whiteSpace": "pre-wrap",
+        },
+    )
+
+
 def render_setup_page(
     messages: Iterable[str],
     current_step: str | None,
@@ -123,6 +151,7 @@ def render_setup_page(
     success: bool,
 ) -> html.Div:
     """construit la page affichée pendant l'initialisation des données."""
+    messages = list(messages)
     seen_steps = _extract_seen_steps(messages)
     last_seen = seen_steps[-1] if seen_steps else None
     clean_step = current_step or last_seen
@@ -144,6 +173,7 @@ def render_setup_page(
             progress_bar,
             steps_summary,
             step_list,
+            _build_log(messages),
         ],
         style={
             "maxWidth": "640px",
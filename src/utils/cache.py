@@ -0,0 +1,99 @@
+"""mémoïsation des agrégats et figures, invalidée à chaque reconstruction de la base.
+
+chaque fonction décorée par `memoize` garde ses résultats tant que la
+« génération » de la base (date de modification et taille du fichier sqlite)
+ne change pas : après un rechargement, les anciennes entrées sont purgées au
+premier appel. en production (`gunicorn.conf.py`), le cache est rempli dans le
+process maître avant le fork et partagé par les workers (copie sur écriture).
+
+les valeurs renvoyées sont partagées entre les appels : ne pas les modifier.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar
+
+from .db_connection import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+CACHE_ENABLED = os.getenv("query_cache", "1").lower() in ("1", "true", "yes")
+DEFAULT_MAXSIZE = int(os.getenv("query_cache_size", "256"))
+
+_REGISTRY: dict[str, Any] = {}
+
+
+def db_generation() -> str:
+    """identifiant de l'état courant du fichier sqlite ("0" si la base n'existe pas)."""
+    try:
+        stat = DATABASE_PATH.stat()
+    except OSError:
+        return "0"
+    return f"{stat.st_mtime_ns:x}{stat.st_size:x}"
+
+
+def memoize(maxsize: int = DEFAULT_MAXSIZE) -> Callable[[F], F]:
+    """décorateur lru par génération de base ; arguments hashables uniquement."""
+
+    def decorator(func: F) -> F:
+        entries: OrderedDict[tuple, Any] = OrderedDict()
+        lock = threading.Lock()
+        state = {"generation": None, "hits": 0, "misses": 0}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not CACHE_ENABLED:
+                return func(*args, **kwargs)
+            generation = db_generation()
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                if state["generation"] != generation:
+                    entries.clear()
+                    state["generation"] = generation
+                if key in entries:
+                    entries.move_to_end(key)
+                    state["hits"] += 1
+                    return entries[key]
+                state["misses"] += 1
+            # calcul hors verrou : deux appels simultanés peuvent calculer la même entrée
+            value = func(*args, **kwargs)
+            with lock:
+                if state["generation"] == generation:
+                    entries[key] = value
+                    while len(entries) > maxsize:
+                        entries.popitem(last=False)
+            return value
+
+        def cache_info() -> dict[str, int]:
+            with lock:
+                return {"entries": len(entries), "hits": state["hits"], "misses": state["misses"]}
+
+        def cache_clear() -> None:
+            with lock:
+                entries.clear()
+                state["generation"] = None
+
+        wrapper.cache_info = cache_info  # type: ignore[attr-defined]
+        wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
+        _REGISTRY[func.__qualname__] = wrapper
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """entrées, hits et misses de chaque fonction mémoïsée."""
+    return {name: wrapper.cache_info() for name, wrapper in _REGISTRY.items()}
+
+
+def clear_caches() -> None:
+    """vide toutes les fonctions mémoïsées."""
+    for wrapper in _REGISTRY.values():
+        wrapper.cache_clear()
@@ -0,0 +1,101 @@
+"""connexions sqlite du dashboard : pool partagé, lecture seule, pragmas de performance.
+
+toutes les lectures du dashboard passent par `get_read_engine()` : un seul pool
+thread-safe (serveur dash multi-thread) dont chaque connexion est ouverte en
+`mode=ro` et configurée avec mmap/cache/temp_store/query_only. le mmap permet
+aux connexions (et aux process gunicorn) de partager le cache de pages de l'os.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# chemin absolu (indépendant du répertoire courant), surchargeable par variable d'env
+DATABASE_PATH = Path(os.getenv("db_path", ROOT / "bdd" / "database.db"))
+
+# `immutable=1` : sqlite ne verrouille plus et ne vérifie plus les modifications du
+# fichier. à n'activer que si la base n'est pas reconstruite pendant le service
+# (ex. production), sinon `mode=ro` simple.
+DB_IMMUTABLE = os.getenv("db_immutable", "0").lower() in ("1", "true", "yes")
+
+POOL_SIZE = int(os.getenv("db_pool_size", "8"))
+MMAP_SIZE = int(os.getenv("db_mmap_size", str(512 * 1024 * 1024)))  # octets
+CACHE_SIZE_KIB = int(os.getenv("db_cache_size_kib", str(32 * 1024)))  # par connexion
+
+_ENGINE: Engine | None = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def _readonly_uri(path: Path = DATABASE_PATH, immutable: bool = DB_IMMUTABLE) -> str:
+    """construit l'uri sqlite en lecture seule (immutable si demandé)."""
+    uri = f"{path.resolve().as_uri()}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    return uri
+
+
+def connect_readonly(
+    path: Path = DATABASE_PATH, immutable: bool = DB_IMMUTABLE
+) -> sqlite3.Connection:
+    """ouvre une connexion sqlite brute en lecture seule avec les pragmas de lecture."""
+    conn = sqlite3.connect(
+        _readonly_uri(path, immutable),
+        uri=True,
+        check_same_thread=False,  # le pool la confie successivement à plusieurs threads
+        timeout=30,
+    )
+    cur = conn.cursor()
+    cur.execute(f"PRAGMA mmap_size = {int(MMAP_SIZE)}")
+    cur.execute(f"PRAGMA cache_size = -{int(CACHE_SIZE_KIB)}")
+    cur.execute("PRAGMA temp_store = MEMORY")
+    cur.execute("PRAGMA query_only = ON")
+    cur.close()
+    return conn
+
+
+def get_read_engine() -> Engine:
+    """retourne le moteur sqlalchemy partagé (créé au premier appel)."""
+    global _ENGINE  # pylint: disable=global-statement
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                _ENGINE = create_engine(
+                    "sqlite://",
+                    creator=connect_readonly,
+                    poolclass=QueuePool,
+                    pool_size=POOL_SIZE,
+                    max_overflow=POOL_SIZE,
+                    pool_timeout=30,
+                )
+                logger.info(
+                    "pool lecture seule sur %s (taille=%d, immutable=%s)",
+                    DATABASE_PATH,
+                    POOL_SIZE,
+                    DB_IMMUTABLE,
+                )
+    return _ENGINE
+
+
+def dispose_read_engine(close: bool = True) -> None:
+    """ferme les connexions du pool (après reconstruction de la base ou avant un fork).
+
+    dans un process fils, `close=False` abandonne les connexions héritées du parent
+    sans les fermer (elles restent utilisables par celui-ci).
+    """
+    global _ENGINE  # pylint: disable=global-statement
+    with _ENGINE_LOCK:
+        if _ENGINE is not None:
+            _ENGINE.dispose(close=close)
+            _ENGINE = None
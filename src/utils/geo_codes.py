@@ -0,0 +1,367 @@
+"""codes géographiques partagés : départements, régions, communes et arrondissements.
+
+utilisé par le dashboard (cartes) et par load_to_db (agrégats précalculés), pour
+que le repliement des arrondissements et le passage département -> région soient
+définis à un seul endroit.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+# mapping département -> région (codes régions 2016)
+DEPT_TO_REGION: dict[str, str] = {
+    # Auvergne-Rhône-Alpes (84)
+    "01": "84",
+    "03": "84",
+    "07": "84",
+    "15": "84",
+    "26": "84",
+    "38": "84",
+    "42": "84",
+    "43": "84",
+    "63": "84",
+    "69": "84",
+    "73": "84",
+    "74": "84",
+    # Bourgogne-Franche-Comté (27)
+    "21": "27",
+    "25": "27",
+    "39": "27",
+    "58": "27",
+    "70": "27",
+    "71": "27",
+    "89": "27",
+    "90": "27",
+    # Bretagne (53)
+    "22": "53",
+    "29": "53",
+    "35": "53",
+    "56": "53",
+    # Centre-Val de Loire (24)
+    "18": "24",
+    "28": "24",
+    "36": "24",
+    "37": "24",
+    "41": "24",
+    "45": "24",
+    # Corse (94)
+    "2A": "94",
+    "2B": "94",
+    # Grand Est (44)
+    "08": "44",
+    "10": "44",
+    "51": "44",
+    "52": "44",
+    "54": "44",
+    "55": "44",
+    "57": "44",
+    "67": "44",
+    "68": "44",
+    "88": "44",
+    # Hauts-de-France (32)
+    "02": "32",
+    "59": "32",
+    "60": "32",
+    "62": "32",
+    "80": "32",
+    # Île-de-France (11)
+    "75": "11",
+    "77": "11",
+    "78": "11",
+    "91": "11",
+    "92": "11",
+    "93": "11",
+    "94": "11",
+    "95": "11",
+    # Normandie (28)
+    "14": "28",
+    "27": "28",
+    "50": "28",
+    "61": "28",
+    "76": "28",
+    # Nouvelle-Aquitaine (75)
+    "16": "75",
+    "17": "75",
+    "19": "75",
+    "23": "75",
+    "24": "75",
+    "33": "75",
+    "40": "75",
+    "47": "75",
+    "64": "75",
+    "79": "75",
+    "86": "75",
+    "87": "75",
+    # Occitanie (76)
+    "09": "76",
+    "11": "76",
+    "12": "76",
+    "30": "76",
+    "31": "76",
+    "32": "76",
+    "34": "76",
+    "46": "76",
+    "48": "76",
+    "65": "76",
+    "66": "76",
+    "81": "76",
+    "82": "76",
+    # Pays de la Loire (52)
+    "44": "52",
+    "49": "52",
+    "53": "52",
+    "72": "52",
+    "85": "52",
+    # Provence-Alpes-Côte d'Azur (93)
+    "04": "93",
+    "05": "93",
+    "06": "93",
+    "13": "93",
+    "83": "93",
+    "84": "93",
+    # Outre-mer
+    "971": "01",
+    "972": "02",
+    "973": "03",
+    "974": "04",
+    "976": "06",
+}
+
+# noms des régions (codes 2016)
+REGION_NAMES: dict[str, str] = {
+    "84": "Auvergne-Rhône-Alpes",
+    "27": "Bourgogne-Franche-Comté",
+    "53": "Bretagne",
+    "24": "Centre-Val de Loire",
+    "94": "Corse",
+    "44": "Grand Est",
+    "32": "Hauts-de-France",
+    "11": "Île-de-France",
+    "28": "Normandie",
+    "75": "Nouvelle-Aquitaine",
+    "76": "Occitanie",
+    "52": "Pays de la Loire",
+    "93": "Provence-Alpes-Côte d'Azur",
+    "01": "Guadeloupe",
+    "02": "Martinique",
+    "03": "Guyane",
+    "04": "La Réunion",
+    "06": "Mayotte",
+}
+
+# noms des départements
+DEPT_NAMES: dict[str, str] = {
+    "01": "Ain",
+    "02": "Aisne",
+    "03": "Allier",
+    "04": "Alpes-de-Haute-Provence",
+    "05": "Hautes-Alpes",
+    "06": "Alpes-Maritimes",
+    "07": "Ardèche",
+    "08": "Ardennes",
+    "09": "Ariège",
+    "10": "Aube",
+    "11": "Aude",
+    "12": "Aveyron",
+    "13": "Bouches-du-Rhône",
+    "14": "Calvados",
+    "15": "Cantal",
+    "16": "Charente",
+    "17": "Charente-Maritime",
+    "18": "Cher",
+    "19": "Corrèze",
+    "21": "Côte-d'Or",
+    "22": "Côtes-d'Armor",
+    "23": "Creuse",
+    "24": "Dordogne",
+    "25": "Doubs",
+    "26": "Drôme",
+    "27": "Eure",
+    "28": "Eure-et-Loir",
+    "29": "Finistère",
+    "2A": "Corse-du-Sud",
+    "2B": "Haute-Corse",
+    "30": "Gard",
+    "31": "Haute-Garonne",
+    "32": "Gers",
+    "33": "Gironde",
+    "34": "Hérault",
+    "35": "Ille-et-Vilaine",
+    "36": "Indre",
+    "37": "Indre-et-Loire",
+    "38": "Isère",
+    "39": "Jura",
+    "40": "Landes",
+    "41": "Loir-et-Cher",
+    "42": "Loire",
+    "43": "Haute-Loire",
+    "44": "Loire-Atlantique",
+    "45": "Loiret",
+    "46": "Lot",
+    "47": "Lot-et-Garonne",
+    "48": "Lozère",
+    "49": "Maine-et-Loire",
+    "50": "Manche",
+    "51": "Marne",
+    "52": "Haute-Marne",
+    "53": "Mayenne",
+    "54": "Meurthe-et-Moselle",
+    "55": "Meuse",
+    "56": "Morbihan",
+    "57": "Moselle",
+    "58": "Nièvre",
+    "59": "Nord",
+    "60": "Oise",
+    "61": "Orne",
+    "62": "Pas-de-Calais",
+    "63": "Puy-de-Dôme",
+    "64": "Pyrénées-Atlantiques",
+    "65": "Hautes-Pyrénées",
+    "66": "Pyrénées-Orientales",
+    "67": "Bas-Rhin",
+    "68": "Haut-Rhin",
+    "69": "Rhône",
+    "70": "Haute-Saône",
+    "71": "Saône-et-Loire",
+    "72": "Sarthe",
+    "73": "Savoie",
+    "74": "Haute-Savoie",
+    "75": "Paris",
+    "76": "Seine-Maritime",
+    "77": "Seine-et-Marne",
+    "78": "Yvelines",
+    "79": "Deux-Sèvres",
+    "80": "Somme",
+    "81": "Tarn",
+    "82": "Tarn-et-Garonne",
+    "83": "Var",
+    "84": "Vaucluse",
+    "85": "Vendée",
+    "86": "Vienne",
+    "87": "Haute-Vienne",
+    "88": "Vosges",
+    "89": "Yonne",
+    "90": "Territoire de Belfort",
+    "91": "Essonne",
+    "92": "Hauts-de-Seine",
+    "93": "Seine-Saint-Denis",
+    "94": "Val-de-Marne",
+    "95": "Val-d'Oise",
+    "971": "Guadeloupe",
+    "972": "Martinique",
+    "973": "Guyane",
+    "974": "La Réunion",
+    "976": "Mayotte",
+}
+
+
+# arrondissements municipaux -> code insee de la commune
+# Paris: 75101-75120 -> 75056
+# Lyon: 69381-69389 -> 69123
+# Marseille: 13201-13216 -> 13055
+ARRONDISSEMENT_TO_COMMUNE: dict[str, str] = {
+    **{f"751{i:02d}": "75056" for i in range(1, 21)},
+    **{f"6938{i}": "69123" for i in range(1, 10)},
+    **{f"132{i:02d}": "13055" for i in range(1, 17)},
+}
+
+
+def normalize_dept(dep: pd.Series) -> pd.Series:
+    """codes département sur 2 caractères au moins (1 -> 01, 2A et 971 inchangés)."""
+    return dep.astype(str).str.strip().str.upper().str.zfill(2)
+
+
+def normalize_commune(com: pd.Series) -> pd.Series:
+    """codes commune insee sur 5 caractères, arrondissements repliés sur leur commune."""
+    codes = com.astype(str).str.strip().str.upper().str.zfill(5)
+    return codes.map(ARRONDISSEMENT_TO_COMMUNE).fillna(codes)
+
+
+def dept_to_region(dep: pd.Series) -> pd.Series:
+    """code région 2016 de chaque département (NaN si inconnu)."""
+    return normalize_dept(dep).map(DEPT_TO_REGION)
+
+
+# niveaux des agrégats de carte (mêmes noms que les modes de la page carte)
+CHOROPLETH_LEVELS = ("commune", "dept", "region")
+
+
+def aggregate_counts(df: pd.DataFrame, niveau: str) -> pd.DataFrame:
+    """agrège des comptes par (dep, com) au niveau demandé -> colonnes code, accidents.
+
+    df: colonnes `dep`, `com` et `accidents` (ex. GROUP BY dep, com).
+    """
+    if niveau == "commune":
+        df = df[df["com"].notna()]
+        codes = normalize_commune(df["com"])
+    elif niveau == "region":
+        codes = dept_to_region(df["dep"])
+    else:
+        df = df[df["dep"].notna()]
+        codes = normalize_dept(df["dep"])
+    out = (
+        pd.DataFrame({"code": codes, "accidents": df["accidents"]})
+        .dropna(subset=["code"])
+        .groupby("code", as_index=False)["accidents"]
+        .sum()
+    )
+    out["accidents"] = out["accidents"].astype(int)
+    return out
+
+
+# références des variations annuelles : année précédente disponible, moyenne des années
+DELTA_REFERENCES = ("precedente", "moyenne")
+
+
+def year_deltas(counts: pd.DataFrame) -> pd.DataFrame:
+    """variations par zone de chaque année, contre la précédente et contre la moyenne.
+
+    counts: colonnes niveau, annee, code, accidents (table `choropleth_counts`) ;
+    une zone absente d'une année y compte 0 accident. colonnes : niveau, annee,
+    reference, annee_reference (vide pour la moyenne), code, accidents,
+    reference_accidents, ecart, ratio (vide si la référence est nulle).
+    """
+    frames = []
+    for niveau, df in counts.groupby("niveau", sort=False):
+        wide = df.pivot_table(
+            index="code", columns="annee", values="accidents", aggfunc="sum", fill_value=0
+        )
+        years = sorted(wide.columns)
+        mean = wide.mean(axis=1).round(2)
+        pairs = [("precedente", prev, wide[prev], year) for prev, year in zip(years, years[1:])]
+        pairs += [("moyenne", None, mean, year) for year in years]
+        for reference, ref_year, ref_counts, year in pairs:
+            frame = pd.DataFrame(
+                {
+                    "code": wide.index,
+                    "accidents": wide[year].to_numpy(),
+                    "reference_accidents": ref_counts.to_numpy(),
+                }
+            )
+            frame = frame[(frame["accidents"] > 0) | (frame["reference_accidents"] > 0)]
+            frame["ecart"] = (frame["accidents"] - frame["reference_accidents"]).round(2)
+            ratio = frame["accidents"] / frame["reference_accidents"].where(
+                frame["reference_accidents"] > 0
+            )
+            frame["ratio"] = ratio.round(4)
+            frame.insert(0, "annee_reference", ref_year)
+            frame.insert(0, "reference", reference)
+            frame.insert(0, "annee", int(year))
+            frame.insert(0, "niveau", niveau)
+            frames.append(frame)
+    columns = [
+        "niveau",
+        "annee",
+        "reference",
+        "annee_reference",
+        "code",
+        "accidents",
+        "reference_accidents",
+        "ecart",
+        "ratio",
+    ]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    out = pd.concat(frames, ignore_index=True)[columns]
+    return out.astype({"annee_reference": "Int64"})
@@ -0,0 +1,226 @@
+"""registre des géométries geojson (régions, départements, communes) partagé par le process.
+
+chaque couche est lue une seule fois (au démarrage ou au premier usage) puis
+conservée en mémoire avec un index code -> feature et l'ensemble des codes
+connus. un cache binaire (pickle) optionnel dans `bdd/cache` évite de re-parser
+le json au démarrage à froid ; il est invalidé dès que le fichier source change
+(date de modification ou taille).
+
+les couches peuvent aussi exister en niveaux simplifiés (`low`, `medium`,
+`high`, produits par `src.utils.simplify_geometry`) ; à défaut, le fichier
+complet est utilisé.
+
+le blueprint `geometry_bp` sert ces fichiers au navigateur sous une url
+versionnée (`geometry_url`) avec un cache http longue durée : les figures ne
+contiennent plus que l'url, la géométrie est téléchargée une seule fois.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flask import Blueprint, abort, send_file
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[2]
+
+LAYER_PATHS: dict[str, Path] = {
+    "region": ROOT / "regions-version-simplifiee.geojson",
+    "dept": ROOT / "departements-version-simplifiee.geojson",
+    "commune": ROOT / "communes.geojson",
+}
+
+# niveaux simplifiés produits par src/utils/simplify_geometry.py
+LEVELS_DIR = Path(os.getenv("geometry_levels_dir", ROOT / "data" / "geometries"))
+
+# échelle de projection plotly (1 = vue france entière) -> niveau de détail
+SCALE_LEVELS: list[tuple[float, str]] = [(2.5, "low"), (8.0, "medium")]
+MAX_LEVEL = "high"
+
+CACHE_DIR = Path(os.getenv("geometry_cache_dir", ROOT / "bdd" / "cache"))
+DISK_CACHE = os.getenv("geometry_disk_cache", "1").lower() in ("1", "true", "yes")
+
+_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class GeoLayer:
+    """couche geojson chargée : collection complète, index par code et codes connus."""
+
+    name: str
+    geojson: dict = field(repr=False)
+    features: dict[str, dict] = field(repr=False)
+    codes: frozenset[str] = field(repr=False)
+    level: str | None = None
+
+    def known(self, codes) -> list[str]:
+        """filtre une liste de codes sur ceux présents dans la couche (ordre conservé)."""
+        return [c for c in codes if c in self.codes]
+
+
+_LAYERS: dict[tuple[str, str | None], GeoLayer | None] = {}
+_LOCK = threading.Lock()
+
+
+def _source_stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cache_path(name: str) -> Path:
+    return CACHE_DIR / f"geometry_{name}.pickle"
+
+
+def level_path(name: str, level: str) -> Path:
+    """chemin du fichier simplifié d'une couche pour un niveau donné."""
+    return LEVELS_DIR / f"{LAYER_PATHS[name].stem}-{level}.geojson"
+
+
+def level_for_scale(scale: float | None) -> str:
+    """niveau de détail adapté à l'échelle de projection courante de la carte."""
+    if not scale:
+        return SCALE_LEVELS[0][1]
+    for max_scale, level in SCALE_LEVELS:
+        if scale < max_scale:
+            return level
+    return MAX_LEVEL
+
+
+def _read_cache(name: str, stamp: tuple[int, int]) -> dict | None:
+    """relit le geojson pré-parsé s'il correspond encore au fichier source."""
+    path = _cache_path(name)
+    if not DISK_CACHE or not path.exists():
+        return None
+    try:
+        with path.open("rb") as f:
+            version, cached_stamp, geojson = pickle.load(f)
+    except Exception as err:  # cache corrompu ou d'une autre version de python
+        logger.warning("cache géométrie %s illisible : %s", name, err)
+        return None
+    if version != _CACHE_VERSION or tuple(cached_stamp) != stamp:
+        return None
+    return geojson
+
+
+def _write_cache(name: str, stamp: tuple[int, int], geojson: dict) -> None:
+    """écrit le cache binaire de façon atomique (plusieurs workers peuvent démarrer ensemble)."""
+    if not DISK_CACHE:
+        return
+    path = _cache_path(name)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as f:
+            pickle.dump((_CACHE_VERSION, stamp, geojson), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as err:
+        logger.warning("écriture du cache géométrie %s impossible : %s", name, err)
+        tmp.unlink(missing_ok=True)
+
+
+def _load_layer(name: str, level: str | None = None) -> GeoLayer | None:
+    """lit une couche (cache binaire ou json) et indexe ses entités par `properties.code`."""
+    path = level_path(name, level) if level else LAYER_PATHS[name]
+    if not path.exists():
+        logger.warning("fichier geojson absent pour la couche %s : %s", name, path)
+        return None
+    cache_name = f"{name}-{level}" if level else name
+    stamp = _source_stamp(path)
+    geojson = _read_cache(cache_name, stamp)
+    if geojson is None:
+        with path.open("r", encoding="utf-8") as f:
+            geojson = json.load(f)
+        _write_cache(cache_name, stamp, geojson)
+    features: dict[str, dict] = {}
+    for feature in geojson.get("features", []):
+        code = (feature.get("properties") or {}).get("code")
+        if code is not None:
+            features[str(code)] = feature
+    label = f"{name}/{level}" if level else name
+    logger.info("couche %s chargée (%d entités)", label, len(features))
+    return GeoLayer(
+        name=name, geojson=geojson, features=features, codes=frozenset(features), level=level
+    )
+
+
+def get_layer(name: str, level: str | None = None) -> GeoLayer | None:
+    """retourne la couche demandée (chargée au premier appel), None si le fichier manque.
+
+    avec `level`, renvoie le niveau simplifié s'il a été produit, sinon la couche complète.
+    """
+    if name not in LAYER_PATHS:
+        raise KeyError(f"couche géographique inconnue : {name}")
+    if level and not level_path(name, level).exists():
+        level = None
+    key = (name, level)
+    try:
+        return _LAYERS[key]
+    except KeyError:
+        pass
+    with _LOCK:
+        if key not in _LAYERS:
+            _LAYERS[key] = _load_layer(name, level)
+        return _LAYERS[key]
+
+
+def preload_layers(names=("region", "dept")) -> None:
+    """charge les couches indiquées (au démarrage du serveur, avant les premières requêtes)."""
+    for name in names:
+        get_layer(name)
+
+
+def clear_layers() -> None:
+    """oublie les couches chargées (après remplacement d'un fichier geojson)."""
+    with _LOCK:
+        _LAYERS.clear()
+
+
+# ----------------------------------------------------------------------------
+# service http des géométries
+# ----------------------------------------------------------------------------
+
+geometry_bp = Blueprint("geometry", __name__, url_prefix="/geometries")
+
+# url versionnée : le contenu d'une url ne change jamais, le navigateur peut la garder un an
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+def _layer_file(name: str, level: str | None) -> Path:
+    """fichier servi pour une couche : niveau simplifié s'il existe, sinon couche complète."""
+    if level and level_path(name, level).exists():
+        return level_path(name, level)
+    return LAYER_PATHS[name]
+
+
+def _version(path: Path) -> str:
+    mtime_ns, size = _source_stamp(path)
+    return f"{mtime_ns:x}{size:x}"
+
+
+def geometry_url(name: str, level: str | None = None) -> str:
+    """url (versionnée par date et taille du fichier) de la géométrie d'une couche."""
+    path = _layer_file(name, level)
+    version = _version(path) if path.exists() else "0"
+    return f"{geometry_bp.url_prefix}/{name}/{level or 'full'}.{version}.geojson"
+
+
+@geometry_bp.route("/<name>/<level>.<version>.geojson")
+def serve_geometry(name: str, level: str, version: str):
+    """renvoie le geojson d'une couche ; cache immuable si la version demandée est courante."""
+    if name not in LAYER_PATHS:
+        abort(404)
+    path = _layer_file(name, None if level == "full" else level)
+    if not path.exists():
+        abort(404)
+    current = version == _version(path)
+    response = send_file(path, mimetype="application/geo+json", conditional=True)
+    # ancienne url (fichier régénéré depuis) : servir le contenu courant sans le figer
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE if current else "no-cache"
+    return response
@@ -9,7 +9,8 @@ from typing import Any, Dict, Optional
 import pandas as pd
 import requests
 from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+
+from .db_connection import DATABASE_PATH, get_read_engine
 
 # ---------------------------------------------------------------------
 # configuration (tolère l'absence de `config.py`)
@@ -113,9 +114,9 @@ HEADERS: Dict[str, str] = {
     "Cache-Control": "max-age=0",
 }
 
-DATABASE_URL = "sqlite:///bdd/database.db"
+# moteur d'écriture (init/sauvegarde) ; les lectures passent par le pool lecture seule
+DATABASE_URL = f"sqlite:///{DATABASE_PATH.as_posix()}"
 ENGINE = create_engine(DATABASE_URL)
-SESSION_LOCAL = sessionmaker(bind=ENGINE)
 
 
 # ---------------------------------------------------------------------
@@ -336,9 +337,9 @@ def get_vehicule_2024() -> pd.DataFrame:
 
 
 def query_db(query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
-    """exécute une requête sql et retourne un dataframe."""
-    with SESSION_LOCAL() as session:
-        res = session.execute(text(query), params or {})
+    """exécute une requête sql (connexion du pool lecture seule) et retourne un dataframe."""
+    with get_read_engine().connect() as conn:
+        res = conn.execute(text(query), params or {})
         return pd.DataFrame(res.fetchall(), columns=res.keys())
 
 
@@ -0,0 +1,178 @@
+"""pyramide de mailles carrées (lon/lat) pour la carte zoomable des accidents.
+
+les communes sont trop lourdes à afficher sur toute la france et les départements
+trop grossiers une fois zoomé. au chargement, chaque accident est compté dans une
+maille à chaque niveau de `GRID_LEVELS` (table `grid_counts` : niveau, année,
+gravité, maille). au niveau l, une maille suit le découpage de `raster` : 360/2^l
+degrés de longitude sur 180/2^l de latitude. la carte choisit le niveau d'après
+l'étendue visible et ne lit que les mailles de la vue : le volume envoyé dépend du
+zoom, pas du nombre d'accidents.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from . import raster
+from .cache import memoize
+from .get_data import query_db
+
+GRID_LEVELS = range(8, 17)
+# mailles visées sur la largeur de la vue
+GRID_TARGET_CELLS = 64
+
+# gravité d'un accident : celle de l'usager le plus gravement atteint
+# (codes onisr : 1 indemne, 2 tué, 3 blessé hospitalisé, 4 blessé léger ; 0 inconnue)
+GRAV_LABELS: dict[int, str] = {
+    2: "tué",
+    3: "blessé hospitalisé",
+    4: "blessé léger",
+    1: "indemne",
+    0: "inconnue",
+}
+SEVERITY_ORDER = (2, 3, 4, 1)
+
+# marge autour de la vue estimée : le cadre de la carte est plus large que sa
+# plage lon/lat (rapport d'aspect), et on anticipe un léger déplacement
+VIEW_MARGIN = (1.6, 1.25)
+
+
+def cell_size(level: int) -> tuple[float, float]:
+    """dimensions (lon, lat) en degrés d'une maille du niveau."""
+    return 360.0 / 2**level, 180.0 / 2**level
+
+
+def cell_index(lon, lat, level: int) -> tuple[np.ndarray, np.ndarray]:
+    """indices (colonne, rangée) des mailles contenant les points (vectorisé)."""
+    dlon, dlat = cell_size(level)
+    cx = np.floor((np.asarray(lon, dtype=float) + 180.0) / dlon).astype(np.int64)
+    cy = np.floor((np.asarray(lat, dtype=float) + 90.0) / dlat).astype(np.int64)
+    return cx, cy
+
+
+def level_for_bbox(bbox: raster.BBox) -> int:
+    """niveau donnant environ `GRID_TARGET_CELLS` mailles sur la largeur de la vue."""
+    width = max(bbox[2] - bbox[0], 1e-6)
+    level = round(math.log2(360.0 * GRID_TARGET_CELLS / width))
+    return int(min(max(level, GRID_LEVELS[0]), GRID_LEVELS[-1]))
+
+
+def worst_severity(ranks: pd.Series) -> pd.Series:
+    """code de gravité depuis le rang (1 = tué … 4 = indemne), 0 si inconnu."""
+    codes = dict(enumerate(SEVERITY_ORDER, start=1))
+    return ranks.map(codes).fillna(0).astype(int)
+
+
+def pyramid_counts(points: pd.DataFrame, year: int) -> pd.DataFrame:
+    """comptes par (niveau, gravité, maille) d'un dataframe lon/lat/grav d'une année."""
+    points = points.dropna(subset=["lon", "lat"])
+    frames = []
+    for level in GRID_LEVELS:
+        cx, cy = cell_index(points["lon"], points["lat"], level)
+        counts = (
+            pd.DataFrame({"grav": points["grav"].to_numpy(), "cx": cx, "cy": cy})
+            .groupby(["grav", "cx", "cy"], sort=False)
+            .size()
+            .reset_index(name="accidents")
+        )
+        counts.insert(0, "annee", int(year))
+        counts.insert(0, "niveau", level)
+        frames.append(counts)
+    return pd.concat(frames, ignore_index=True)
+
+
+def view_bbox(view: dict | None, base: raster.BBox = raster.FRANCE_BBOX) -> raster.BBox:
+    """emprise approximative d'une carte géo (centre et échelle de projection).
+
+    à l'échelle 1, la carte affiche `base` ; zoomer d'un facteur s divise
+    l'étendue visible par s autour du centre.
+    """
+    view = view or {}
+    scale = max(float(view.get("scale") or 1.0), 1e-6)
+    lon = float(view.get("lon", (base[0] + base[2]) / 2))
+    lat = float(view.get("lat", (base[1] + base[3]) / 2))
+    half_lon = (base[2] - base[0]) / 2 / scale * VIEW_MARGIN[0]
+    half_lat = (base[3] - base[1]) / 2 / scale * VIEW_MARGIN[1]
+    return lon - half_lon, max(lat - half_lat, -90.0), lon + half_lon, min(lat + half_lat, 90.0)
+
+
+def merge_view(view: dict | None, relayout: dict | None) -> dict:
+    """met à jour (centre, échelle) d'après le relayoutData d'une carte géo."""
+    view = dict(view or {})
+    relayout = relayout or {}
+    for key, name in (
+        ("geo.center.lon", "lon"),
+        ("geo.center.lat", "lat"),
+        ("geo.projection.scale", "scale"),
+    ):
+        if key in relayout:
+            view[name] = relayout[key]
+    if relayout.get("geo.fitbounds") is not None or relayout.get("autosize"):
+        view = {}
+    return view
+
+
+@memoize(maxsize=512)
+def cells_in_range(level: int, year: int, cols: range, rows: range, grav=None) -> pd.DataFrame:
+    """comptes des mailles d'un niveau dans une plage de colonnes et de rangées."""
+    params = {
+        "niveau": level,
+        "annee": int(year),
+        "cx0": cols.start,
+        "cx1": cols.stop - 1,
+        "cy0": rows.start,
+        "cy1": rows.stop - 1,
+    }
+    grav_clause = ""
+    if grav is not None:
+        grav_clause = "AND grav = :grav"
+        params["grav"] = int(grav)
+    return query_db(
+        "SELECT cx, cy, SUM(accidents) AS accidents FROM grid_counts "
+        "WHERE niveau = :niveau AND annee = :annee "
+        "AND cx BETWEEN :cx0 AND :cx1 AND cy BETWEEN :cy0 AND :cy1 "
+        f"{grav_clause} GROUP BY cx, cy",
+        params,
+    )
+
+
+def visible_cells(year: int, bbox: raster.BBox, grav=None) -> tuple[int, pd.DataFrame]:
+    """niveau adapté à la vue et comptes de ses mailles visibles."""
+    level = level_for_bbox(bbox)
+    # tuiles du niveau = mailles : même découpage que la rasterisation
+    cols, rows = raster.tiles_for_bbox(bbox, level)
+    return level, cells_in_range(level, year, cols, rows, grav)
+
+
+def cell_id(level: int, cx, cy) -> list[str]:
+    """identifiants "niveau/colonne/rangée" des mailles."""
+    return [f"{level}/{x}/{y}" for x, y in zip(cx, cy)]
+
+
+def cells_geojson(level: int, cx, cy) -> dict:
+    """featurecollection des carrés des mailles (id = `cell_id`)."""
+    dlon, dlat = cell_size(level)
+    features = []
+    for ident, x, y in zip(cell_id(level, cx, cy), cx, cy):
+        lon0 = round(-180.0 + int(x) * dlon, 6)
+        lat0 = round(-90.0 + int(y) * dlat, 6)
+        lon1 = round(lon0 + dlon, 6)
+        lat1 = round(lat0 + dlat, 6)
+        features.append(
+            {
+                "type": "Feature",
+                "id": ident,
+                "properties": {},
+                "geometry": {
+                    "type": "Polygon",
+                    # sens horaire : convention d3 (plotly geo) pour l'intérieur du polygone
+                    "coordinates": [
+                        [[lon0, lat0], [lon0, lat1], [lon1, lat1], [lon1, lat0], [lon0, lat0]]
+                    ],
+                },
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
@@ -0,0 +1,163 @@
+"""points noirs : regroupements denses d'accidents, calculés hors ligne.
+
+au chargement, les accidents de chaque année sont regroupés par dbscan
+(scikit-learn, métrique haversine) : une fois pour toutes gravités, puis pour
+chaque gravité de l'accident (usager le plus atteint, codes de `grid.GRAV_LABELS`).
+le calcul se fait par département : chaque lot ne tient en mémoire que ses
+points et leurs voisinages, et un département de plus de `MAX_CHUNK_POINTS`
+accidents est découpé en bandes de longitude qui se recouvrent (groupes
+réunis d'une bande à l'autre). deux groupes de part et d'autre d'une limite
+de département restent distincts.
+
+chaque groupe est rangé dans la table `hotspots` avec son enveloppe convexe
+(geojson, élargie de `EPS_M / 2`), son centre, son rayon et ses comptes : la
+carte superpose les contours d'une lecture, sans calcul par requête.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+HOTSPOT_TABLE = "hotspots"
+EARTH_RADIUS_M = 6_371_008.8
+# rayon de voisinage et effectif minimal d'un point noir (par gravité, None = toutes)
+EPS_M = 250.0
+MIN_SAMPLES: dict[int | None, int] = {None: 12, 1: 10, 2: 3, 3: 5, 4: 8, 0: 10}
+# au-delà, un département est traité par bandes de longitude
+MAX_CHUNK_POINTS = 20_000
+
+
+def _labels(lon: np.ndarray, lat: np.ndarray, min_samples: int) -> np.ndarray:
+    """étiquettes dbscan (haversine) d'un lot de points ; -1 pour le bruit."""
+    if len(lon) < min_samples:
+        return np.full(len(lon), -1)
+    from sklearn.cluster import DBSCAN  # import différé : coûteux, inutile au démarrage du dashboard
+
+    model = DBSCAN(
+        eps=EPS_M / EARTH_RADIUS_M,
+        min_samples=min_samples,
+        metric="haversine",
+        algorithm="ball_tree",
+    )
+    return model.fit_predict(np.radians(np.column_stack([lat, lon])))
+
+
+def _chunk_labels(lon: np.ndarray, lat: np.ndarray, min_samples: int) -> np.ndarray:
+    """étiquettes dbscan d'un département, par bandes de longitude s'il est trop dense.
+
+    les bandes se recouvrent de deux rayons : un groupe à cheval sur deux bandes
+    y partage des points, et ses deux morceaux sont réunis.
+    """
+    if len(lon) <= MAX_CHUNK_POINTS:
+        return _labels(lon, lat, min_samples)
+    n_bands = math.ceil(len(lon) / MAX_CHUNK_POINTS)
+    edges = np.quantile(lon, np.linspace(0, 1, n_bands + 1))
+    margin = 2 * np.degrees(EPS_M / EARTH_RADIUS_M) / max(math.cos(math.radians(lat.mean())), 0.1)
+    labels = np.full(len(lon), -1)
+    parent: dict[int, int] = {}
+
+    def root(label: int) -> int:
+        while parent[label] != label:
+            label = parent[label]
+        return label
+
+    next_label = 0
+    for west, east in zip(edges[:-1], edges[1:]):
+        idx = np.flatnonzero((lon >= west - margin) & (lon <= east + margin))
+        band = _labels(lon[idx], lat[idx], min_samples)
+        keep = band >= 0
+        idx, band = idx[keep], band[keep] + next_label
+        parent.update((label, label) for label in np.unique(band))
+        next_label = band.max() + 1 if len(band) else next_label
+        # points déjà étiquetés par la bande précédente : réunion des deux groupes
+        shared = labels[idx] >= 0
+        for old, new in set(zip(labels[idx][shared], band[shared])):
+            parent[root(new)] = root(old)
+        labels[idx[~shared]] = band[~shared]
+    return np.array([root(label) if label >= 0 else -1 for label in labels])
+
+
+def _hull(lon: np.ndarray, lat: np.ndarray) -> str:
+    """enveloppe convexe élargie du groupe, en geojson (coordonnées arrondies)."""
+    import shapely  # import différé : seul le chargement des données en a besoin
+
+    pad = np.degrees(EPS_M / 2 / EARTH_RADIUS_M)
+    hull = shapely.convex_hull(shapely.multipoints(np.column_stack([lon, lat]))).buffer(pad, 4)
+    return json.dumps(
+        {
+            "type": "Polygon",
+            "coordinates": [np.round(shapely.get_coordinates(hull.exterior), 5).tolist()],
+        }
+    )
+
+
+def cluster_hotspots(points: pd.DataFrame, year: int, grav: int | None = None) -> pd.DataFrame:
+    """points noirs d'une année (colonnes lon, lat, dep, grav) pour une gravité (None = toutes).
+
+    colonnes : annee, grav, dep, accidents, mortels, lon, lat, rayon_m, contour.
+    """
+    points = points.dropna(subset=["lon", "lat"])
+    if grav is not None:
+        points = points[points["grav"] == grav]
+    min_samples = MIN_SAMPLES.get(grav, MIN_SAMPLES[None])
+    rows = []
+    for dep, chunk in points.groupby(points["dep"].fillna(""), sort=False):
+        lon = chunk["lon"].to_numpy(dtype=float)
+        lat = chunk["lat"].to_numpy(dtype=float)
+        mortal = chunk["grav"].to_numpy() == 2
+        labels = _chunk_labels(lon, lat, min_samples)
+        for label in np.unique(labels[labels >= 0]):
+            member = labels == label
+            c_lon, c_lat = lon[member], lat[member]
+            center_lon, center_lat = c_lon.mean(), c_lat.mean()
+            dy = np.radians(c_lat - center_lat)
+            dx = np.radians(c_lon - center_lon) * math.cos(math.radians(center_lat))
+            rows.append(
+                {
+                    "annee": int(year),
+                    "grav": grav,
+                    "dep": dep or None,
+                    "accidents": int(member.sum()),
+                    "mortels": int(mortal[member].sum()),
+                    "lon": round(float(center_lon), 5),
+                    "lat": round(float(center_lat), 5),
+                    "rayon_m": round(float(np.hypot(dx, dy).max() * EARTH_RADIUS_M), 1),
+                    "contour": _hull(c_lon, c_lat),
+                }
+            )
+    columns = ["annee", "grav", "dep", "accidents", "mortels", "lon", "lat", "rayon_m", "contour"]
+    dtypes = {"annee": "int64", "grav": "Int64", "accidents": "int64", "mortels": "int64"}
+    return pd.DataFrame(rows, columns=columns).astype(
+        {**dtypes, "lon": float, "lat": float, "rayon_m": float}
+    )
+
+
+def year_hotspots(points: pd.DataFrame, year: int, gravs) -> pd.DataFrame:
+    """points noirs d'une année, toutes gravités puis gravité par gravité."""
+    frames = [cluster_hotspots(points, year, grav) for grav in (None, *gravs)]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return cluster_hotspots(points.iloc[:0], year)
+    return pd.concat(frames, ignore_index=True)
+
+
+def store_hotspots(engine, df: pd.DataFrame, year: int) -> int:
+    """remplace les points noirs de l'année dans `hotspots` ; renvoie leur nombre."""
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": HOTSPOT_TABLE},
+        ).first()
+        if exists:
+            conn.execute(text(f"DELETE FROM {HOTSPOT_TABLE} WHERE annee = :annee"), {"annee": int(year)})
+        df.to_sql(HOTSPOT_TABLE, conn, if_exists="append", index=False)
+        conn.execute(
+            text(f"CREATE INDEX IF NOT EXISTS idx_{HOTSPOT_TABLE} ON {HOTSPOT_TABLE} (annee, grav)")
+        )
+        conn.commit()
+    return len(df)
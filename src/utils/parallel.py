@@ -0,0 +1,70 @@
+"""exécution parallèle bornée des requêtes par année (fan-out).
+
+chaque tâche de requête emprunte sa propre connexion au pool lecture seule, donc
+la latence d'une vue "toutes années" tend vers celle de l'année la plus lente
+au lieu de la somme des années.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+from .db_connection import POOL_SIZE
+
+T = TypeVar("T")
+
+# le nombre de requêtes simultanées ne dépasse pas la taille du pool de connexions
+QUERY_WORKERS = int(os.getenv("query_workers", str(POOL_SIZE)))
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_LOCAL = threading.local()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """executor des requêtes, créé au premier usage.
+
+    deux premiers appels simultanés peuvent en créer deux : celui qui n'est pas
+    conservé est libéré par le ramasse-miettes, ses threads avec lui.
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(
+            max_workers=max(1, QUERY_WORKERS),
+            thread_name_prefix="query-worker",
+            initializer=_mark_worker,
+        )
+    return _EXECUTOR
+
+
+def _mark_worker() -> None:
+    """note dans le thread courant qu'il est un worker de requêtes."""
+    _LOCAL.worker = True
+
+
+def _reset_after_fork() -> None:
+    """les threads ne survivent pas au fork (gunicorn preload) : repartir de zéro."""
+    global _EXECUTOR
+    _EXECUTOR = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def map_years(fn: Callable[[int], T], years: Iterable[int]) -> list[tuple[int, T]]:
+    """exécute `fn(year)` pour chaque année en parallèle.
+
+    les résultats sont renvoyés dans l'ordre des années fournies ; une exception
+    levée par une année est propagée comme dans la boucle séquentielle.
+    """
+    years = list(years)
+    # depuis un worker de requêtes (ou pour une seule année) : pas de ré-entrée dans le pool
+    if len(years) <= 1 or getattr(_LOCAL, "worker", False):
+        return [(y, fn(y)) for y in years]
+    executor = _executor()
+    futures = [(y, executor.submit(fn, y)) for y in years]
+    return [(y, fut.result()) for y, fut in futures]
+
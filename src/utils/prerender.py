@@ -0,0 +1,65 @@
+"""figures par défaut prérendues en json, versionnées par génération de la base.
+
+les vues par défaut (carte des départements, histogramme, page graphique sans
+filtre) sont identiques pour tous les visiteurs : elles sont sérialisées une
+fois après la construction de la base dans `PRERENDER_DIR/<nom>.<génération>.json`
+puis intégrées telles quelles aux layouts, sans aucune requête sql. un fichier
+d'une autre génération n'est jamais relu (la vue est alors recalculée).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from plotly.utils import PlotlyJSONEncoder
+
+from .cache import db_generation, memoize
+from .db_connection import ROOT
+
+logger = logging.getLogger(__name__)
+
+PRERENDER_DIR = Path(os.getenv("prerender_dir", ROOT / "bdd" / "cache" / "prerender"))
+
+
+def prerender_path(name: str, generation: str) -> Path:
+    """fichier json d'une vue pour une génération de base."""
+    return PRERENDER_DIR / f"{name}.{generation}.json"
+
+
+def write_prerender(name: str, value: Any) -> int:
+    """sérialise une figure (ou un payload) pour la génération courante ; renvoie sa taille."""
+    generation = db_generation()
+    path = prerender_path(name, generation)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    PRERENDER_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(value, f, cls=PlotlyJSONEncoder, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as err:
+        logger.warning("écriture de la vue prérendue %s impossible : %s", name, err)
+        tmp.unlink(missing_ok=True)
+        return 0
+    # générations précédentes de la même vue : devenues inutiles
+    for old in PRERENDER_DIR.glob(f"{name}.*.json"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path.stat().st_size
+
+
+@memoize()
+def load_prerender(name: str) -> Any | None:
+    """vue prérendue pour la génération courante de la base, None si absente."""
+    path = prerender_path(name, db_generation())
+    if not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as err:
+        logger.warning("vue prérendue %s illisible : %s", name, err)
+        return None
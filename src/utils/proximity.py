@@ -0,0 +1,89 @@
+"""radar le plus proche de chaque accident (BallTree haversine, scikit-learn).
+
+les emplacements de radars sont ceux de `radar_stats` (une ligne par emplacement
+et limite, toutes années confondues) : dédoublonnés, ils forment la table
+`radar_sites` (radar_id, lat, lon). un `BallTree` en métrique haversine est
+construit une fois sur ces emplacements, puis les accidents de chaque année sont
+interrogés par lots vectorisés de `BATCH_SIZE` points. le résultat est rangé
+dans `accident_radar` (acc_id, annee, radar_id, distance_m).
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+from sqlalchemy import text
+
+from .radar_stats import RADAR_STATS_TABLE
+
+logger = logging.getLogger(__name__)
+
+SITES_TABLE = "radar_sites"
+NEAREST_TABLE = "accident_radar"
+EARTH_RADIUS_M = 6_371_008.8
+BATCH_SIZE = 100_000
+
+
+def build_radar_sites(engine) -> pd.DataFrame:
+    """(re)crée `radar_sites` depuis les emplacements distincts de `radar_stats`."""
+    with engine.connect() as conn:
+        sites = pd.read_sql(
+            text(f"SELECT DISTINCT lat, lon FROM {RADAR_STATS_TABLE} ORDER BY lat, lon"), conn
+        )
+    sites.insert(0, "radar_id", np.arange(1, len(sites) + 1))
+    sites.to_sql(SITES_TABLE, engine, if_exists="replace", index=False)
+    return sites
+
+
+def build_nearest_radar(engine, years) -> int:
+    """(re)crée `accident_radar` pour les années données ; renvoie le nombre d'accidents traités."""
+    start = time.perf_counter()
+    sites = build_radar_sites(engine)
+    if sites.empty:
+        logger.info("aucun emplacement de radar, table %s ignorée", NEAREST_TABLE)
+        return 0
+    tree = BallTree(np.radians(sites[["lat", "lon"]].to_numpy()), metric="haversine")
+    radar_ids = sites["radar_id"].to_numpy()
+
+    total = 0
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {NEAREST_TABLE}"))
+        for year in sorted(years):
+            accidents = pd.read_sql(
+                text(
+                    f"SELECT acc_id, lat, lon FROM caracteristiques_{year} "
+                    "WHERE lat IS NOT NULL AND lon IS NOT NULL"
+                ),
+                conn,
+            )
+            for offset in range(0, len(accidents), BATCH_SIZE):
+                batch = accidents.iloc[offset : offset + BATCH_SIZE]
+                dist, idx = tree.query(np.radians(batch[["lat", "lon"]].to_numpy()), k=1)
+                pd.DataFrame(
+                    {
+                        "acc_id": batch["acc_id"].to_numpy(),
+                        "annee": int(year),
+                        "radar_id": radar_ids[idx[:, 0]],
+                        "distance_m": np.round(dist[:, 0] * EARTH_RADIUS_M, 1),
+                    }
+                ).to_sql(NEAREST_TABLE, conn, if_exists="append", index=False)
+            total += len(accidents)
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS idx_{NEAREST_TABLE} "
+                f"ON {NEAREST_TABLE} (annee, distance_m)"
+            )
+        )
+        conn.commit()
+    logger.info(
+        "table %s créée : %d accidents, %d radars en %.2fs",
+        NEAREST_TABLE,
+        total,
+        len(sites),
+        time.perf_counter() - start,
+    )
+    return total
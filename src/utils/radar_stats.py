@@ -0,0 +1,133 @@
+"""statistiques par radar (emplacement), agrégées au chargement des mesures.
+
+les fichiers radars comptent des millions de mesures ; la carte des radars n'a
+besoin que d'une ligne par (année, emplacement, limite). `load_to_db` calcule
+ces agrégats à partir du dataframe qu'il vient de charger et les range dans la
+table `radar_stats` (quelques milliers de lignes), lue telle quelle par le
+dashboard.
+
+les positions relevées pour un même radar varient de quelques mètres d'une
+mesure à l'autre (radars mobiles, projection lambert 93) : les coordonnées sont
+ramenées sur une grille d'environ 100 m, faute de quoi chaque mesure ferait son
+propre emplacement. les cellules occupées qui se touchent forment un seul
+emplacement (un radar à cheval sur deux cellules n'est pas dédoublé), repéré
+par sa cellule la plus fournie. le rapport emplacements / mesures est journalisé
+à chaque chargement pour vérifier le regroupement.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+RADAR_STATS_TABLE = "radar_stats"
+
+# emplacement d'un radar : coordonnées arrondies (~110 m en latitude, ~75 m en longitude)
+POSITION_DECIMALS = 3
+# en dessous, le regroupement des positions est probablement trop fin
+MIN_MEASURES_PER_SITE = 2
+_CELL_KEY = 10**7
+
+
+def site_positions(lat: pd.Series, lon: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """coordonnées de l'emplacement de chaque mesure (cellule la plus fournie de son groupe).
+
+    les cellules de la grille sont réunies avec leurs huit voisines occupées.
+    """
+    if lat.empty:
+        return np.empty(0), np.empty(0)
+    # import différé : coûteux, inutile au démarrage du dashboard
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    scale = 10**POSITION_DECIMALS
+    cell_lat = np.rint(lat.to_numpy(dtype=float) * scale).astype(np.int64)
+    cell_lon = np.rint(lon.to_numpy(dtype=float) * scale).astype(np.int64)
+    # une clé entière par cellule (|lon| < 180 * scale < _CELL_KEY / 2)
+    inverse, keys = pd.factorize(cell_lat * _CELL_KEY + cell_lon, sort=True)
+    counts = np.bincount(inverse, minlength=len(keys))
+    rows, cols = [], []
+    for step in (1, _CELL_KEY - 1, _CELL_KEY, _CELL_KEY + 1):
+        neighbour = np.minimum(np.searchsorted(keys, keys + step), len(keys) - 1)
+        found = keys[neighbour] == keys + step
+        rows.append(np.flatnonzero(found))
+        cols.append(neighbour[found])
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    graph = coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(keys), len(keys)))
+    _, groups = connected_components(graph, directed=False)
+    # cellule représentante : la plus fournie du groupe (à égalité, la première)
+    order = np.lexsort((-counts, groups))
+    first = order[np.r_[True, groups[order][1:] != groups[order][:-1]]]
+    representative = np.empty(groups.max() + 1, dtype=np.int64)
+    representative[groups[first]] = keys[first]
+    site = representative[groups[inverse]]
+    site_lat = np.floor_divide(site + _CELL_KEY // 2, _CELL_KEY)
+    return site_lat / scale, (site - site_lat * _CELL_KEY) / scale
+
+def radar_stats(df: pd.DataFrame, year: int) -> pd.DataFrame:
+    """agrégats par (emplacement, limite) d'un dataframe de mesures radar.
+
+    colonnes : annee, lat, lon, limite, mesures, part_exces (mesures au-dessus de
+    la limite / mesures), exces_moyen (écart moyen des mesures en excès, km/h),
+    p95_delta_v (95e centile de mesure - limite, km/h).
+    """
+    df = df.dropna(subset=["lat", "lon", "mesure", "limite"])
+    delta_v = df["mesure"] - df["limite"]
+    site_lat, site_lon = site_positions(df["lat"], df["lon"])
+    frame = pd.DataFrame(
+        {
+            "lat": site_lat,
+            "lon": site_lon,
+            "limite": df["limite"].astype(int),
+            "delta_v": delta_v,
+            "exces": delta_v.where(delta_v > 0),
+        }
+    )
+    grouped = frame.groupby(["lat", "lon", "limite"], sort=False)
+    stats = grouped.agg(
+        mesures=("delta_v", "size"),
+        n_exces=("exces", "count"),
+        exces_moyen=("exces", "mean"),
+    )
+    stats["p95_delta_v"] = grouped["delta_v"].quantile(0.95)
+    stats["part_exces"] = stats["n_exces"] / stats["mesures"]
+    stats = stats.drop(columns="n_exces").reset_index()
+    stats.insert(0, "annee", int(year))
+    return stats.round({"part_exces": 4, "exces_moyen": 2, "p95_delta_v": 2})
+
+
+def store_radar_stats(engine, df: pd.DataFrame, year: int) -> int:
+    """remplace les lignes de l'année dans `radar_stats` ; renvoie le nombre de radars."""
+    stats = radar_stats(df, year)
+    measures = int(stats["mesures"].sum())
+    sites = len(stats[["lat", "lon"]].drop_duplicates())
+    ratio = measures / sites if sites else 0.0
+    log = logger.warning if sites and ratio < MIN_MEASURES_PER_SITE else logger.info
+    log(
+        "radars %s : %d emplacements pour %d mesures (%.1f mesures par emplacement)",
+        year,
+        sites,
+        measures,
+        ratio,
+    )
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": RADAR_STATS_TABLE},
+        ).first()
+        if exists:
+            conn.execute(text(f"DELETE FROM {RADAR_STATS_TABLE} WHERE annee = :annee"), {"annee": int(year)})
+        stats.to_sql(RADAR_STATS_TABLE, conn, if_exists="append", index=False)
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS idx_{RADAR_STATS_TABLE} "
+                f"ON {RADAR_STATS_TABLE} (annee, limite)"
+            )
+        )
+        conn.commit()
+    return len(stats)
@@ -0,0 +1,112 @@
+"""rasterisation des coordonnées d'accidents en grille de densité (numpy).
+
+envoyer les ~300k points au navigateur est exclu : le serveur les regroupe en
+cellules (`np.histogram2d`) et n'envoie qu'une matrice de comptes. le monde est
+découpé en tuiles lon/lat (équirectangulaire) : au niveau z, une tuile couvre
+360/2^z degrés de longitude et 180/2^z de latitude, rasterisée en `TILE_PX`
+× `TILE_PX` cellules. le niveau est choisi d'après l'étendue affichée, si bien
+que la finesse de la grille suit le zoom ; chaque tuile peut être mise en cache
+indépendamment par l'appelant, puis les tuiles visibles sont assemblées et
+découpées à la fenêtre demandée.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# cellules par côté de tuile et nombre de cellules visé sur la largeur de la vue
+TILE_PX = 64
+TARGET_BINS = 160
+MIN_ZOOM, MAX_ZOOM = 3, 16
+
+# (lon_min, lat_min, lon_max, lat_max) : france métropolitaine
+FRANCE_BBOX: tuple[float, float, float, float] = (-5.5, 41.0, 10.0, 51.5)
+
+BBox = tuple[float, float, float, float]
+
+
+def tile_bounds(z: int, tx: int, ty: int) -> BBox:
+    """emprise d'une tuile ; `ty` compte les rangées depuis le sud (lat -90)."""
+    width = 360.0 / 2**z
+    height = 180.0 / 2**z
+    lon0 = -180.0 + tx * width
+    lat0 = -90.0 + ty * height
+    return lon0, lat0, lon0 + width, lat0 + height
+
+
+def zoom_for_bbox(bbox: BBox) -> int:
+    """niveau de tuiles donnant environ `TARGET_BINS` cellules sur la largeur de la vue."""
+    width = max(bbox[2] - bbox[0], 1e-6)
+    tile_width = width * TILE_PX / TARGET_BINS
+    z = round(math.log2(360.0 / tile_width))
+    return int(min(max(z, MIN_ZOOM), MAX_ZOOM))
+
+
+def tiles_for_bbox(bbox: BBox, z: int) -> tuple[range, range]:
+    """indices (colonnes, rangées) des tuiles couvrant la vue."""
+    width = 360.0 / 2**z
+    height = 180.0 / 2**z
+    n = 2**z
+    tx0 = int(math.floor((bbox[0] + 180.0) / width))
+    tx1 = int(math.floor((bbox[2] + 180.0) / width))
+    ty0 = int(math.floor((bbox[1] + 90.0) / height))
+    ty1 = int(math.floor((bbox[3] + 90.0) / height))
+    clamp = lambda v: min(max(v, 0), n - 1)  # noqa: E731
+    return range(clamp(tx0), clamp(tx1) + 1), range(clamp(ty0), clamp(ty1) + 1)
+
+
+def rasterize_tile(
+    lon: np.ndarray, lat: np.ndarray, z: int, tx: int, ty: int, px: int = TILE_PX
+) -> np.ndarray:
+    """comptes des points d'une tuile, tableau (latitude, longitude) de `px` × `px`."""
+    lon0, lat0, lon1, lat1 = tile_bounds(z, tx, ty)
+    inside = (lon >= lon0) & (lon < lon1) & (lat >= lat0) & (lat < lat1)
+    counts, _, _ = np.histogram2d(
+        lat[inside], lon[inside], bins=px, range=[[lat0, lat1], [lon0, lon1]]
+    )
+    return counts.astype(np.int32)
+
+
+def mosaic(tiles: dict[tuple[int, int], np.ndarray], z: int, cols: range, rows: range, bbox: BBox):
+    """assemble les tuiles et découpe à la vue : (centres lon, centres lat, comptes)."""
+    grid = np.block([[tiles[(tx, ty)] for tx in cols] for ty in rows])
+    lon0, lat0, _, _ = tile_bounds(z, cols[0], rows[0])
+    step_lon = 360.0 / 2**z / TILE_PX
+    step_lat = 180.0 / 2**z / TILE_PX
+    lon_centers = lon0 + (np.arange(grid.shape[1]) + 0.5) * step_lon
+    lat_centers = lat0 + (np.arange(grid.shape[0]) + 0.5) * step_lat
+    keep_lon = (lon_centers >= bbox[0]) & (lon_centers <= bbox[2])
+    keep_lat = (lat_centers >= bbox[1]) & (lat_centers <= bbox[3])
+    return lon_centers[keep_lon], lat_centers[keep_lat], grid[np.ix_(keep_lat, keep_lon)]
+
+
+def is_view_change(relayout: dict | None) -> bool:
+    """vrai si le relayoutData porte une emprise (plage ou réinitialisation des axes lon/lat).
+
+    le `{"autosize": True}` émis au premier rendu n'en porte pas.
+    """
+    return bool(relayout) and any(k.startswith(("xaxis.", "yaxis.")) for k in relayout)
+
+
+def bbox_from_relayout(relayout: dict | None, default: BBox = FRANCE_BBOX) -> BBox:
+    """emprise affichée d'après le relayoutData d'une figure cartésienne lon/lat."""
+    if not relayout or any(k.endswith("autorange") for k in relayout):
+        return default
+
+    def axis_range(axis: str, lo: float, hi: float) -> tuple[float, float]:
+        # plotly envoie soit "xaxis.range[0]"/"xaxis.range[1]", soit "xaxis.range": [a, b]
+        values = relayout.get(f"{axis}.range") or (
+            relayout.get(f"{axis}.range[0]", lo),
+            relayout.get(f"{axis}.range[1]", hi),
+        )
+        try:
+            a, b = float(values[0]), float(values[1])
+        except (TypeError, ValueError, IndexError):
+            return lo, hi
+        return min(a, b), max(a, b)
+
+    lon0, lon1 = axis_range("xaxis", default[0], default[2])
+    lat0, lat1 = axis_range("yaxis", default[1], default[3])
+    return lon0, lat0, lon1, lat1
@@ -0,0 +1,106 @@
+"""initialisation des données en tâche de fond et suivi de sa progression.
+
+`start_background_setup` lance le pipeline (téléchargement, nettoyage,
+chargement) dans un thread pendant que le serveur dash répond déjà. les
+messages de journal émis par ce thread sont conservés (pas ceux des requêtes
+servies en parallèle) : ceux préfixés par
+`[STEP] ` marquent les étapes affichées par `src/pages/setup.py`, les autres
+(lignes insérées, débit en lignes/s) alimentent le journal de la page.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+STEP_PREFIX = "[STEP] "
+SETUP_THREAD = "data-setup"
+MAX_MESSAGES = 200
+
+
+@dataclass(frozen=True)
+class SetupState:
+    """instantané de l'initialisation (copie, lisible sans verrou)."""
+
+    messages: tuple[str, ...]
+    current_step: str | None
+    running: bool
+    completed: bool
+    success: bool
+
+
+_LOCK = threading.Lock()
+_MESSAGES: deque[str] = deque(maxlen=MAX_MESSAGES)
+_STATE = {"step": None, "running": False, "completed": False, "success": False}
+
+
+class _ProgressHandler(logging.Handler):
+    """recopie les messages de journal du thread d'initialisation dans l'état partagé."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # le handler est posé sur le logger racine : ignorer les autres threads (requêtes dash)
+        if record.threadName != SETUP_THREAD:
+            return
+        try:
+            message = record.getMessage().strip()
+        except Exception:  # message mal formé : ne jamais casser le pipeline
+            return
+        with _LOCK:
+            _MESSAGES.append(message)
+            if message.startswith(STEP_PREFIX):
+                _STATE["step"] = message[len(STEP_PREFIX):].strip()
+
+
+def step(name: str) -> None:
+    """publie une étape de l'initialisation (message `[STEP] name`)."""
+    logger.info("%s%s", STEP_PREFIX, name)
+
+
+def setup_running() -> bool:
+    """vrai tant que l'initialisation en tâche de fond n'est pas terminée."""
+    with _LOCK:
+        return bool(_STATE["running"])
+
+
+def setup_snapshot() -> SetupState:
+    """état courant de l'initialisation."""
+    with _LOCK:
+        return SetupState(
+            messages=tuple(_MESSAGES),
+            current_step=_STATE["step"],
+            running=bool(_STATE["running"]),
+            completed=bool(_STATE["completed"]),
+            success=bool(_STATE["success"]),
+        )
+
+
+def start_background_setup(target: Callable[[], bool]) -> threading.Thread:
+    """lance `target` (renvoie True si les données sont prêtes) dans un thread démon."""
+    handler = _ProgressHandler(level=logging.INFO)
+    with _LOCK:
+        _MESSAGES.clear()
+        _STATE.update(step=None, running=True, completed=False, success=False)
+
+    def run() -> None:
+        root = logging.getLogger()
+        root.addHandler(handler)
+        success = False
+        try:
+            success = bool(target())
+        except Exception as err:  # l'erreur reste visible sur la page de progression
+            logger.exception("initialisation des données interrompue : %s", err)
+        finally:
+            if success:
+                step("initialisation terminée")
+            root.removeHandler(handler)
+            with _LOCK:
+                _STATE.update(running=False, completed=True, success=success)
+
+    thread = threading.Thread(target=run, name=SETUP_THREAD, daemon=True)
+    thread.start()
+    return thread
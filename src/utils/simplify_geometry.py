@@ -0,0 +1,112 @@
+"""prétraitement des géométries : niveaux simplifiés et quantifiés pour les cartes.
+
+le geojson communal complet (~35k polygones) est trop lourd pour être envoyé à
+chaque figure. ce module en produit plusieurs niveaux de détail : chaque
+polygone est simplifié (douglas-peucker avec préservation de la topologie)
+puis ses coordonnées sont ramenées sur une grille (précision réduite) et
+écrites arrondies, sans espaces. la carte choisit ensuite le niveau adapté à
+l'échelle d'affichage (voir `level_for_scale`).
+
+usage : python -m src.utils.simplify_geometry [couche ...]   (défaut : commune)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sys
+from pathlib import Path
+
+import shapely
+from shapely.geometry import mapping, shape
+
+from .geometry import LAYER_PATHS, LEVELS_DIR, level_path
+
+logger = logging.getLogger(__name__)
+
+# niveau -> (tolérance de simplification en degrés, pas de grille en degrés, décimales)
+# 1e-3 degré ~ 100 m, 1e-4 ~ 10 m, 1e-5 ~ 1 m à nos latitudes
+LEVELS: dict[str, tuple[float, float, int]] = {
+    "low": (0.005, 1e-3, 3),
+    "medium": (0.0015, 1e-4, 4),
+    "high": (0.0004, 1e-5, 5),
+}
+
+
+def _round_coords(coords, ndigits: int):
+    """arrondit récursivement les coordonnées (tuples imbriqués de shapely.mapping)."""
+    if isinstance(coords, (float, int)):
+        return round(coords, ndigits)
+    return [_round_coords(c, ndigits) for c in coords]
+
+
+def simplify_geometry(geometry: dict, tolerance: float, grid: float, ndigits: int) -> dict | None:
+    """simplifie et quantifie une géométrie geojson ; None si elle disparaît."""
+    geom = shape(geometry)
+    simplified = shapely.simplify(geom, tolerance, preserve_topology=True)
+    quantized = shapely.set_precision(simplified, grid)
+    if quantized.is_empty:
+        # petite commune écrasée par la grille : garder la version simplifiée seule
+        quantized = simplified
+    if quantized.is_empty:
+        return None
+    out = mapping(quantized)
+    return {"type": out["type"], "coordinates": _round_coords(out["coordinates"], ndigits)}
+
+
+def simplify_layer(geojson: dict, level: str) -> dict:
+    """produit le geojson d'un niveau de détail (propriétés réduites au code et au nom)."""
+    tolerance, grid, ndigits = LEVELS[level]
+    features = []
+    for feature in geojson.get("features", []):
+        geometry = feature.get("geometry")
+        if not geometry:
+            continue
+        simplified = simplify_geometry(geometry, tolerance, grid, ndigits)
+        if simplified is None:
+            continue
+        props = feature.get("properties") or {}
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {k: props[k] for k in ("code", "nom") if k in props},
+                "geometry": simplified,
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def build_levels(name: str = "commune") -> list[Path]:
+    """écrit tous les niveaux d'une couche dans `LEVELS_DIR` et renvoie les fichiers produits."""
+    source = LAYER_PATHS[name]
+    if not source.exists():
+        logger.warning("fichier source absent pour la couche %s : %s", name, source)
+        return []
+    with source.open("r", encoding="utf-8") as f:
+        geojson = json.load(f)
+
+    LEVELS_DIR.mkdir(parents=True, exist_ok=True)
+    written = []
+    source_size = source.stat().st_size
+    for level in LEVELS:
+        out = simplify_layer(geojson, level)
+        path = level_path(name, level)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(out, f, ensure_ascii=False, separators=(",", ":"))
+        size = path.stat().st_size
+        logger.info(
+            "%s/%s : %d entités, %.1f Mo (%.0f%% du fichier source)",
+            name,
+            level,
+            len(out["features"]),
+            size / 1e6,
+            100.0 * size / source_size,
+        )
+        written.append(path)
+    return written
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for layer in sys.argv[1:] or ["commune"]:
+        build_levels(layer)
@@ -0,0 +1,137 @@
+"""index spatial des accidents (r*tree sqlite) et requêtes par emprise ou polygone.
+
+chaque table `caracteristiques_YYYY` reçoit au chargement une table virtuelle
+`caracteristiques_YYYY_rtree` (id = rowid de l'accident, boîte réduite au point).
+une requête « accidents dans cette zone » parcourt alors l'arbre au lieu de toute
+la table. le r*tree stocke des flottants 32 bits arrondis vers l'extérieur : le
+filtre exact sur lat/lon est réappliqué après la jointure. sans index (base
+ancienne ou chargement en cours), les fonctions retombent sur un parcours de la
+table, avec le même résultat.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+import shapely
+from sqlalchemy import text
+
+from .cache import memoize
+from .get_data import query_db
+
+# (lon_min, lat_min, lon_max, lat_max)
+BBox = tuple[float, float, float, float]
+
+DEFAULT_COLUMNS = ("acc_id", "lat", "lon")
+
+
+def rtree_table(table: str) -> str:
+    """nom de la table r*tree associée à une table d'accidents."""
+    return f"{table}_rtree"
+
+
+def build_spatial_index(conn, table: str) -> int:
+    """(re)crée le r*tree d'une table d'accidents ; renvoie le nombre de points indexés.
+
+    `conn` : connexion sqlalchemy en écriture (transaction validée par l'appelant).
+    """
+    index = rtree_table(table)
+    conn.execute(text(f"DROP TABLE IF EXISTS {index}"))
+    conn.execute(
+        text(f"CREATE VIRTUAL TABLE {index} USING rtree(id, min_lon, max_lon, min_lat, max_lat)")
+    )
+    conn.execute(
+        text(
+            f"INSERT INTO {index} SELECT rowid, lon, lon, lat, lat FROM {table} "
+            "WHERE lat IS NOT NULL AND lon IS NOT NULL"
+        )
+    )
+    return conn.execute(text(f"SELECT COUNT(*) FROM {index}")).scalar() or 0
+
+
+@memoize()
+def has_spatial_index(year: int) -> bool:
+    """vrai si le r*tree de l'année existe dans la base courante."""
+    df = query_db(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name",
+        {"name": rtree_table(f"caracteristiques_{int(year)}")},
+    )
+    return not df.empty
+
+
+def _bbox_query(year: int, bbox: BBox, select: str, where: str = "") -> tuple[str, dict]:
+    """requête sql (r*tree si disponible) des accidents d'une emprise.
+
+    `where` : condition supplémentaire sur la table des accidents (alias `c`).
+    """
+    table = f"caracteristiques_{int(year)}"
+    params = {"lon0": bbox[0], "lat0": bbox[1], "lon1": bbox[2], "lat1": bbox[3]}
+    exact = "c.lon BETWEEN :lon0 AND :lon1 AND c.lat BETWEEN :lat0 AND :lat1"
+    if where:
+        exact = f"{exact} AND ({where})"
+    if not has_spatial_index(year):
+        return f"SELECT {select} FROM {table} c WHERE {exact}", params
+    sql = (
+        f"SELECT {select} FROM {rtree_table(table)} r "
+        f"JOIN {table} c ON c.rowid = r.id "
+        # boîtes du r*tree arrondies vers l'extérieur : test de recouvrement (un point
+        # au bord de l'emprise peut en déborder), puis filtre exact sur les coordonnées
+        "WHERE r.max_lon >= :lon0 AND r.min_lon <= :lon1 "
+        "AND r.max_lat >= :lat0 AND r.min_lat <= :lat1 "
+        f"AND {exact}"
+    )
+    return sql, params
+
+
+def points_in_bbox(
+    year: int,
+    bbox: BBox,
+    columns: Iterable[str] = DEFAULT_COLUMNS,
+    where: str = "",
+    params: dict | None = None,
+) -> pd.DataFrame:
+    """accidents d'une année dont le point est dans l'emprise (bornes incluses).
+
+    `where`/`params` : filtre sql supplémentaire sur les accidents (alias `c`).
+    """
+    select = ", ".join(f"c.{col}" for col in columns)
+    sql, bbox_params = _bbox_query(year, bbox, select, where)
+    return query_db(sql, {**(params or {}), **bbox_params})
+
+
+def count_in_bbox(year: int, bbox: BBox) -> int:
+    """nombre d'accidents d'une année dans l'emprise."""
+    sql, params = _bbox_query(year, bbox, "COUNT(*) AS n")
+    return int(query_db(sql, params)["n"].iloc[0])
+
+
+def _as_polygon(polygon) -> shapely.Geometry:
+    """géométrie shapely depuis une géométrie ou une suite de sommets (lon, lat)."""
+    if isinstance(polygon, shapely.Geometry):
+        return polygon
+    return shapely.Polygon(polygon)
+
+
+def points_in_polygon(
+    year: int,
+    polygon: shapely.Geometry | Sequence[tuple[float, float]],
+    columns: Iterable[str] = DEFAULT_COLUMNS,
+) -> pd.DataFrame:
+    """accidents d'une année situés dans un polygone (emprise via r*tree, puis test exact)."""
+    geom = _as_polygon(polygon)
+    columns = tuple(columns)
+    extra = tuple(c for c in ("lon", "lat") if c not in columns)
+    df = points_in_bbox(year, tuple(geom.bounds), columns + extra)
+    if df.empty:
+        return df.loc[:, list(columns)]
+    inside = shapely.contains_xy(
+        geom, df["lon"].to_numpy(dtype=float), df["lat"].to_numpy(dtype=float)
+    )
+    return df.loc[np.asarray(inside), list(columns)].reset_index(drop=True)
+
+
+def count_in_polygon(year: int, polygon: shapely.Geometry | Sequence[tuple[float, float]]) -> int:
+    """nombre d'accidents d'une année situés dans un polygone."""
+    return len(points_in_polygon(year, polygon, ("lon", "lat")))
@@ -0,0 +1,161 @@
+"""jointure spatiale des accidents : département et commune d'après lat/lon.
+
+le code `com` des fichiers bruts n'est pas fiable (arrondissements, codes absents
+de `communes.geojson`). cette étape du nettoyage retrouve, pour chaque accident,
+le polygone qui contient son point : un `shapely.STRtree` sur les polygones de
+la couche donne les candidats (emprises) de tous les points en une requête, puis
+`shapely.contains_xy` sur les polygones préparés les départage en un seul appel
+vectorisé. 300 000 points sur les départements : ~0,5 s (contre ~20 s avec
+`predicate="within"`, évalué point par point sans préparation des polygones).
+
+la seule couche des départements disponible est simplifiée (segments de ~2,8 km
+en médiane) : près d'une limite, un point peut tomber dans le polygone voisin.
+quand `communes.geojson` (pleine résolution) est présent, le département est
+donc déduit de la commune trouvée ; sinon il vient de la couche simplifiée, et
+un point à moins de `DEPT_TOLERANCE_M` de deux départements n'est pas comparé.
+
+colonnes ajoutées au csv nettoyé :
+- `dep_geo`, `com_geo` : codes du polygone contenant le point (vide si hors couche) ;
+- `dep_ecart`, `com_ecart` : 1 si le code déclaré diffère du code géographique,
+  0 s'il concorde, vide si l'un des deux manque (ou si le point est dans la
+  tolérance de la couche simplifiée) ;
+`com` et `com_insee` vides sont complétés par le code géographique, `dep` vide
+seulement si ce code vient de la couche des communes.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import shape
+
+from .geo_codes import normalize_commune, normalize_dept
+from .geometry import get_layer
+
+logger = logging.getLogger(__name__)
+
+# écart toléré entre la couche simplifiée des départements et les limites réelles
+DEPT_TOLERANCE_M = 2_000.0
+METERS_PER_DEGREE = 111_320.0
+
+_TREES: dict[str, tuple[shapely.STRtree, np.ndarray, np.ndarray] | None] = {}
+
+
+def _layer_tree(name: str) -> tuple[shapely.STRtree, np.ndarray, np.ndarray] | None:
+    """strtree, polygones préparés et codes d'une couche (construits une fois)."""
+    if name not in _TREES:
+        layer = get_layer(name)
+        if layer is None:
+            _TREES[name] = None
+        else:
+            codes = np.array(list(layer.features), dtype=object)
+            geoms = np.array([shape(f["geometry"]) for f in layer.features.values()])
+            shapely.prepare(geoms)
+            _TREES[name] = (shapely.STRtree(geoms), geoms, codes)
+    return _TREES[name]
+
+
+def locate(lon, lat, name: str) -> pd.Series:
+    """code du polygone de la couche `name` contenant chaque point (NaN si aucun)."""
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    out = np.full(len(lon), np.nan, dtype=object)
+    tree = _layer_tree(name)
+    if tree is None or not len(lon):
+        return pd.Series(out)
+    strtree, geoms, codes = tree
+    # candidats par emprise, puis test exact vectorisé sur les polygones préparés
+    point_idx, poly_idx = strtree.query(shapely.points(lon, lat))
+    inside = shapely.contains_xy(geoms[poly_idx], lon[point_idx], lat[point_idx])
+    point_idx, poly_idx = point_idx[inside], poly_idx[inside]
+    # point sur une frontière commune : le premier polygone trouvé l'emporte
+    first = np.unique(point_idx, return_index=True)[1]
+    out[point_idx[first]] = codes[poly_idx[first]]
+    return pd.Series(out)
+
+
+def near_boundary(lon, lat, name: str, tolerance_m: float) -> np.ndarray:
+    """True pour les points à moins de `tolerance_m` d'au moins deux polygones de la couche."""
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    tree = _layer_tree(name)
+    if tree is None or not len(lon):
+        return np.zeros(len(lon), dtype=bool)
+    # distance en degrés : la plus grande des deux échelles (longitude) pour rester prudent
+    distance = tolerance_m / (METERS_PER_DEGREE * np.maximum(np.cos(np.radians(lat)), 0.1))
+    distance = np.nan_to_num(distance)
+    point_idx, _ = tree[0].query(shapely.points(lon, lat), predicate="dwithin", distance=distance)
+    return np.bincount(point_idx, minlength=len(lon)) >= 2
+
+
+def commune_dept(com: pd.Series) -> pd.Series:
+    """département d'un code commune insee (3 caractères outre-mer, 2 sinon)."""
+    return com.str[:2].where(~com.str.startswith("97", na=False), com.str[:3])
+
+
+def _mismatch(declared: pd.Series, located: pd.Series) -> pd.Series:
+    """1 si les codes diffèrent, 0 s'ils concordent, NA si l'un manque."""
+    flag = (declared != located).astype("Int8")
+    return flag.mask(declared.isna() | located.isna())
+
+
+def assign_geo_codes(df: pd.DataFrame) -> pd.DataFrame:
+    """ajoute dep_geo/com_geo et les indicateurs d'écart ; complète dep/com vides.
+
+    dep n'est complété que depuis la couche des communes (pleine résolution).
+    """
+    df = df.reset_index(drop=True)
+    com_geo = locate(df["lon"], df["lat"], "commune")
+    com_geo = normalize_commune(com_geo).where(com_geo.notna())
+    full_resolution = _layer_tree("commune") is not None
+    if full_resolution:
+        dep_geo = commune_dept(com_geo)
+        ambiguous = np.zeros(len(df), dtype=bool)
+    else:
+        dep_geo = locate(df["lon"], df["lat"], "dept")
+        ambiguous = near_boundary(df["lon"], df["lat"], "dept", DEPT_TOLERANCE_M)
+    # comparaison sur codes normalisés, arrondissements repliés sur leur commune
+    dep = normalize_dept(df["dep"]).where(df["dep"].notna())
+    declared = df["com_insee"] if "com_insee" in df.columns else df["com"]
+    com = normalize_commune(declared).where(declared.notna())
+    df["dep_geo"] = dep_geo
+    df["com_geo"] = com_geo
+    df["dep_ecart"] = _mismatch(dep, df["dep_geo"]).mask(ambiguous)
+    df["com_ecart"] = _mismatch(com, df["com_geo"])
+    if full_resolution:
+        df["dep"] = df["dep"].where(df["dep"].notna(), df["dep_geo"])
+    df["com"] = df["com"].where(df["com"].notna(), df["com_geo"])
+    if "com_insee" in df.columns:
+        # com_insee est dérivé avant la jointure : y reporter les communes retrouvées
+        df["com_insee"] = df["com_insee"].where(df["com_insee"].notna(), df["com_geo"])
+    return df
+
+
+def annotate_csv(path: Path) -> bool:
+    """applique la jointure spatiale à un csv caract nettoyé (réécrit en place).
+
+    renvoie False si le fichier est déjà annoté ou sans coordonnées.
+    """
+    columns = pd.read_csv(path, nrows=0).columns
+    if "dep_geo" in columns or not {"lat", "lon"} <= set(columns):
+        return False
+    start = time.perf_counter()
+    codes = {"dep": str, "com": str, "com_insee": str}
+    df = assign_geo_codes(pd.read_csv(path, low_memory=False, dtype=codes))
+    tmp = path.with_suffix(".tmp")
+    df.to_csv(tmp, index=False)
+    tmp.replace(path)
+    logger.info(
+        "%s : %d accidents localisés en %.2fs, écarts département %d, commune %d",
+        path.name,
+        len(df),
+        time.perf_counter() - start,
+        int(df["dep_ecart"].sum()),
+        int(df["com_ecart"].sum()),
+    )
+    return True
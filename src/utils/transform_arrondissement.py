@@ -1,82 +1,55 @@
-"""transformation des codes d'arrondissement vers codes insee commune."""
-# pylint: disable=duplicate-code  # R0801 warnings are from other files in utils module
+"""normalisation des codes commune : arrondissements municipaux -> code insee commune.
 
-from __future__ import annotations
+étape du nettoyage appliquée à chaque csv caract nettoyé (toutes années) : le code
+déclaré est conservé dans `com`, le code normalisé est ajouté dans `com_insee`
+(5 caractères, arrondissements de paris/lyon/marseille repliés sur leur commune).
+la table chargée indexe `com_insee` : aucune correspondance n'est refaite à la
+lecture. la correspondance est appliquée par un `map` vectorisé sur la colonne.
 
-import warnings
+seule la table insee `ARRONDISSEMENT_TO_COMMUNE` est utilisée : les codes postaux
+d'arrondissement (ex. 13001, 69001) sont aussi des codes insee d'autres communes
+(aix-en-provence, affoux) et ne peuvent pas servir de clé.
+"""
 
-import pandas as pd
+from __future__ import annotations
 
-warnings.filterwarnings("ignore")
+import logging
+import time
+from pathlib import Path
 
-print("chargement des données...")
+import pandas as pd
 
-# chargement des deux csv
-# le fichier `caract_clean.csv` peut utiliser un séparateur détecté automatiquement
-try:
-    df_accidents = pd.read_csv(
-        "data/cleaned/caract_clean_2023.csv",
-        sep=None,
-        engine="python",
+from .geo_codes import ARRONDISSEMENT_TO_COMMUNE
+
+logger = logging.getLogger(__name__)
+
+
+def to_insee(com: pd.Series, mapping: dict[str, str] | None = None) -> pd.Series:
+    """codes insee commune (5 caractères, arrondissements repliés) ; NaN conservés."""
+    mapping = ARRONDISSEMENT_TO_COMMUNE if mapping is None else mapping
+    codes = com.astype("string").str.strip().str.upper().str.zfill(5)
+    return codes.map(mapping).fillna(codes)
+
+
+def normalize_csv(path: Path, mapping: dict[str, str] | None = None) -> bool:
+    """ajoute `com_insee` à un csv caract nettoyé (réécrit en place).
+
+    renvoie False si la colonne existe déjà ou si le fichier n'a pas de `com`.
+    """
+    columns = pd.read_csv(path, nrows=0).columns
+    if "com_insee" in columns or "com" not in columns:
+        return False
+    start = time.perf_counter()
+    df = pd.read_csv(path, low_memory=False, dtype={"dep": str, "com": str})
+    df["com_insee"] = to_insee(df["com"], mapping)
+    tmp = path.with_suffix(".tmp")
+    df.to_csv(tmp, index=False)
+    tmp.replace(path)
+    changed = int((df["com_insee"] != df["com"].str.strip()).sum())
+    logger.info(
+        "%s : codes commune normalisés en %.2fs (%d modifiés)",
+        path.name,
+        time.perf_counter() - start,
+        changed,
     )
-except (OSError, UnicodeDecodeError, pd.errors.ParserError):
-    # repli si la détection échoue
-    df_accidents = pd.read_csv("data/cleaned/caract_clean_2023.csv")
-
-df_arrondissements = pd.read_csv(
-    "data/cleaned/communes_avec_arrondissements.csv",
-    sep=";",
-)
-
-# debug: afficher les colonnes trouvées
-print(f"colonnes accidents: {list(df_accidents.columns)}")
-
-print(f"accidents: {len(df_accidents)} lignes")
-print(f"arrondissements: {len(df_arrondissements)} lignes")
-
-# créer un dictionnaire de mapping: code_postal_arrondissement -> code_insee_commune
-mapping_dict: dict[str, str] = {}
-for _, row in df_arrondissements.iterrows():
-    code_postal = str(row["code_postal_arrondissement"])
-    code_insee = str(row["code_insee_commune"]).zfill(5)
-    mapping_dict[code_postal] = code_insee
-
-print(f"\ndictionnaire de mapping créé avec {len(mapping_dict)} entrées")
-print("   exemples:")
-for code in ["75101", "75116", "13201", "13055", "69301"]:
-    if code in mapping_dict:
-        print(f"   - {code} -> {mapping_dict[code]}")
-
-# transformer la colonne 'com' dans le csv accidents
-df_accidents["com_original"] = df_accidents["com"].astype(str)
-df_accidents["com"] = df_accidents["com"].astype(str).apply(
-    lambda x: mapping_dict.get(x, x)
-)
-
-print("\ntransformation appliquée...")
-
-# comparer avant/après
-changes = (df_accidents["com_original"] != df_accidents["com"]).sum()
-print(f"   - lignes modifiées: {changes}")
-
-# afficher quelques exemples de transformations
-modified = df_accidents[df_accidents["com_original"] != df_accidents["com"]]
-if not modified.empty:
-    print("\nexemples de transformations:")
-    orig_uniques = modified["com_original"].unique()[:10]
-    new_uniques = modified["com"].unique()[:10]
-    for orig, new in zip(orig_uniques, new_uniques):
-        print(f"   - {orig} -> {new}")
-
-# sauvegarder le csv transformé
-df_accidents_transformed = df_accidents.drop(columns=["com_original"])
-df_accidents_transformed.to_csv("caract-2023-TRANSFORMED.csv", sep=";", index=False)
-
-print("\ncsv transformé sauvegardé: caract-2023-TRANSFORMED.csv")
-
-# statistiques
-with_coords = df_accidents_transformed.dropna(subset=["lat_acc", "lon_acc"]).shape[0]
-print("\nstatistiques:")
-print(f"   - total lignes: {len(df_accidents_transformed)}")
-print(f"   - communes uniques: {df_accidents_transformed['com'].nunique()}")
-print(f"   - avec coordonnées valides: {with_coords}")
+    return True
@@ -0,0 +1,43 @@
+"""esquisses de quantiles : les mesures sans heure ni mois comptent dans la vue « tous »."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.utils.quantile_sketch import QUANTILES, SketchCube, build_sketches
+
+
+def _measures(n: int = 5_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    limite = rng.choice([50, 80, 110], n)
+    heure = pd.Series([f"{h:02d}:15" for h in rng.integers(0, 24, n)], dtype=object)
+    mois = pd.Series(rng.integers(1, 13, n), dtype=float)
+    # un quart des mesures sans horodatage, plus rapides que les autres
+    unknown = rng.random(n) < 0.25
+    heure[unknown[: n // 2].nonzero()[0]] = None
+    mois[unknown[n // 2 :].nonzero()[0] + n // 2] = np.nan
+    mesure = limite + rng.integers(-30, 30, n) + np.where(unknown, 25, 0)
+    return pd.DataFrame({"mesure": mesure, "limite": limite, "heure": heure, "mois": mois})
+
+
+def _cube(df: pd.DataFrame) -> SketchCube:
+    return SketchCube.from_rows(build_sketches(df, 2023))
+
+
+def test_unfiltered_quantiles_include_unknown_times():
+    df = _measures()
+    total, values = _cube(df).quantiles()
+    delta = (df["mesure"] - df["limite"]).to_numpy()
+    assert total == len(df)
+    expected = np.percentile(delta, [q * 100 for q in QUANTILES], method="inverted_cdf")
+    assert [values[q] for q in QUANTILES] == [int(v) for v in expected]
+
+
+def test_specific_hour_and_month_exclude_unknown_times():
+    df = _measures()
+    cube = _cube(df)
+    hours = pd.to_numeric(df["heure"].str[:2], errors="coerce")
+    assert cube.quantiles(heure=7)[0] == int((hours == 7).sum())
+    assert cube.quantiles(mois=3)[0] == int((df["mois"] == 3).sum())
+    assert cube.quantiles(limite=80)[0] == int((df["limite"] == 80).sum())
@@ -0,0 +1,47 @@
+"""jointure spatiale : une commune retrouvée d'après lat/lon compte dans les agrégats communaux."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import shapely
+from sqlalchemy import create_engine
+
+import load_to_db
+from src.utils import spatial_join
+from src.utils.transform_arrondissement import normalize_csv
+
+
+def _commune_layer(monkeypatch) -> None:
+    """couche des communes réduite à deux carrés (paris, marseille)."""
+    geoms = np.array([shapely.box(2.2, 48.8, 2.5, 48.9), shapely.box(5.3, 43.2, 5.5, 43.4)])
+    shapely.prepare(geoms)
+    codes = np.array(["75056", "13055"], dtype=object)
+    monkeypatch.setitem(spatial_join._TREES, "commune", (shapely.STRtree(geoms), geoms, codes))
+
+
+def test_missing_commune_counted_in_commune_aggregate(tmp_path, monkeypatch):
+    _commune_layer(monkeypatch)
+    path = tmp_path / "caract_clean_2023.csv"
+    pd.DataFrame(
+        {
+            "Num_Acc": [1, 2, 3],
+            "dep": ["75", "13", None],
+            "com": ["75101", None, None],
+            "lat": [48.85, 43.3, 43.35],
+            "lon": [2.35, 5.4, 5.45],
+        }
+    ).to_csv(path, index=False)
+
+    # même ordre que setup_data : com_insee d'abord, jointure spatiale ensuite
+    assert normalize_csv(path)
+    assert spatial_join.annotate_csv(path)
+    df = pd.read_csv(path, dtype=load_to_db.CODE_DTYPES)
+    assert df["com_insee"].tolist() == ["75056", "13055", "13055"]
+    assert df["dep"].tolist() == ["75", "13", "13"]
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    df.to_sql("caracteristiques_2023", engine, index=False)
+    counts = load_to_db.build_choropleth_counts(engine, [2023])
+    communes = counts[counts["niveau"] == "commune"].set_index("code")["accidents"]
+    assert communes.to_dict() == {"13055": 2, "75056": 1}